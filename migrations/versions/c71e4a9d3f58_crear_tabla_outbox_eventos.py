@@ -0,0 +1,37 @@
+"""crear_tabla_outbox_eventos
+
+Revision ID: c71e4a9d3f58
+Revises: b3d8f1e5a247
+Create Date: 2026-10-19 16:22:41.503918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e4a9d3f58'
+down_revision: Union[str, None] = 'b3d8f1e5a247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Eventos escritos en la transacción del cambio, publicados después por el relay
+    op.create_table(
+        'outbox_eventos',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False, comment='Orden de publicación'),
+        sa.Column('event_type', sa.String(length=64), nullable=False, comment='Tipo de evento (EventType.value)'),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False, comment='Evento serializado (Event.to_dict)'),
+        sa.Column('fecha_creacion', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='Fecha en que se encoló el evento'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_outbox_eventos_fecha', 'outbox_eventos', ['fecha_creacion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_outbox_eventos_fecha', table_name='outbox_eventos')
+    op.drop_table('outbox_eventos')
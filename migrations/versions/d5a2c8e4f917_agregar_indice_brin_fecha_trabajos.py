@@ -0,0 +1,28 @@
+"""agregar_indice_brin_fecha_trabajos
+
+Revision ID: d5a2c8e4f917
+Revises: c71e4a9d3f58
+Create Date: 2026-10-19 18:05:12.318264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a2c8e4f917'
+down_revision: Union[str, None] = 'c71e4a9d3f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El reporte mensual lee un rango de fechas; BRIN ocupa unas pocas páginas
+    # porque los trabajos se insertan en orden de fecha_creacion
+    op.create_index('idx_trabajo_fecha_creacion_brin', 'trabajos', ['fecha_creacion'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_trabajo_fecha_creacion_brin', table_name='trabajos', postgresql_using='brin')
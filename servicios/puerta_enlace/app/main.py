@@ -15,6 +15,13 @@ import sys
 # Agregar path de shared para importar Firebase endpoints
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
 
+from shared.middleware.rate_limit_policy import (
+    get_policy_rate_limiter,
+    rate_limit_exceeded_response,
+    rate_limit_headers,
+)
+from shared.middleware.rate_limiter import proxies_confiables
+
 app = FastAPI(
     title="ConectarProfesionales - API Gateway",
     version="2.0.0",
@@ -60,6 +67,13 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 # Cliente HTTP reutilizable
 http_client = httpx.AsyncClient(timeout=30.0)
 
+@app.on_event("startup")
+async def startup_event():
+    """Carga la tabla de rate limiting y los proxies confiables (falla al arrancar si son inválidos)"""
+    politicas = get_policy_rate_limiter().policies
+    proxies = proxies_confiables()
+    print(f"✅ Rate limiting: {len(politicas)} políticas cargadas, {len(proxies)} proxies confiables")
+
 # Middleware de logging
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -268,6 +282,11 @@ async def gateway_route(path: str, request: Request):
             detail=f"Servicio {servicio_nombre} no disponible"
         )
     
+    # Rate limiting según la tabla de políticas, antes de llegar al servicio
+    politica, permitido, rate_info = await get_policy_rate_limiter().check(request, normalized_path)
+    if not permitido:
+        return rate_limit_exceeded_response(politica, rate_info)
+    
     # Construir URL completa del servicio destino
     url_destino = f"{servicio_url}{normalized_path}"
     
@@ -278,6 +297,11 @@ async def gateway_route(path: str, request: Request):
         if k.lower() not in ['host', 'content-length']
     }
     headers_filtrados['X-API-Version'] = version
+    # Se agrega la IP de quien llamó al gateway: los servicios que confían en
+    # el gateway (RATE_LIMIT_TRUSTED_PROXIES) toman la última entrada
+    if request.client:
+        anterior = headers.get('x-forwarded-for')
+        headers_filtrados['x-forwarded-for'] = f"{anterior}, {request.client.host}" if anterior else request.client.host
     
     # Obtener query params
     query_params = dict(request.query_params)
@@ -348,6 +372,7 @@ async def gateway_route(path: str, request: Request):
         
         # Agregar header de versión en respuesta
         headers_filtrados_resp['X-API-Version'] = version
+        headers_filtrados_resp.update(rate_limit_headers(rate_info))
 
         content_type = upstream_headers.get("content-type", "")
         try:
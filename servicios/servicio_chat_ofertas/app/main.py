@@ -9,7 +9,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../shared'))
 
 from fastapi import FastAPI, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 from typing import List, Optional
 from datetime import datetime
 
@@ -35,9 +35,13 @@ from shared.schemas.chat import (
 )
 from shared.services.chat_service import ChatService
 from shared.services.gamificacion_service import GamificacionService, get_gamificacion_service
+from shared.services.ranking_service import calcular_rating_bayesiano
+from shared.services.profile_service import invalidate_public_profile
 from shared.middleware.error_handler import add_exception_handlers
 from shared.core.health import create_health_check_routes
 from shared.core.database import get_db
+from shared.events.event_bus import publish_resena_creada, publish_trabajo_completado
+from shared.events.outbox import iniciar_relay, detener_relay
 
 app = FastAPI(
     title="Servicio de Chat y Ofertas",
@@ -55,6 +59,15 @@ health_router = create_health_check_routes(
 )
 app.include_router(health_router)
 
+# Relay del outbox: publica en Redis los eventos encolados por los endpoints
+@app.on_event("startup")
+def start_outbox_relay():
+    iniciar_relay()
+
+@app.on_event("shutdown")
+def stop_outbox_relay():
+    detener_relay()
+
 # Inicializar servicios
 chat_service = ChatService()
 
@@ -620,6 +633,13 @@ async def update_trabajo_status(
         
         trabajo.estado = TrabajoEstado.COMPLETADO
         trabajo.fecha_fin = datetime.utcnow()
+        publish_trabajo_completado(
+            db,
+            trabajo_id=str(trabajo.id),
+            profesional_id=str(trabajo.profesional_id),
+            cliente_id=str(trabajo.cliente_id),
+            source_service="chat_ofertas",
+        )
     
     # Solo el cliente puede aprobar
     elif status_update.estado == TrabajoEstado.APROBADO:
@@ -751,6 +771,16 @@ async def create_resena(
     )
     
     db.add(nueva_resena)
+    db.flush()
+    # En la misma transacción que la reseña (ver events/outbox.py)
+    publish_resena_creada(
+        db,
+        resena_id=str(nueva_resena.id),
+        trabajo_id=str(trabajo.id),
+        profesional_id=str(trabajo.profesional_id),
+        rating=resena_data.rating,
+        source_service="chat_ofertas",
+    )
     db.commit()
     db.refresh(nueva_resena)
     
@@ -760,13 +790,16 @@ async def create_resena(
     ).first()
     
     if professional:
-        resenas = db.query(Resena).filter(
+        # Agregados en SQL, sin cargar todas las reseñas del profesional
+        promedio, total = db.query(func.avg(Resena.rating), func.count(Resena.id)).filter(
             Resena.profesional_id == professional.id
-        ).all()
+        ).one()
         
-        total_rating = sum(r.rating for r in resenas)
-        professional.rating_promedio = total_rating / len(resenas)
-        professional.total_resenas = len(resenas)
+        professional.rating_promedio = promedio
+        professional.total_resenas = total
+        professional.rating_bayesiano = calcular_rating_bayesiano(
+            professional.rating_promedio, professional.total_resenas
+        )
         
         db.commit()
     
@@ -778,6 +811,9 @@ async def create_resena(
         logger.warning(f"Error al otorgar puntos por reseña: {e}")
         pass
     
+    if professional:
+        invalidate_public_profile(professional.id)
+    
     return nueva_resena
 
 @app.get("/resenas/professional/{prof_id}", response_model=List[ResenaResponse])
@@ -17,9 +17,11 @@ from shared.models.user import User
 from shared.models.professional import Professional
 from shared.schemas.notification import NotificationPreferencesUpdate, NotificationPreferencesRead, NotificationHistoryItem
 from shared.services.email_service import EmailService
-from shared.services.gamificacion_service import GamificacionService, get_gamificacion_service
+from shared.services.gamificacion_service import GamificacionService, get_gamificacion_service, obtener_leaderboard
 from shared.middleware.error_handler import add_exception_handlers
-from shared.core.health import create_simple_health_routes
+from shared.core.health import create_simple_health_routes, register_readiness_gate
+from shared.services.warmup_service import calentar
+from shared.cache.warmup import esta_listo, iniciar_warmup
 
 app = FastAPI(
     title="Servicio de Notificaciones",
@@ -34,6 +36,13 @@ add_exception_handlers(app)
 health_router = create_simple_health_routes(service_name="notificaciones")
 app.include_router(health_router)
 
+# Warm-up de caché al arrancar: /health/ready espera a que termine
+register_readiness_gate("cache_warmup", esta_listo)
+
+@app.on_event("startup")
+def warmup_cache():
+    iniciar_warmup(lambda: calentar(["leaderboard"]))
+
 email_service = EmailService()
 
 # ============================================================================
@@ -82,7 +91,7 @@ async def send_email(
             to_email=email_data.to_email,
             subject=email_data.subject,
             body=email_data.body,
-            html=email_data.html
+            html_body=email_data.html
         )
         
         return {"message": "Email programado para envío"}
@@ -360,25 +369,7 @@ async def get_leaderboard(
     """Obtiene el ranking de profesionales por puntos"""
     
     try:
-        top_professionals = db.query(Professional).join(User).filter(
-            User.is_active == True
-        ).order_by(
-            Professional.puntos_experiencia.desc()
-        ).limit(limit).all()
-        
-        leaderboard = []
-        for i, prof in enumerate(top_professionals, 1):
-            user = db.query(User).filter(User.id == prof.user_id).first()
-            leaderboard.append({
-                "posicion": i,
-                "nombre": prof.nombre_completo,
-                "puntos": prof.puntos_experiencia,
-                "nivel": prof.nivel,
-                "rating": float(prof.rating_promedio) if prof.rating_promedio else 0,
-                "trabajos_completados": prof.trabajos_completados or 0
-            })
-        
-        return leaderboard
+        return obtener_leaderboard(db, limit)
     
     except Exception as e:
         raise HTTPException(
@@ -6,7 +6,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
@@ -16,7 +16,7 @@ from geoalchemy2.functions import ST_DWithin, ST_MakePoint
 from geoalchemy2.elements import WKTElement
 from uuid import UUID
 
-from shared.core.database import get_db
+from shared.core.database import get_db, SessionLocal
 from shared.core.security import get_current_user, get_current_active_user
 from shared.models.user import User
 from shared.models.professional import Profesional
@@ -29,16 +29,31 @@ from shared.schemas.professional import (
     ProfessionalCreate, ProfessionalUpdate, ProfessionalResponse,
     KYCSubmitRequest, KYCStatusResponse, PublicProfileResponse
 )
-from shared.schemas.search import SearchRequest, SearchResponse, ProfessionalSearchResult
+from shared.schemas.search import (
+    SearchRequest, SearchResponse, ProfessionalSearchResult,
+    BatchSearchRequest, BatchSearchResponse
+)
 from shared.schemas.oficio import OficioCreate, OficioResponse, OficioRead
 from shared.schemas.portfolio import PortfolioCreate, PortfolioResponse, PortfolioItemUpdate, PortfolioImagenRead
 from shared.schemas.trabajo import TrabajoRead
 from shared.schemas.oferta import OfertaRead
 from shared.schemas.admin import KYCApproveRequest, UserBanRequest
+from shared.schemas.resena import ResenaPublicRead
 from shared.middleware.error_handler import add_exception_handlers
-from shared.core.health import create_health_check_routes
+from shared.core.health import create_health_check_routes, register_readiness_gate
 from shared.core.database import get_db
-from shared.cache.cache_manager import cached, SearchCache, invalidate_search_cache
+from shared.cache.cache_manager import SearchCache, invalidate_search_cache
+from shared.cache.instrumentation import key_stats
+from shared.services.search_service import search_professionals, search_professionals_batch
+from shared.services.profile_service import (
+    get_public_profile, get_resenas_publicas, invalidate_public_profile, invalidate_public_profile_by_user
+)
+from shared.services.resumen_service import resumenes_oficios, resumenes_profesionales
+from shared.services.oficio_service import invalidar_catalogo, obtener_registro
+from shared.services.warmup_service import calentar
+from shared.cache.warmup import esta_listo, iniciar_warmup
+from shared.events.event_bus import Event, EventType, get_async_event_bus
+from shared.events.consumer import setup_event_consumer
 
 app = FastAPI(
     title="Servicio de Profesionales",
@@ -56,6 +71,28 @@ health_router = create_health_check_routes(
 )
 app.include_router(health_router)
 
+# Warm-up de caché al arrancar: /health/ready espera a que termine
+register_readiness_gate("cache_warmup", esta_listo)
+
+@app.on_event("startup")
+def warmup_cache():
+    iniciar_warmup(lambda: calentar(["oficios", "perfiles", "busquedas"]))
+
+# Eventos: el perfil público cacheado se invalida cuando el profesional
+# recibe una reseña o completa un trabajo. El profesional_id de estos eventos
+# es el usuarios.id del profesional (trabajos.profesional_id).
+def _invalidar_perfil_por_evento(event: Event):
+    db = SessionLocal()
+    try:
+        invalidate_public_profile_by_user(db, event.data["profesional_id"])
+    finally:
+        db.close()
+
+event_bus = get_async_event_bus(group="profesionales")
+event_bus.subscribe(EventType.RESENA_CREADA, _invalidar_perfil_por_evento)
+event_bus.subscribe(EventType.TRABAJO_COMPLETADO, _invalidar_perfil_por_evento)
+setup_event_consumer(app, event_bus)
+
 # ============================================================================
 # HEALTH CHECK
 # ============================================================================
@@ -162,6 +199,7 @@ async def update_my_professional_profile(
         setattr(professional, field, value)
     
     db.commit()
+    invalidate_public_profile(professional.id)
     db.refresh(professional)
     return ProfessionalResponse.from_professional(professional)
 
@@ -283,6 +321,7 @@ async def add_portfolio_item(
     
     db.add(new_item)
     db.commit()
+    invalidate_public_profile(professional.id)
     db.refresh(new_item)
     
     return new_item
@@ -323,6 +362,7 @@ async def delete_portfolio_item(
     
     db.delete(item)
     db.commit()
+    invalidate_public_profile(professional.id)
 
 @app.put("/professional/portfolio/{item_id}", response_model=PortfolioResponse)
 async def update_portfolio_item(
@@ -365,6 +405,7 @@ async def update_portfolio_item(
         setattr(item, field, value)
     
     db.commit()
+    invalidate_public_profile(professional.id)
     db.refresh(item)
     return item
 
@@ -420,6 +461,7 @@ async def add_portfolio_images(
         new_images.append(new_image)
     
     db.commit()
+    invalidate_public_profile(professional.id)
     for img in new_images:
         db.refresh(img)
     
@@ -475,6 +517,7 @@ async def delete_portfolio_image(
     
     db.delete(image)
     db.commit()
+    invalidate_public_profile(professional.id)
 
 # ============================================================================
 # OFICIOS (TRADES) ENDPOINTS
@@ -519,6 +562,7 @@ async def add_oficio(
     db.add(new_oficio)
     db.commit()
     db.refresh(new_oficio)
+    invalidar_catalogo()
     return new_oficio
 
 @app.delete("/professional/oficios/{oficio_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -548,6 +592,7 @@ async def delete_oficio(
     if oficio in professional.oficios:
         professional.oficios.remove(oficio)
         db.commit()
+        invalidate_public_profile(professional.id)
     return
 
 # ============================================================================
@@ -611,7 +656,7 @@ async def get_my_ofertas(
 # ============================================================================
 
 @app.post("/search")
-async def search_professionals_endpoint(
+def search_professionals_endpoint(
     search_params: SearchRequest,
     db: Session = Depends(get_db)
 ):
@@ -621,86 +666,29 @@ async def search_professionals_endpoint(
     Características:
     - Búsqueda por radio geográfico
     - Filtros por oficio, habilidades, rating
-    - Ordenamiento por distancia, rating, precio
-    - Paginación
+    - Ordenamiento por rating, precio, distancia o relevancia (ver ranking_service)
+    - Paginación con total exacto (cacheado), estimado o solo has_more (`modo_conteo`)
     - Cache de resultados (3 minutos)
-    """
     
-    query = db.query(Profesional).join(User).filter(
-        User.is_active == True,
-        User.rol == UserRole.PROFESIONAL,
-        Profesional.estado_verificacion == VerificationStatus.APROBADO
-    )
-
-    # Filtro por oficio (por nombre, parcial, case-insensitive)
-    if getattr(search_params, 'oficio', None):
-        query = query.join(Profesional.oficios).filter(
-            func.lower(Oficio.nombre).contains(search_params.oficio.lower())
-        )
-
-    # Filtro por rating mínimo (si viene del frontend)
-    if getattr(search_params, 'rating_minimo', None):
-        query = query.filter(Profesional.rating_promedio >= search_params.rating_minimo)
-
-    # Filtro por rango de precios
-    if getattr(search_params, 'precio_minimo', None):
-        query = query.filter(Profesional.tarifa_por_hora >= search_params.precio_minimo)
-    if getattr(search_params, 'precio_maximo', None):
-        query = query.filter(Profesional.tarifa_por_hora <= search_params.precio_maximo)
-
-    # Ordenamiento
-    ordenar_por = getattr(search_params, 'ordenar_por', 'rating') or 'rating'
-    if ordenar_por == 'precio':
-        query = query.order_by(Profesional.tarifa_por_hora.asc().nulls_last())
-    else:
-        # Por defecto, rating desc
-        query = query.order_by(Profesional.rating_promedio.desc())
-
-    # Paginación
-    skip = getattr(search_params, 'skip', 0) or 0
-    limit = getattr(search_params, 'limit', 100) or 100
-    total = query.count()
-    professionals = query.offset(skip).limit(limit).all()
-
-    # Cálculo de distancia (opcional)
-    lat = getattr(search_params, 'latitude', None)
-    lng = getattr(search_params, 'longitude', None)
-    point = None
-    if lat is not None and lng is not None:
-        point = WKTElement(f'POINT({lng} {lat})', srid=4326)
-
-    resultados = []
-    for prof in professionals:
-        distancia_km = None
-        if point is not None and prof.base_location is not None:
-            distancia = db.query(
-                func.ST_Distance(Profesional.base_location, point)
-            ).filter(Profesional.id == prof.id).scalar()
-            distancia_km = float(distancia) / 1000.0 if distancia is not None else None
-
-        # Tomar el primer oficio como principal para mostrar
-        oficio_nombre = prof.oficios[0].nombre if getattr(prof, 'oficios', []) else ''
-
-        resultados.append({
-            "id": str(prof.id),
-            "nombre": prof.usuario.nombre,
-            "apellido": prof.usuario.apellido,
-            "oficio": oficio_nombre,
-            "tarifa_por_hora": float(prof.tarifa_por_hora) if prof.tarifa_por_hora is not None else None,
-            "calificacion_promedio": float(prof.rating_promedio) if prof.rating_promedio is not None else 0.0,
-            "cantidad_resenas": int(prof.total_resenas) if prof.total_resenas is not None else 0,
-            "distancia_km": distancia_km,
-            "nivel_profesional": prof.nivel.value,
-            "puntos_experiencia": int(prof.puntos_experiencia),
-            "avatar_url": prof.usuario.avatar_url,
-        })
+    Sin async: la consulta y SearchCache son síncronos, FastAPI lo corre en el threadpool.
+    """
+    return JSONResponse(content=search_professionals(db, search_params))
 
-    return JSONResponse(content={
-        "total": total,
-        "resultados": resultados,
-        "pagina": (skip // limit) + 1,
-        "total_paginas": (total + limit - 1) // limit,
-    })
+@app.post("/search/batch", response_model=BatchSearchResponse)
+def batch_search_professionals_endpoint(
+    batch: BatchSearchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Búsqueda múltiple para la vista de mapa.
+    
+    Recibe una lista de búsquedas y/o un viewport (bbox) con varios oficios y
+    las resuelve en una sola consulta (UNION ALL). Cada búsqueda reutiliza el
+    cache de /search, por lo que mover el mapa cuesta un request en lugar de N.
+    Sin async por el mismo motivo que /search.
+    """
+    grupos = search_professionals_batch(db, batch.expandir_busquedas())
+    return JSONResponse(content={"grupos": grupos})
 
 # ============================================================================
 # PUBLIC ENDPOINTS
@@ -711,44 +699,41 @@ async def get_public_professional_profile(
     prof_id: str,
     db: Session = Depends(get_db)
 ):
-    """Obtiene el perfil público de un profesional"""
+    """
+    Obtiene el perfil público de un profesional.
+    
+    Incluye las reseñas más recientes y la distribución de ratings; el resto
+    de las reseñas se pagina en /public/professional/{prof_id}/resenas.
+    El perfil se sirve desde cache (ver profile_service).
+    """
     try:
         prof_uuid = UUID(prof_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="ID de profesional inválido")
     
-    from sqlalchemy.orm import joinedload
-    from shared.models.resena import Resena
-    
-    professional = db.query(Profesional).options(
-        joinedload(Profesional.usuario),
-        joinedload(Profesional.oficios),
-        joinedload(Profesional.portfolio_items).joinedload(PortfolioItem.imagenes),
-    ).filter(
-        Profesional.id == prof_uuid
-    ).first()
-    
-    if not professional:
+    perfil = get_public_profile(db, prof_uuid)
+    if perfil is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profesional no encontrado"
         )
     
-    # Verificar que el usuario esté activo y el KYC aprobado
-    user = professional.usuario
-    if not user or not user.is_active or professional.estado_verificacion != VerificationStatus.APROBADO:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profesional no disponible"
-        )
-    
-    # Cargar reseñas manualmente (relación no directa)
-    resenas = db.query(Resena).filter(
-        Resena.profesional_id == prof_uuid
-    ).all()
-    professional.resenas_recibidas = resenas
+    return JSONResponse(content=perfil)
+
+@app.get("/public/professional/{prof_id}/resenas", response_model=List[ResenaPublicRead])
+async def get_public_professional_resenas(
+    prof_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Reseñas públicas de un profesional, paginadas de la más reciente a la más antigua"""
+    try:
+        prof_uuid = UUID(prof_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ID de profesional inválido")
     
-    return PublicProfileResponse.from_professional(professional)
+    return get_resenas_publicas(db, prof_uuid, skip=skip, limit=limit)
 
 @app.get("/public/professional/{prof_id}/portfolio", response_model=List[PortfolioResponse])
 async def get_public_portfolio(
@@ -778,19 +763,24 @@ async def get_public_portfolio(
     return portfolio_items
 
 @app.get("/public/oficios")
-async def get_all_oficios(
+def get_all_oficios(
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Obtiene lista de todos los oficios disponibles con sus IDs"""
-    oficios = db.query(Oficio).all()
-    result = []
-    for oficio in oficios:
-        result.append({
-            "id": str(oficio.id),
-            "nombre": oficio.nombre,
-            "descripcion": oficio.descripcion
-        })
-    return result
+    """
+    Obtiene lista de todos los oficios disponibles con sus IDs.
+
+    Se sirve desde el registro en memoria con un ETag del contenido: si el
+    cliente manda If-None-Match con el mismo ETag se responde 304 sin cuerpo.
+    """
+    registro = obtener_registro(db)
+    headers = {"ETag": registro.etag, "Cache-Control": "public, max-age=60"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        if "*" in etags or registro.etag in etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=registro.json, media_type="application/json", headers=headers)
 
 # ============================================================================
 # ADMIN ENDPOINTS
@@ -840,6 +830,7 @@ async def approve_kyc(
     professional.estado_verificacion = VerificationStatus.APROBADO
     
     db.commit()
+    invalidate_public_profile(professional.id)
     
     return {"message": "KYC aprobado correctamente"}
 
@@ -870,6 +861,7 @@ async def reject_kyc(
     professional.estado_verificacion = VerificationStatus.RECHAZADO
     
     db.commit()
+    invalidate_public_profile(professional.id)
     
     return {"message": "KYC rechazado", "reason": request.razon}
 
@@ -904,6 +896,11 @@ async def ban_user(
     user.is_active = False
     db.commit()
     
+    # El perfil público deja de (o vuelve a) ser visible
+    professional_id = db.query(Profesional.id).filter(Profesional.usuario_id == user.id).scalar()
+    if professional_id:
+        invalidate_public_profile(professional_id)
+    
     return {"message": f"Usuario {user.email} baneado correctamente", "reason": request.reason}
 
 @app.put("/admin/users/{user_id}/unban")
@@ -930,8 +927,30 @@ async def unban_user(
     user.is_active = True
     db.commit()
     
+    # El perfil público deja de (o vuelve a) ser visible
+    professional_id = db.query(Profesional.id).filter(Profesional.usuario_id == user.id).scalar()
+    if professional_id:
+        invalidate_public_profile(professional_id)
+    
     return {"message": f"Usuario {user.email} desbaneado correctamente"}
 
+@app.get("/admin/cache/keys")
+async def get_cache_key_stats(
+    top: int = Query(20, ge=1, le=200, description="Cantidad de keys calientes/frías"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Hit ratio por familia de keys y keys más/menos leídas de esta réplica
+    (solo admin). Sirve para ajustar TTLs; el agregado está en /metrics.
+    """
+    if current_user.rol != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden acceder a este endpoint"
+        )
+    
+    return key_stats.snapshot(top=top)
+
 # ============================================================================
 # SERVICIOS INSTANTÁNEOS (PROYECTOS PUBLICADOS POR PROFESIONALES)
 # ============================================================================
@@ -1132,9 +1151,13 @@ async def listar_servicios_publicos(
     
     servicios = query.all()
     
-    # Enriquecer con información del profesional y oficio
+    # Profesionales y oficios de toda la página en un lote (caché + una consulta por los faltantes)
+    profesionales = resumenes_profesionales(db, {servicio.profesional_id for servicio in servicios})
+    oficios = resumenes_oficios(db, {servicio.oficio_id for servicio in servicios})
+    
     resultado = []
     for servicio in servicios:
+        profesional = profesionales.get(str(servicio.profesional_id))
         servicio_dict = {
             "id": servicio.id,
             "nombre": servicio.nombre,
@@ -1144,18 +1167,14 @@ async def listar_servicios_publicos(
             "profesional_id": servicio.profesional_id,
             "fecha_creacion": servicio.fecha_creacion,
             "profesional": {
-                "id": servicio.profesional.id,
-                "user_id": servicio.profesional.usuario_id,
-                "nombre": servicio.profesional.user.full_name if servicio.profesional.user else None,
-                "email": servicio.profesional.user.email if servicio.profesional.user else None,
-                "nivel": servicio.profesional.nivel.value if servicio.profesional.nivel else None,
-                "rating_promedio": float(servicio.profesional.rating_promedio) if servicio.profesional.rating_promedio else 0.0,
-            } if servicio.profesional else None,
-            "oficio": {
-                "id": servicio.oficio.id,
-                "nombre": servicio.oficio.nombre,
-                "categoria": servicio.oficio.categoria,
-            } if servicio.oficio else None,
+                "id": profesional["id"],
+                "user_id": profesional["user_id"],
+                "nombre": profesional["nombre"],
+                "email": profesional["email"],
+                "nivel": profesional["nivel"],
+                "rating_promedio": profesional["rating_promedio"],
+            } if profesional else None,
+            "oficio": oficios.get(str(servicio.oficio_id)),
         }
         resultado.append(servicio_dict)
     
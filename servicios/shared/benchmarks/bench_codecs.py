@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialización de valores cacheados.
+
+Compara, sobre payloads con la forma de los que guarda la caché:
+- legacy: json.dumps(default=str) / json.loads, lo que usaba CacheManager.
+- cada codec de shared.cache.codecs instalado (json, orjson, msgpack), sin
+  compresión y con cada compresor instalado (zstd, lz4).
+
+Payloads:
+- búsqueda: una página de resultados de SearchCache (ProfessionalSearchResult
+  con UUID, Decimal y float).
+- perfil: el perfil público de ProfessionalCache (oficios, portfolio con
+  imágenes, reseñas recientes con fechas).
+
+No necesita Redis. Los codecs/compresores que no estén instalados se saltean.
+
+Uso (desde servicios/):
+    python -m shared.benchmarks.bench_codecs --iteraciones 2000
+"""
+import argparse
+import datetime
+import json
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from shared.cache import codecs
+from shared.cache.codecs import Codec
+
+NIVELES = ["BRONCE", "PLATA", "ORO", "DIAMANTE"]
+OFICIOS = ["Plomería", "Electricidad", "Gasista", "Carpintería", "Pintura", "Albañilería"]
+
+
+def _payload_busqueda(resultados: int = 100) -> dict:
+    return {
+        "total": 1234,
+        "pagina": 1,
+        "total_paginas": 13,
+        "resultados": [
+            {
+                "id": uuid.uuid4(),
+                "nombre": f"Nombre{i}",
+                "apellido": f"Apellido{i}",
+                "oficio": random.choice(OFICIOS),
+                "tarifa_por_hora": Decimal(random.randint(3000, 20000)) / 100,
+                "calificacion_promedio": round(random.uniform(1, 5), 2),
+                "cantidad_resenas": random.randint(0, 300),
+                "distancia_km": round(random.uniform(0, 30), 3),
+                "nivel_profesional": random.choice(NIVELES),
+                "puntos_experiencia": random.randint(0, 10000),
+                "avatar_url": f"https://cdn.example.com/avatars/{i}.jpg",
+            }
+            for i in range(resultados)
+        ],
+    }
+
+
+def _payload_perfil(items: int = 8, imagenes: int = 4, resenas: int = 10) -> dict:
+    ahora = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "id": uuid.uuid4(),
+        "nombre": "Juan",
+        "apellido": "Pérez",
+        "avatar_url": "https://cdn.example.com/avatars/juan.jpg",
+        "nivel": "ORO",
+        "radio_cobertura_km": 15,
+        "acepta_instant": True,
+        "tarifa_por_hora": Decimal("8500.00"),
+        "rating_promedio": 4.71,
+        "total_resenas": 128,
+        "oficios": [{"id": uuid.uuid4(), "nombre": nombre, "descripcion": f"Trabajos de {nombre.lower()}"}
+                    for nombre in OFICIOS[:3]],
+        "portfolio": [
+            {
+                "id": uuid.uuid4(),
+                "titulo": f"Trabajo {i}",
+                "descripcion": "Instalación completa con materiales incluidos. " * 3,
+                "fecha_creacion": ahora - datetime.timedelta(days=30 * i),
+                "imagenes": [
+                    {"id": uuid.uuid4(), "imagen_url": f"https://cdn.example.com/portfolio/{i}/{j}.jpg", "orden": j}
+                    for j in range(imagenes)
+                ],
+            }
+            for i in range(items)
+        ],
+        "resenas": [
+            {
+                "id": uuid.uuid4(),
+                "rating": random.randint(3, 5),
+                "texto_resena": "Muy buen trabajo, puntual y prolijo. Lo recomiendo.",
+                "nombre_cliente": f"Cliente {i}",
+                "fecha_creacion": ahora - datetime.timedelta(days=i),
+            }
+            for i in range(resenas)
+        ],
+        "distribucion_ratings": {"1": 2, "2": 3, "3": 10, "4": 33, "5": 80},
+    }
+
+
+def _medir(nombre: str, encode, decode, payload, iteraciones: int):
+    data = encode(payload)
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        encode(payload)
+    encode_us = (time.perf_counter() - inicio) / iteraciones * 1e6
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        decode(data)
+    decode_us = (time.perf_counter() - inicio) / iteraciones * 1e6
+    print(f"  {nombre:<16} {len(data):>8} B  encode={encode_us:8.1f}µs  decode={decode_us:8.1f}µs")
+
+
+def _configuraciones():
+    """(codec, compresión) instalados, sin repetir los que caen en fallback"""
+    codecs_ok = [n for _, (n, dumps, _) in sorted(codecs._CODECS.items()) if dumps is not None]
+    compresores_ok = ["none"] + [n for _, (n, comp, _) in sorted(codecs._COMPRESSORS.items()) if comp is not None]
+    return [(c, z) for c in codecs_ok for z in compresores_ok]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteraciones", type=int, default=2000)
+    parser.add_argument("--min-bytes", type=int, default=1024, help="Umbral de compresión")
+    args = parser.parse_args()
+
+    random.seed(42)
+    payloads = {"búsqueda (100 resultados)": _payload_busqueda(), "perfil público": _payload_perfil()}
+
+    for titulo, payload in payloads.items():
+        print(f"\n{titulo}")
+        _medir("legacy json", lambda v: json.dumps(v, default=str), json.loads, payload, args.iteraciones)
+        for codec, compresion in _configuraciones():
+            c = Codec(codec, compresion, args.min_bytes)
+            _medir(c.nombre, c.encode, Codec.decode, payload, args.iteraciones)
+
+
+if __name__ == "__main__":
+    main()
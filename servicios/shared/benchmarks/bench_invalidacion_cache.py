@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: invalidar el caché de un profesional con millones de keys en Redis.
+
+Compara tres formas de invalidar "professional:{id}":
+- KEYS + DEL: lo que hacía CacheManager.delete_pattern; bloquea Redis
+  mientras recorre todo el keyspace.
+- SCAN + UNLINK: CacheManager.delete_pattern actual; recorre todo el
+  keyspace pero en lotes, sin bloquear a los demás clientes.
+- Tag: CacheManager.invalidate_tag, un INCR.
+
+Mientras corre cada invalidación, otro thread mide la latencia de PING,
+que es lo que ven los demás clientes de Redis (rate limiter, event bus,
+broker de Celery).
+
+Usa una base de Redis aparte (--db) y borra sus keys al terminar.
+
+Uso (desde servicios/):
+    REDIS_URL=redis://localhost:6379 \\
+        python -m shared.benchmarks.bench_invalidacion_cache --keys 5000000
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+import redis
+
+from shared.cache.cache_manager import CacheManager, professional_tag
+
+PREFIX = "bench"
+KEYS_POR_PROFESIONAL = 10
+
+
+class _MedidorPing(threading.Thread):
+    """Mide la latencia de PING en loop hasta que se lo detiene"""
+
+    def __init__(self, redis_url: str):
+        super().__init__(daemon=True)
+        self.client = redis.from_url(redis_url)
+        self.latencias = []
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.is_set():
+            inicio = time.perf_counter()
+            self.client.ping()
+            self.latencias.append((time.perf_counter() - inicio) * 1000)
+
+    def detener(self) -> list:
+        self._detener.set()
+        self.join()
+        return self.latencias
+
+
+def _poblar(client, total: int):
+    """Genera `total` keys repartidas en profesionales de KEYS_POR_PROFESIONAL keys"""
+    pipe = client.pipeline(transaction=False)
+    for i in range(total):
+        profesional, n = divmod(i, KEYS_POR_PROFESIONAL)
+        pipe.set(f"{PREFIX}:professional:{profesional}:k{n}", "x", ex=3600)
+        if i % 10_000 == 9_999:
+            pipe.execute()
+    pipe.execute()
+
+
+def _keys_del(client, profesional: int):
+    keys = client.keys(f"{PREFIX}:professional:{profesional}:*")
+    if keys:
+        client.delete(*keys)
+
+
+def _medir(nombre: str, redis_url: str, invalidar):
+    medidor = _MedidorPing(redis_url)
+    medidor.start()
+    time.sleep(0.2)
+    inicio = time.perf_counter()
+    invalidar()
+    duracion = (time.perf_counter() - inicio) * 1000
+    latencias = sorted(medidor.detener())
+    p99 = latencias[int(len(latencias) * 0.99) - 1] if latencias else 0.0
+    print(
+        f"{nombre:<14} invalidación={duracion:10.2f}ms  "
+        f"PING p50={statistics.median(latencias):7.2f}ms p99={p99:7.2f}ms max={latencias[-1]:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=5_000_000)
+    parser.add_argument("--db", type=int, default=15, help="Base de Redis a usar (se vacía al terminar)")
+    args = parser.parse_args()
+
+    redis_url = f"{os.environ.get('REDIS_URL', 'redis://localhost:6379').rstrip('/')}/{args.db}"
+    client = redis.from_url(redis_url)
+    cache = CacheManager(redis_url, prefix=PREFIX)
+
+    try:
+        print(f"Generando {args.keys} keys...")
+        _poblar(client, args.keys)
+        print(f"dbsize={client.dbsize()}\n")
+
+        # Cada estrategia invalida un profesional distinto
+        _medir("KEYS + DEL", redis_url, lambda: _keys_del(client, 1))
+        _medir("SCAN + UNLINK", redis_url, lambda: cache.delete_pattern("professional:2:*"))
+        _medir("tag (INCR)", redis_url, lambda: cache.invalidate_tag(professional_tag("3")))
+    finally:
+        print("\nLimpiando...")
+        cache.clear_all()
+
+
+if __name__ == "__main__":
+    main()
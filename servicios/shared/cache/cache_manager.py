@@ -1,46 +1,171 @@
 """
 Sistema de caché distribuido usando Redis.
 Incluye decoradores, invalidación automática y TTL configurable.
+
+Invalidación:
+- Por tag (preferida): cada tag tiene un contador de generación en Redis y
+  las entradas taggeadas incluyen en su key la generación vigente de sus
+  tags. Invalidar un tag es un INCR, O(1); las entradas viejas quedan
+  inaccesibles y expiran por TTL.
+- Por patrón: SCAN + UNLINK en lotes. No bloquea Redis como KEYS, pero
+  recorre todo el keyspace; usar solo para mantenimiento.
+
+Las familias de keys más leídas (perfiles, catálogo de oficios) se piden con
+local=True y se sirven además desde una L1 en memoria (ver local_cache).
+
+Los valores se serializan con el codec de CACHE_CODEC (msgpack por defecto,
+ver codecs), con compresión opcional para payloads grandes.
 """
-import json
-import redis
+import asyncio
 import functools
-import hashlib
+import inspect
 import logging
-from typing import Any, Optional, Callable
+import math
+import random
+import time
+import uuid
+from typing import Any, Optional, Callable, Dict, Hashable, Iterable, List
 from datetime import timedelta
 
+from shared.cache.codecs import Codec, CodecError
+from shared.cache.instrumentation import record_operation, record_read, record_write
+from shared.cache.keys import canonical_hash, make_key_builder
+from shared.cache.local_cache import LocalCache, mensaje_invalidacion
+from shared.core.config import settings
+from shared.core.redis_client import get_redis, get_async_redis
+
+try:
+    from shared.monitoring.metrics import MetricsCollector
+except ImportError:  # prometheus_client no está instalado en todos los servicios
+    MetricsCollector = None
+
 logger = logging.getLogger(__name__)
 
+# Keys por iteración de SCAN y por UNLINK
+SCAN_BATCH_SIZE = 1000
+
+# Libera un lease solo si sigue siendo de quien lo tomó (compare-and-delete)
+RELEASE_LEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Token de lease cuando Redis no responde: se recalcula sin coordinar
+LEASE_SIN_REDIS = "sin-redis"
+
+# Cada cuánto se revisa si otro worker ya dejó el valor mientras se espera un lease
+LEASE_POLL_SECONDS = 0.05
+
+# TTL de las entradas taggeadas guardadas sin TTL: al invalidar un tag la
+# entrada vieja no se borra, así que siempre tiene que poder expirar
+TAGGED_DEFAULT_TTL = 86400
+
+
+def _with_versions(key: str, versions: list) -> str:
+    """Key con las generaciones de sus tags (en el orden de los tags ordenados)"""
+    return f"{key}@" + ".".join(v.decode() if v else "0" for v in versions)
+
+
+def _decode_hit(key: str, raw: bytes) -> Optional[Any]:
+    """Decodifica un valor leído de Redis; un formato no soportado es un miss"""
+    try:
+        return Codec.decode(raw)
+    except CodecError as e:
+        logger.debug(f"Cache MISS (formato no soportado): {key}: {e}")
+        return None
+
+
+def _default_codec() -> Codec:
+    return Codec(settings.CACHE_CODEC, settings.CACHE_COMPRESSION, settings.CACHE_COMPRESSION_MIN_BYTES)
+
 
 class CacheManager:
-    """Gestor de caché distribuido con Redis"""
+    """Gestor de caché distribuido con Redis, con L1 en memoria opcional"""
     
-    def __init__(self, redis_url: str = "redis://redis:6379", prefix: str = "cache"):
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "cache",
+                 local_cache: Optional[LocalCache] = None):
+        # Cliente binario: los valores llevan el header de codecs
+        self.redis_client = get_redis(redis_url, decode_responses=False)
+        self.codec = _default_codec()
         self.prefix = prefix
+        self.local_cache = local_cache
+        self.invalidation_channel = f"{prefix}:invalidaciones"
+        
+        if local_cache is not None:
+            local_cache.subscribe(self.redis_client, self.invalidation_channel)
+    
+    def _publish_invalidation(self, **kwargs):
+        """Avisa a las demás réplicas que borren entradas de su L1"""
+        if self.local_cache is None:
+            return
+        try:
+            self.redis_client.publish(self.invalidation_channel, mensaje_invalidacion(**kwargs))
+        except Exception as e:
+            logger.error(f"Error publicando invalidación de cache: {str(e)}")
     
     def _make_key(self, key: str) -> str:
         """Crea una key con prefijo"""
         return f"{self.prefix}:{key}"
     
-    def get(self, key: str) -> Optional[Any]:
+    def _tag_key(self, tag: str) -> str:
+        """Key del contador de generación de un tag"""
+        return self._make_key(f"tag:{tag}")
+    
+    def _versioned_key(self, key: str, tags: Optional[Iterable[str]]) -> str:
+        """
+        Agrega a la key la generación vigente de cada tag (ej: "k@3.0").
+        Cuesta un MGET de los contadores.
+        """
+        if not tags:
+            return key
+        tags = sorted(set(tags))
+        versions = self.redis_client.mget([self._tag_key(tag) for tag in tags])
+        return _with_versions(key, versions)
+    
+    def _versioned_keys(self, keys: List[str], tags: Optional[Iterable[str]]) -> List[str]:
+        """_versioned_key para varias keys con los mismos tags (un solo MGET)"""
+        if not tags:
+            return keys
+        tags = sorted(set(tags))
+        versions = self.redis_client.mget([self._tag_key(tag) for tag in tags])
+        return [_with_versions(key, versions) for key in keys]
+    
+    def get(self, key: str, tags: Optional[Iterable[str]] = None, local: bool = False) -> Optional[Any]:
         """
         Obtiene un valor del caché.
         
         Args:
             key: Clave del valor
+            tags: Tags con los que se guardó el valor (ver invalidate_tag)
+            local: Buscar primero en la L1 del proceso (y guardar ahí el
+                   valor leído de Redis)
             
         Returns:
             El valor cacheado o None si no existe
         """
+        inicio = time.perf_counter()
         try:
-            cache_key = self._make_key(key)
-            value = self.redis_client.get(cache_key)
+            use_local = local and self.local_cache is not None
+            if use_local:
+                value = self.local_cache.get(key)
+                if value is not None:
+                    logger.debug(f"Cache L1 HIT: {key}")
+                    record_read("get_l1", key, True, time.perf_counter() - inicio)
+                    return value
+            
+            cache_key = self._make_key(self._versioned_key(key, tags))
+            raw = self.redis_client.get(cache_key)
+            
+            value = _decode_hit(key, raw) if raw is not None else None
+            record_read("get", key, value is not None, time.perf_counter() - inicio, len(raw) if value is not None else 0)
             
             if value is not None:
                 logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
+                if use_local:
+                    self.local_cache.set(key, value, size=len(raw), tags=tags)
+                return value
             
             logger.debug(f"Cache MISS: {key}")
             return None
@@ -49,68 +174,294 @@ class CacheManager:
             logger.error(f"Error obteniendo del cache: {str(e)}")
             return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[Iterable[str]] = None,
+            local: bool = False):
         """
         Guarda un valor en el caché.
         
         Args:
             key: Clave del valor
             value: Valor a cachear
-            ttl: Tiempo de vida en segundos (None = sin expiración)
+            ttl: Tiempo de vida en segundos (None = sin expiración;
+                 con tags, TAGGED_DEFAULT_TTL)
+            tags: Tags para invalidar el valor en bloque (ej: "professional:123")
+            local: Guardar también en la L1 del proceso (y avisar a las demás
+                   réplicas que descarten su copia)
         """
+        inicio = time.perf_counter()
         try:
-            cache_key = self._make_key(key)
-            serialized_value = json.dumps(value, default=str)
+            if tags and not ttl:
+                ttl = TAGGED_DEFAULT_TTL
+            cache_key = self._make_key(self._versioned_key(key, tags))
+            serialized_value = self.codec.encode(value)
             
             if ttl:
                 self.redis_client.setex(cache_key, ttl, serialized_value)
             else:
                 self.redis_client.set(cache_key, serialized_value)
             
+            if local and self.local_cache is not None:
+                self.local_cache.set(key, value, size=len(serialized_value), ttl=ttl, tags=tags)
+                self._publish_invalidation(keys=[key])
+            
+            record_write("set", key, time.perf_counter() - inicio, len(serialized_value))
             logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
             
         except Exception as e:
             logger.error(f"Error guardando en cache: {str(e)}")
     
-    def delete(self, key: str):
+    def delete(self, key: str, tags: Optional[Iterable[str]] = None):
         """Elimina un valor del caché"""
+        inicio = time.perf_counter()
         try:
-            cache_key = self._make_key(key)
-            self.redis_client.delete(cache_key)
+            cache_key = self._make_key(self._versioned_key(key, tags))
+            self.redis_client.unlink(cache_key)
+            if self.local_cache is not None:
+                self.local_cache.delete(key)
+                self._publish_invalidation(keys=[key])
+            record_operation("delete", key, time.perf_counter() - inicio)
             logger.debug(f"Cache DELETE: {key}")
         except Exception as e:
             logger.error(f"Error eliminando del cache: {str(e)}")
     
-    def delete_pattern(self, pattern: str):
+    # ------------------------------------------------------------------
+    # Operaciones por lotes
+    # ------------------------------------------------------------------
+    
+    def get_many(self, keys: Iterable[str], tags: Optional[Iterable[str]] = None,
+                 local: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene varios valores con un solo MGET.
+        
+        Args:
+            keys: Claves de los valores
+            tags: Tags comunes a todas las entradas (ver invalidate_tag)
+            local: Buscar primero en la L1 del proceso (y guardar ahí lo leído
+                   de Redis)
+            
+        Returns:
+            Dict clave -> valor, solo con los hits
+        """
+        found: Dict[str, Any] = {}
+        pending = list(dict.fromkeys(keys))
+        total = len(pending)
+        inicio = time.perf_counter()
+        try:
+            use_local = local and self.local_cache is not None
+            if use_local:
+                pending = [key for key in pending if not self._get_local(key, found)]
+            if not pending:
+                return found
+            
+            cache_keys = [self._make_key(k) for k in self._versioned_keys(pending, tags)]
+            for key, raw in zip(pending, self.redis_client.mget(cache_keys)):
+                value = _decode_hit(key, raw) if raw is not None else None
+                record_read("get_many", key, value is not None, 0, len(raw) if value is not None else 0)
+                if value is None:
+                    continue
+                found[key] = value
+                if use_local:
+                    self.local_cache.set(key, value, size=len(raw), tags=tags)
+            
+            record_operation("get_many", pending[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache MGET: {len(found)}/{total} hits")
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo del cache: {str(e)}")
+        return found
+    
+    def _get_local(self, key: str, found: Dict[str, Any]) -> bool:
+        """Copia a `found` el valor de la L1 si está; devuelve si hubo hit"""
+        value = self.local_cache.get(key)
+        if value is None:
+            return False
+        found[key] = value
+        record_read("get_l1", key, True, 0)
+        return True
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 tags: Optional[Iterable[str]] = None, local: bool = False):
+        """
+        Guarda varios valores con un pipeline de SET EX (un round trip).
+        
+        Args: ver set; `tags` son comunes a todas las entradas.
+        """
+        if not items:
+            return
+        inicio = time.perf_counter()
+        try:
+            if tags and not ttl:
+                ttl = TAGGED_DEFAULT_TTL
+            keys = list(items)
+            pipe = self.redis_client.pipeline(transaction=False)
+            encoded = {}
+            for key, cache_key in zip(keys, self._versioned_keys(keys, tags)):
+                encoded[key] = self.codec.encode(items[key])
+                record_write("set_many", key, 0, len(encoded[key]))
+                pipe.set(self._make_key(cache_key), encoded[key], ex=ttl or None)
+            pipe.execute()
+            
+            if local and self.local_cache is not None:
+                for key in keys:
+                    self.local_cache.set(key, items[key], size=len(encoded[key]), ttl=ttl, tags=tags)
+                self._publish_invalidation(keys=keys)
+            
+            record_operation("set_many", keys[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache MSET: {len(keys)} keys (TTL: {ttl}s)")
+            
+        except Exception as e:
+            logger.error(f"Error guardando en cache: {str(e)}")
+    
+    def delete_many(self, keys: Iterable[str], tags: Optional[Iterable[str]] = None):
+        """Elimina varios valores con un solo UNLINK"""
+        keys = list(keys)
+        if not keys:
+            return
+        inicio = time.perf_counter()
+        try:
+            self.redis_client.unlink(*[self._make_key(k) for k in self._versioned_keys(keys, tags)])
+            if self.local_cache is not None:
+                for key in keys:
+                    self.local_cache.delete(key)
+                self._publish_invalidation(keys=keys)
+            record_operation("delete_many", keys[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache DELETE: {len(keys)} keys")
+        except Exception as e:
+            logger.error(f"Error eliminando del cache: {str(e)}")
+    
+    def get_or_load_many(self, ids: Iterable[Hashable], key: Callable[[Any], str],
+                         loader: Callable[[List[Any]], Dict[Any, Any]], ttl: Optional[int] = None,
+                         tags: Optional[Iterable[str]] = None, local: bool = False) -> Dict[Any, Any]:
+        """
+        Read-through por lotes: un MGET para todas las entidades, una sola
+        llamada a `loader` con las que faltan y un pipeline para guardarlas.
+        
+        Args:
+            ids: Ids de las entidades
+            key: Id -> clave de caché
+            loader: Ids faltantes -> dict id -> valor. Los ids que no devuelve
+                    no existen y no se cachean.
+            ttl, tags, local: ver set
+            
+        Returns:
+            Dict id -> valor en el orden de `ids`, sin las entidades inexistentes
+        """
+        ids = list(dict.fromkeys(ids))
+        keys = {id_: key(id_) for id_ in ids}
+        hits = self.get_many(keys.values(), tags=tags, local=local)
+        
+        missing = [id_ for id_ in ids if keys[id_] not in hits]
+        loaded = loader(missing) if missing else {}
+        if loaded:
+            self.set_many({keys[id_]: value for id_, value in loaded.items()}, ttl=ttl, tags=tags, local=local)
+        
+        result = {}
+        for id_ in ids:
+            value = hits.get(keys[id_], loaded.get(id_))
+            if value is not None:
+                result[id_] = value
+        return result
+    
+    def invalidate_tag(self, tag: str):
+        """
+        Invalida todas las entradas guardadas con un tag, en O(1).
+        
+        Incrementa la generación del tag: las keys de las entradas existentes
+        dejan de coincidir con las que se calculan a partir de ahora.
+        """
+        inicio = time.perf_counter()
+        try:
+            self.redis_client.incr(self._tag_key(tag))
+            if self.local_cache is not None:
+                self.local_cache.invalidate_tag(tag)
+                self._publish_invalidation(tags=[tag])
+            record_operation("invalidate_tag", f"tag:{tag}", time.perf_counter() - inicio)
+            logger.debug(f"Cache INVALIDATE tag: {tag}")
+        except Exception as e:
+            logger.error(f"Error invalidando tag del cache: {str(e)}")
+    
+    def tag_version(self, tag: str) -> Optional[int]:
+        """
+        Generación vigente de un tag (0 si nunca se invalidó), para datos
+        cacheados fuera de Redis que se recargan cuando cambia.
+        
+        Returns:
+            La generación, o None si Redis no responde
+        """
+        try:
+            return int(self.redis_client.get(self._tag_key(tag)) or 0)
+        except Exception as e:
+            logger.error(f"Error leyendo generación del tag {tag}: {str(e)}")
+            return None
+    
+    def _unlink_matching(self, pattern: str) -> int:
+        """
+        Borra las keys que coinciden con un patrón (ya prefijado).
+        
+        SCAN recorre el keyspace de a SCAN_BATCH_SIZE keys por llamada, así
+        Redis atiende a los demás clientes entre llamadas; UNLINK libera la
+        memoria en un thread aparte. Los UNLINK se encolan en un pipeline
+        que se envía cada SCAN_BATCH_SIZE keys.
+        """
+        deleted = 0
+        batch: List[str] = []
+        pipe = self.redis_client.pipeline(transaction=False)
+        
+        for key in self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                pipe.unlink(*batch)
+                pipe.execute()
+                deleted += len(batch)
+                batch = []
+        
+        if batch:
+            pipe.unlink(*batch)
+            pipe.execute()
+            deleted += len(batch)
+        
+        return deleted
+    
+    def delete_pattern(self, pattern: str) -> int:
         """
         Elimina todas las keys que coincidan con un patrón.
         
+        Recorre todo el keyspace (SCAN): para invalidar entidades usar tags.
+        
         Args:
             pattern: Patrón (ej: "user:*", "professional:123:*")
+            
+        Returns:
+            Cantidad de keys eliminadas
         """
         try:
-            cache_pattern = self._make_key(pattern)
-            keys = self.redis_client.keys(cache_pattern)
-            
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.debug(f"Cache DELETE pattern: {pattern} ({len(keys)} keys)")
+            deleted = self._unlink_matching(self._make_key(pattern))
+            # La L1 no se indexa por patrón: se vacía entera
+            if self.local_cache is not None:
+                self.local_cache.clear()
+                self._publish_invalidation(clear=True)
+            if deleted:
+                logger.debug(f"Cache DELETE pattern: {pattern} ({deleted} keys)")
+            return deleted
                 
         except Exception as e:
             logger.error(f"Error eliminando patrón del cache: {str(e)}")
+            return 0
     
-    def clear_all(self):
+    def clear_all(self) -> int:
         """Limpia todo el caché con el prefijo actual"""
         try:
-            pattern = self._make_key("*")
-            keys = self.redis_client.keys(pattern)
-            
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"Cache limpiado: {len(keys)} keys eliminadas")
+            deleted = self._unlink_matching(self._make_key("*"))
+            if self.local_cache is not None:
+                self.local_cache.clear()
+                self._publish_invalidation(clear=True)
+            if deleted:
+                logger.info(f"Cache limpiado: {deleted} keys eliminadas")
+            return deleted
                 
         except Exception as e:
             logger.error(f"Error limpiando cache: {str(e)}")
+            return 0
     
     def exists(self, key: str) -> bool:
         """Verifica si una key existe en el caché"""
@@ -121,6 +472,33 @@ class CacheManager:
             logger.error(f"Error verificando existencia en cache: {str(e)}")
             return False
     
+    def _lease_key(self, key: str) -> str:
+        return self._make_key(f"lease:{key}")
+    
+    def acquire_lease(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """
+        Toma el lease de recálculo de una key (SET NX PX).
+        
+        Returns:
+            Token para liberar el lease, o None si lo tiene otro worker
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_client.set(self._lease_key(key), token, nx=True, px=int(ttl_seconds * 1000))
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Error tomando lease de cache: {str(e)}")
+            return LEASE_SIN_REDIS
+    
+    def release_lease(self, key: str, token: str):
+        """Libera el lease si todavía es nuestro (puede haber expirado y tomado otro)"""
+        if token == LEASE_SIN_REDIS:
+            return
+        try:
+            self.redis_client.eval(RELEASE_LEASE_LUA, 1, self._lease_key(key), token)
+        except Exception as e:
+            logger.error(f"Error liberando lease de cache: {str(e)}")
+    
     def get_ttl(self, key: str) -> Optional[int]:
         """Obtiene el tiempo de vida restante de una key en segundos"""
         try:
@@ -132,16 +510,324 @@ class CacheManager:
             return None
 
 
-# Instancia global del cache manager
+class AsyncCacheManager(CacheManager):
+    """
+    Variante de CacheManager para código async (redis.asyncio).
+    
+    Mismas keys, tags y formato que CacheManager: ambos leen y escriben las
+    mismas entradas. Comparte la L1 del CacheManager síncrono del proceso,
+    que es quien escucha el canal de invalidaciones.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "cache",
+                 local_cache: Optional[LocalCache] = None):
+        self.redis_client = get_async_redis(redis_url, decode_responses=False)
+        self.codec = _default_codec()
+        self.prefix = prefix
+        self.local_cache = local_cache
+        self.invalidation_channel = f"{prefix}:invalidaciones"
+    
+    async def _publish_invalidation(self, **kwargs):
+        if self.local_cache is None:
+            return
+        try:
+            await self.redis_client.publish(self.invalidation_channel, mensaje_invalidacion(**kwargs))
+        except Exception as e:
+            logger.error(f"Error publicando invalidación de cache: {str(e)}")
+    
+    async def _versioned_key(self, key: str, tags: Optional[Iterable[str]]) -> str:
+        if not tags:
+            return key
+        tags = sorted(set(tags))
+        versions = await self.redis_client.mget([self._tag_key(tag) for tag in tags])
+        return _with_versions(key, versions)
+    
+    async def _versioned_keys(self, keys: List[str], tags: Optional[Iterable[str]]) -> List[str]:
+        if not tags:
+            return keys
+        tags = sorted(set(tags))
+        versions = await self.redis_client.mget([self._tag_key(tag) for tag in tags])
+        return [_with_versions(key, versions) for key in keys]
+    
+    async def get(self, key: str, tags: Optional[Iterable[str]] = None, local: bool = False) -> Optional[Any]:
+        """Obtiene un valor del caché (ver CacheManager.get)"""
+        inicio = time.perf_counter()
+        try:
+            use_local = local and self.local_cache is not None
+            if use_local:
+                value = self.local_cache.get(key)
+                if value is not None:
+                    logger.debug(f"Cache L1 HIT: {key}")
+                    record_read("get_l1", key, True, time.perf_counter() - inicio)
+                    return value
+            
+            cache_key = self._make_key(await self._versioned_key(key, tags))
+            raw = await self.redis_client.get(cache_key)
+            
+            value = _decode_hit(key, raw) if raw is not None else None
+            record_read("get", key, value is not None, time.perf_counter() - inicio, len(raw) if value is not None else 0)
+            
+            if value is not None:
+                logger.debug(f"Cache HIT: {key}")
+                if use_local:
+                    self.local_cache.set(key, value, size=len(raw), tags=tags)
+                return value
+            
+            logger.debug(f"Cache MISS: {key}")
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo del cache: {str(e)}")
+            return None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[Iterable[str]] = None,
+                  local: bool = False):
+        """Guarda un valor en el caché (ver CacheManager.set)"""
+        inicio = time.perf_counter()
+        try:
+            if tags and not ttl:
+                ttl = TAGGED_DEFAULT_TTL
+            cache_key = self._make_key(await self._versioned_key(key, tags))
+            serialized_value = self.codec.encode(value)
+            
+            if ttl:
+                await self.redis_client.setex(cache_key, ttl, serialized_value)
+            else:
+                await self.redis_client.set(cache_key, serialized_value)
+            
+            if local and self.local_cache is not None:
+                self.local_cache.set(key, value, size=len(serialized_value), ttl=ttl, tags=tags)
+                await self._publish_invalidation(keys=[key])
+            
+            record_write("set", key, time.perf_counter() - inicio, len(serialized_value))
+            logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
+            
+        except Exception as e:
+            logger.error(f"Error guardando en cache: {str(e)}")
+    
+    async def delete(self, key: str, tags: Optional[Iterable[str]] = None):
+        """Elimina un valor del caché"""
+        inicio = time.perf_counter()
+        try:
+            cache_key = self._make_key(await self._versioned_key(key, tags))
+            await self.redis_client.unlink(cache_key)
+            if self.local_cache is not None:
+                self.local_cache.delete(key)
+                await self._publish_invalidation(keys=[key])
+            record_operation("delete", key, time.perf_counter() - inicio)
+            logger.debug(f"Cache DELETE: {key}")
+        except Exception as e:
+            logger.error(f"Error eliminando del cache: {str(e)}")
+    
+    async def get_many(self, keys: Iterable[str], tags: Optional[Iterable[str]] = None,
+                       local: bool = False) -> Dict[str, Any]:
+        """Obtiene varios valores con un solo MGET (ver CacheManager.get_many)"""
+        found: Dict[str, Any] = {}
+        pending = list(dict.fromkeys(keys))
+        total = len(pending)
+        inicio = time.perf_counter()
+        try:
+            use_local = local and self.local_cache is not None
+            if use_local:
+                pending = [key for key in pending if not self._get_local(key, found)]
+            if not pending:
+                return found
+            
+            cache_keys = [self._make_key(k) for k in await self._versioned_keys(pending, tags)]
+            for key, raw in zip(pending, await self.redis_client.mget(cache_keys)):
+                value = _decode_hit(key, raw) if raw is not None else None
+                record_read("get_many", key, value is not None, 0, len(raw) if value is not None else 0)
+                if value is None:
+                    continue
+                found[key] = value
+                if use_local:
+                    self.local_cache.set(key, value, size=len(raw), tags=tags)
+            
+            record_operation("get_many", pending[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache MGET: {len(found)}/{total} hits")
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo del cache: {str(e)}")
+        return found
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                       tags: Optional[Iterable[str]] = None, local: bool = False):
+        """Guarda varios valores con un pipeline de SET EX (ver CacheManager.set_many)"""
+        if not items:
+            return
+        inicio = time.perf_counter()
+        try:
+            if tags and not ttl:
+                ttl = TAGGED_DEFAULT_TTL
+            keys = list(items)
+            pipe = self.redis_client.pipeline(transaction=False)
+            encoded = {}
+            for key, cache_key in zip(keys, await self._versioned_keys(keys, tags)):
+                encoded[key] = self.codec.encode(items[key])
+                record_write("set_many", key, 0, len(encoded[key]))
+                pipe.set(self._make_key(cache_key), encoded[key], ex=ttl or None)
+            await pipe.execute()
+            
+            if local and self.local_cache is not None:
+                for key in keys:
+                    self.local_cache.set(key, items[key], size=len(encoded[key]), ttl=ttl, tags=tags)
+                await self._publish_invalidation(keys=keys)
+            
+            record_operation("set_many", keys[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache MSET: {len(keys)} keys (TTL: {ttl}s)")
+            
+        except Exception as e:
+            logger.error(f"Error guardando en cache: {str(e)}")
+    
+    async def delete_many(self, keys: Iterable[str], tags: Optional[Iterable[str]] = None):
+        """Elimina varios valores con un solo UNLINK"""
+        keys = list(keys)
+        if not keys:
+            return
+        inicio = time.perf_counter()
+        try:
+            await self.redis_client.unlink(*[self._make_key(k) for k in await self._versioned_keys(keys, tags)])
+            if self.local_cache is not None:
+                for key in keys:
+                    self.local_cache.delete(key)
+                await self._publish_invalidation(keys=keys)
+            record_operation("delete_many", keys[0], time.perf_counter() - inicio)
+            logger.debug(f"Cache DELETE: {len(keys)} keys")
+        except Exception as e:
+            logger.error(f"Error eliminando del cache: {str(e)}")
+    
+    async def get_or_load_many(self, ids: Iterable[Hashable], key: Callable[[Any], str],
+                               loader: Callable[[List[Any]], Any], ttl: Optional[int] = None,
+                               tags: Optional[Iterable[str]] = None, local: bool = False) -> Dict[Any, Any]:
+        """
+        Read-through por lotes (ver CacheManager.get_or_load_many).
+        
+        `loader` puede ser una función común o una corrutina.
+        """
+        ids = list(dict.fromkeys(ids))
+        keys = {id_: key(id_) for id_ in ids}
+        hits = await self.get_many(keys.values(), tags=tags, local=local)
+        
+        missing = [id_ for id_ in ids if keys[id_] not in hits]
+        loaded = {}
+        if missing:
+            loaded = loader(missing)
+            if inspect.isawaitable(loaded):
+                loaded = await loaded
+        if loaded:
+            await self.set_many({keys[id_]: value for id_, value in loaded.items()}, ttl=ttl, tags=tags, local=local)
+        
+        result = {}
+        for id_ in ids:
+            value = hits.get(keys[id_], loaded.get(id_))
+            if value is not None:
+                result[id_] = value
+        return result
+    
+    async def invalidate_tag(self, tag: str):
+        """Invalida todas las entradas guardadas con un tag, en O(1)"""
+        inicio = time.perf_counter()
+        try:
+            await self.redis_client.incr(self._tag_key(tag))
+            if self.local_cache is not None:
+                self.local_cache.invalidate_tag(tag)
+                await self._publish_invalidation(tags=[tag])
+            record_operation("invalidate_tag", f"tag:{tag}", time.perf_counter() - inicio)
+            logger.debug(f"Cache INVALIDATE tag: {tag}")
+        except Exception as e:
+            logger.error(f"Error invalidando tag del cache: {str(e)}")
+    
+    async def tag_version(self, tag: str) -> Optional[int]:
+        """Generación vigente de un tag (ver CacheManager.tag_version)"""
+        try:
+            return int(await self.redis_client.get(self._tag_key(tag)) or 0)
+        except Exception as e:
+            logger.error(f"Error leyendo generación del tag {tag}: {str(e)}")
+            return None
+    
+    async def _unlink_matching(self, pattern: str) -> int:
+        deleted = 0
+        batch: List[str] = []
+        
+        async for key in self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                await self.redis_client.unlink(*batch)
+                deleted += len(batch)
+                batch = []
+        
+        if batch:
+            await self.redis_client.unlink(*batch)
+            deleted += len(batch)
+        
+        return deleted
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """Elimina todas las keys que coincidan con un patrón (SCAN + UNLINK)"""
+        try:
+            deleted = await self._unlink_matching(self._make_key(pattern))
+            if self.local_cache is not None:
+                self.local_cache.clear()
+                await self._publish_invalidation(clear=True)
+            if deleted:
+                logger.debug(f"Cache DELETE pattern: {pattern} ({deleted} keys)")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error eliminando patrón del cache: {str(e)}")
+            return 0
+    
+    async def clear_all(self) -> int:
+        """Limpia todo el caché con el prefijo actual"""
+        return await self.delete_pattern("*")
+    
+    async def exists(self, key: str) -> bool:
+        """Verifica si una key existe en el caché"""
+        try:
+            return bool(await self.redis_client.exists(self._make_key(key)))
+        except Exception as e:
+            logger.error(f"Error verificando existencia en cache: {str(e)}")
+            return False
+    
+    async def acquire_lease(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """Toma el lease de recálculo de una key (ver CacheManager.acquire_lease)"""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(self._lease_key(key), token, nx=True, px=int(ttl_seconds * 1000))
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Error tomando lease de cache: {str(e)}")
+            return LEASE_SIN_REDIS
+    
+    async def release_lease(self, key: str, token: str):
+        """Libera el lease si todavía es nuestro"""
+        if token == LEASE_SIN_REDIS:
+            return
+        try:
+            await self.redis_client.eval(RELEASE_LEASE_LUA, 1, self._lease_key(key), token)
+        except Exception as e:
+            logger.error(f"Error liberando lease de cache: {str(e)}")
+    
+    async def get_ttl(self, key: str) -> Optional[int]:
+        """Obtiene el tiempo de vida restante de una key en segundos"""
+        try:
+            ttl = await self.redis_client.ttl(self._make_key(key))
+            return ttl if ttl > 0 else None
+        except Exception as e:
+            logger.error(f"Error obteniendo TTL: {str(e)}")
+            return None
+
+
+# Instancias globales del cache manager (sync y async)
 _cache_manager: Optional[CacheManager] = None
+_async_cache_manager: Optional[AsyncCacheManager] = None
 
 
-def get_cache_manager(redis_url: str = "redis://redis:6379") -> CacheManager:
+def get_cache_manager(redis_url: Optional[str] = None) -> CacheManager:
     """
     Obtiene la instancia global del cache manager.
     
     Args:
-        redis_url: URL de conexión a Redis
+        redis_url: URL de conexión a Redis (default: settings.REDIS_URL)
         
     Returns:
         Instancia del CacheManager
@@ -149,67 +835,216 @@ def get_cache_manager(redis_url: str = "redis://redis:6379") -> CacheManager:
     global _cache_manager
     
     if _cache_manager is None:
-        _cache_manager = CacheManager(redis_url)
+        local_cache = None
+        if settings.CACHE_L1_ENABLED:
+            local_cache = LocalCache(
+                max_entries=settings.CACHE_L1_MAX_ENTRIES,
+                max_bytes=settings.CACHE_L1_MAX_BYTES,
+                ttl=settings.CACHE_L1_TTL,
+            )
+        _cache_manager = CacheManager(redis_url, local_cache=local_cache)
     
     return _cache_manager
 
 
-def _generate_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
-    """Genera una key única basada en la función y sus argumentos"""
-    # Crear un string con función, args y kwargs
-    key_parts = [func_name]
+def get_async_cache_manager(redis_url: Optional[str] = None) -> AsyncCacheManager:
+    """Obtiene la instancia global del cache manager async (comparte la L1 del sync)"""
+    global _async_cache_manager
     
-    # Agregar args (excluyendo self/cls si es un método)
-    for arg in args:
-        if not hasattr(arg, '__dict__'):  # Skip self/cls
-            key_parts.append(str(arg))
+    if _async_cache_manager is None:
+        _async_cache_manager = AsyncCacheManager(
+            redis_url, local_cache=get_cache_manager(redis_url).local_cache
+        )
     
-    # Agregar kwargs ordenados
-    for k, v in sorted(kwargs.items()):
-        key_parts.append(f"{k}={v}")
-    
-    # Crear hash MD5 del string completo
-    key_string = ":".join(key_parts)
-    key_hash = hashlib.md5(key_string.encode()).hexdigest()
+    return _async_cache_manager
+
+
+# ----------------------------------------------------------------------------
+# Entradas de @cached: valor + metadatos para recálculo anticipado
+# ----------------------------------------------------------------------------
+
+def _envolver(value: Any, delta: float, ttl: int) -> dict:
+    """
+    Entrada guardada por @cached.
+    v: resultado, d: segundos que tardó calcularlo, e: vencimiento lógico (epoch)
+    """
+    return {"__cached__": 1, "v": value, "d": delta, "e": time.time() + ttl}
+
+
+def _desenvolver(entry: Any) -> Optional[dict]:
+    """Entrada de @cached, o None si no hay (o tiene el formato anterior)"""
+    if isinstance(entry, dict) and entry.get("__cached__") == 1:
+        return entry
+    return None
+
+
+def _estado_entrada(entry: dict, beta: float) -> str:
+    """
+    "fresh", "early" o "stale".
     
-    return f"func:{func_name}:{key_hash}"
+    early (XFetch): antes del vencimiento, con probabilidad creciente a medida
+    que se acerca y proporcional a lo que cuesta recalcular (d), un caller
+    recalcula antes de tiempo; así los vencimientos no coinciden entre sí.
+    stale: pasado el vencimiento lógico, dentro de la ventana stale_ttl.
+    """
+    now = time.time()
+    if now >= entry["e"]:
+        return "stale"
+    if beta > 0 and now - entry["d"] * beta * math.log(1.0 - random.random()) >= entry["e"]:
+        return "early"
+    return "fresh"
+
+
+def _registrar_recalculo(func_name: str, reason: str):
+    if MetricsCollector is not None:
+        MetricsCollector.record_cache_recompute(func_name, reason)
+
 
+def _registrar_stale(func_name: str):
+    if MetricsCollector is not None:
+        MetricsCollector.record_cache_stale_served(func_name)
 
-def cached(ttl: int = 300, key_prefix: Optional[str] = None):
+
+def cached(ttl: int = 300, key_prefix: Optional[str] = None,
+           tags: Optional[Callable[..., Iterable[str]]] = None, local: bool = False,
+           stale_ttl: int = 0, xfetch_beta: float = 1.0, lock_timeout: float = 5.0,
+           version: int = 1, exclude: Iterable[str] = ()):
     """
     Decorador para cachear el resultado de una función.
     
+    Protege contra estampidas cuando una key muy pedida vence:
+    - Lease por key (SET NX PX): solo un worker recalcula; en un miss los
+      demás esperan hasta `lock_timeout` a que aparezca el valor.
+    - XFetch: cada lectura puede decidir recalcular antes del vencimiento
+      (`xfetch_beta` > 1 adelanta más, 0 lo desactiva).
+    - Stale-while-revalidate: con `stale_ttl` el valor se conserva ese tiempo
+      extra después de vencer; mientras un worker lo recalcula, el resto
+      recibe el valor viejo sin esperar.
+    
     Args:
         ttl: Tiempo de vida en segundos (default: 5 minutos)
         key_prefix: Prefijo personalizado para la key de caché
+        tags: Función que recibe los mismos argumentos y devuelve los tags
+              del resultado (para invalidarlo con invalidate_tag)
+        local: Servir también desde la L1 del proceso (datos muy leídos)
+        stale_ttl: Segundos que se sirve el valor vencido mientras se recalcula
+        xfetch_beta: Agresividad del recálculo anticipado
+        lock_timeout: Duración del lease y espera máxima en un miss
+        version: Versión del resultado; subirla al cambiar su forma descarta
+                 las entradas guardadas con la versión anterior
+        exclude: Argumentos que no cambian el resultado, además de db,
+                 session, request, etc. (ver keys.DEPENDENCY_ARGS)
         
     Ejemplo:
-        @cached(ttl=600)
+        @cached(ttl=600, stale_ttl=60, tags=lambda professional_id: [f"professional:{professional_id}"])
         def get_professional_profile(professional_id: int):
             # Esta función se cacheará por 10 minutos
             return db.query(Professional).filter(...).first()
+    
+    La key se arma con los argumentos ligados a sus nombres y canonicalizados
+    (ver keys): un argumento sin forma canónica es un TypeError al llamar.
+    
+    Con funciones `async def` usa el cliente async, sin bloquear el event loop.
     """
     def decorator(func: Callable) -> Callable:
+        func_name = key_prefix or func.__name__
+        build_key = make_key_builder(func, func_name, version=version, exclude=exclude)
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache = get_async_cache_manager()
+                cache_key = build_key(args, kwargs)
+                cache_tags = tags(*args, **kwargs) if tags else None
+                
+                async def recalcular(reason: str):
+                    _registrar_recalculo(func_name, reason)
+                    inicio = time.monotonic()
+                    result = await func(*args, **kwargs)
+                    entry = _envolver(result, time.monotonic() - inicio, ttl)
+                    await cache.set(cache_key, entry, ttl=ttl + stale_ttl, tags=cache_tags, local=local)
+                    return result
+                
+                entry = _desenvolver(await cache.get(cache_key, tags=cache_tags, local=local))
+                if entry is not None:
+                    estado = _estado_entrada(entry, xfetch_beta)
+                    if estado == "fresh":
+                        return entry["v"]
+                    token = await cache.acquire_lease(cache_key, lock_timeout)
+                    if token is None:
+                        # Otro worker está recalculando: servir lo que hay
+                        if estado == "stale":
+                            _registrar_stale(func_name)
+                        return entry["v"]
+                    try:
+                        return await recalcular(estado)
+                    finally:
+                        await cache.release_lease(cache_key, token)
+                
+                token = await cache.acquire_lease(cache_key, lock_timeout)
+                if token is None:
+                    limite = time.monotonic() + lock_timeout
+                    while time.monotonic() < limite:
+                        await asyncio.sleep(LEASE_POLL_SECONDS)
+                        entry = _desenvolver(await cache.get(cache_key, tags=cache_tags))
+                        if entry is not None:
+                            return entry["v"]
+                    return await recalcular("lock_timeout")
+                try:
+                    return await recalcular("miss")
+                finally:
+                    await cache.release_lease(cache_key, token)
+            
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             cache = get_cache_manager()
             
             # Generar key de caché
-            func_name = key_prefix or func.__name__
-            cache_key = _generate_cache_key(func_name, args, kwargs)
+            cache_key = build_key(args, kwargs)
+            cache_tags = tags(*args, **kwargs) if tags else None
             
-            # Intentar obtener del caché
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                return cached_value
+            def recalcular(reason: str):
+                _registrar_recalculo(func_name, reason)
+                inicio = time.monotonic()
+                result = func(*args, **kwargs)
+                entry = _envolver(result, time.monotonic() - inicio, ttl)
+                # Se guarda ttl + stale_ttl: el vencimiento lógico va en la entrada
+                cache.set(cache_key, entry, ttl=ttl + stale_ttl, tags=cache_tags, local=local)
+                return result
             
-            # Si no está en caché, ejecutar la función
-            result = func(*args, **kwargs)
-            
-            # Guardar en caché
-            cache.set(cache_key, result, ttl=ttl)
+            # Intentar obtener del caché
+            entry = _desenvolver(cache.get(cache_key, tags=cache_tags, local=local))
+            if entry is not None:
+                estado = _estado_entrada(entry, xfetch_beta)
+                if estado == "fresh":
+                    return entry["v"]
+                token = cache.acquire_lease(cache_key, lock_timeout)
+                if token is None:
+                    # Otro worker está recalculando: servir lo que hay
+                    if estado == "stale":
+                        _registrar_stale(func_name)
+                    return entry["v"]
+                try:
+                    return recalcular(estado)
+                finally:
+                    cache.release_lease(cache_key, token)
             
-            return result
+            # Miss: un solo worker recalcula, el resto espera el resultado
+            token = cache.acquire_lease(cache_key, lock_timeout)
+            if token is None:
+                limite = time.monotonic() + lock_timeout
+                while time.monotonic() < limite:
+                    time.sleep(LEASE_POLL_SECONDS)
+                    entry = _desenvolver(cache.get(cache_key, tags=cache_tags))
+                    if entry is not None:
+                        return entry["v"]
+                return recalcular("lock_timeout")
+            try:
+                return recalcular("miss")
+            finally:
+                cache.release_lease(cache_key, token)
         
         return wrapper
     return decorator
@@ -219,41 +1054,72 @@ def invalidate_cache(pattern: str):
     """
     Helper para invalidar caché por patrón.
     
+    Recorre todo el keyspace con SCAN; para invalidar entidades usar
+    invalidate_tag.
+    
     Args:
         pattern: Patrón de keys a invalidar (ej: "professional:123:*")
         
     Ejemplo:
-        # Invalidar todo el caché de un profesional
-        invalidate_cache("professional:123:*")
+        # Borrar entradas de un formato de key que ya no se usa
+        invalidate_cache("func:get_professional_*")
     """
     cache = get_cache_manager()
     cache.delete_pattern(pattern)
 
 
+def invalidate_tag(tag: str):
+    """
+    Helper para invalidar todas las entradas de un tag en O(1).
+    
+    Ejemplo:
+        invalidate_tag("professional:123")
+    """
+    cache = get_cache_manager()
+    cache.invalidate_tag(tag)
+
+
+# Tags de las entidades cacheadas
+
+def professional_tag(professional_id: str) -> str:
+    return f"professional:{professional_id}"
+
+
+def user_tag(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def stats_tag(user_id: str) -> str:
+    return f"stats:{user_id}"
+
+
+SEARCH_TAG = "search"
+OFICIOS_TAG = "oficios"
+
+
 # Helpers específicos para invalidación
 
 def invalidate_professional_cache(professional_id: str):
     """Invalida todo el caché relacionado a un profesional"""
-    invalidate_cache(f"professional:{professional_id}:*")
-    invalidate_cache(f"func:get_professional_*:{professional_id}*")
+    invalidate_tag(professional_tag(professional_id))
+    # El resumen para listados no lleva el tag del profesional (se lee en
+    # lotes con get_many): se borra
+    get_cache_manager().delete(f"professional:{professional_id}:summary")
 
 
 def invalidate_user_cache(user_id: str):
     """Invalida todo el caché relacionado a un usuario"""
-    invalidate_cache(f"user:{user_id}:*")
-    invalidate_cache(f"func:get_user_*:{user_id}*")
+    invalidate_tag(user_tag(user_id))
 
 
 def invalidate_search_cache():
     """Invalida el caché de búsquedas"""
-    invalidate_cache("func:search_professionals:*")
-    invalidate_cache("search:*")
+    invalidate_tag(SEARCH_TAG)
 
 
 def invalidate_stats_cache(user_id: str):
     """Invalida el caché de estadísticas de un usuario"""
-    invalidate_cache(f"stats:{user_id}:*")
-    invalidate_cache(f"func:get_*_stats:{user_id}*")
+    invalidate_tag(stats_tag(user_id))
 
 
 # Cache para entidades específicas
@@ -265,25 +1131,36 @@ class ProfessionalCache:
     def get_profile(professional_id: str) -> Optional[dict]:
         """Obtiene el perfil de un profesional del caché"""
         cache = get_cache_manager()
-        return cache.get(f"professional:{professional_id}:profile")
+        return cache.get(f"professional:{professional_id}:profile", tags=[professional_tag(professional_id)], local=True)
     
     @staticmethod
     def set_profile(professional_id: str, profile: dict, ttl: int = 600):
         """Guarda el perfil de un profesional en caché"""
         cache = get_cache_manager()
-        cache.set(f"professional:{professional_id}:profile", profile, ttl=ttl)
+        cache.set(f"professional:{professional_id}:profile", profile, ttl=ttl, tags=[professional_tag(professional_id)], local=True)
     
     @staticmethod
     def get_stats(professional_id: str) -> Optional[dict]:
         """Obtiene las estadísticas de un profesional del caché"""
         cache = get_cache_manager()
-        return cache.get(f"professional:{professional_id}:stats")
+        return cache.get(f"professional:{professional_id}:stats", tags=[professional_tag(professional_id)])
     
     @staticmethod
     def set_stats(professional_id: str, stats: dict, ttl: int = 300):
         """Guarda las estadísticas de un profesional en caché"""
         cache = get_cache_manager()
-        cache.set(f"professional:{professional_id}:stats", stats, ttl=ttl)
+        cache.set(f"professional:{professional_id}:stats", stats, ttl=ttl, tags=[professional_tag(professional_id)])
+    
+    @staticmethod
+    def get_summaries(professional_ids: Iterable, loader: Callable[[List], Dict], ttl: int = 300) -> Dict:
+        """
+        Resúmenes (nombre, nivel, rating) de varios profesionales, para
+        listados. Los que no están en caché se piden juntos a `loader`.
+        """
+        cache = get_cache_manager()
+        return cache.get_or_load_many(
+            professional_ids, key=lambda id_: f"professional:{id_}:summary", loader=loader, ttl=ttl,
+        )
     
     @staticmethod
     def invalidate(professional_id: str):
@@ -299,17 +1176,29 @@ class SearchCache:
         """Obtiene resultados de búsqueda del caché"""
         cache = get_cache_manager()
         # Crear key basada en los parámetros de búsqueda
-        params_str = json.dumps(search_params, sort_keys=True)
-        key_hash = hashlib.md5(params_str.encode()).hexdigest()
-        return cache.get(f"search:results:{key_hash}")
+        key_hash = canonical_hash(search_params)
+        return cache.get(f"search:results:{key_hash}", tags=[SEARCH_TAG])
     
     @staticmethod
     def set_search_results(search_params: dict, results: list, ttl: int = 180):
         """Guarda resultados de búsqueda en caché"""
         cache = get_cache_manager()
-        params_str = json.dumps(search_params, sort_keys=True)
-        key_hash = hashlib.md5(params_str.encode()).hexdigest()
-        cache.set(f"search:results:{key_hash}", results, ttl=ttl)
+        key_hash = canonical_hash(search_params)
+        cache.set(f"search:results:{key_hash}", results, ttl=ttl, tags=[SEARCH_TAG])
+    
+    @staticmethod
+    def get_count(filter_params: dict) -> Optional[int]:
+        """Obtiene el total de resultados de un conjunto de filtros del caché"""
+        cache = get_cache_manager()
+        key_hash = canonical_hash(filter_params)
+        return cache.get(f"search:count:{key_hash}", tags=[SEARCH_TAG])
+    
+    @staticmethod
+    def set_count(filter_params: dict, total: int, ttl: int = 60):
+        """Guarda el total de resultados de un conjunto de filtros en caché"""
+        cache = get_cache_manager()
+        key_hash = canonical_hash(filter_params)
+        cache.set(f"search:count:{key_hash}", total, ttl=ttl, tags=[SEARCH_TAG])
     
     @staticmethod
     def invalidate_all():
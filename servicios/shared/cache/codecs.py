@@ -0,0 +1,276 @@
+"""
+Codecs para los valores guardados en Redis por CacheManager.
+
+Formato de cada valor:
+
+    [versión][codec][compresión][payload]
+
+Los tres primeros bytes permiten leer valores escritos con otra
+configuración (o por otra versión del servicio durante un deploy): el
+decoder elige codec y descompresión según el header, no según la
+configuración actual. Un valor con versión desconocida o cuyo codec no
+está instalado en este servicio se trata como miss.
+
+Codecs:
+- msgpack (recomendado): binario compacto; UUID, Decimal, datetime y date
+  vuelven con su tipo (extension types).
+- orjson: JSON rápido; Decimal/UUID/datetime vuelven como strings, igual
+  que con json.dumps(default=str).
+- json: stdlib, sin dependencias; tipos preservados con objetos marcados.
+
+Compresión opcional (zstd o lz4) para payloads de más de
+CACHE_COMPRESSION_MIN_BYTES.
+"""
+import datetime
+import json
+import logging
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # dependencia opcional
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # dependencia opcional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # dependencia opcional
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+CODEC_JSON = 0
+CODEC_ORJSON = 1
+CODEC_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_LZ4 = 2
+
+
+class CodecError(Exception):
+    """Valor que este proceso no puede decodificar (se trata como miss)"""
+
+
+# ----------------------------------------------------------------------------
+# msgpack
+# ----------------------------------------------------------------------------
+
+_EXT_UUID = 1
+_EXT_DECIMAL = 2
+_EXT_DATETIME = 3
+_EXT_DATE = 4
+
+
+def _msgpack_default(obj: Any):
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, datetime.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, datetime.date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if hasattr(obj, "value"):  # Enums
+        return obj.value
+    return str(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return datetime.date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+# ----------------------------------------------------------------------------
+# orjson
+# ----------------------------------------------------------------------------
+
+def _orjson_default(obj: Any):
+    # orjson ya serializa UUID, datetime y Enum; acá llegan Decimal y otros
+    return str(obj)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _orjson_loads(data: bytes) -> Any:
+    return orjson.loads(data)
+
+
+# ----------------------------------------------------------------------------
+# json (stdlib)
+# ----------------------------------------------------------------------------
+
+_JSON_TIPO = "__t"
+
+
+def _json_default(obj: Any):
+    if isinstance(obj, uuid.UUID):
+        return {_JSON_TIPO: "uuid", "v": str(obj)}
+    if isinstance(obj, Decimal):
+        return {_JSON_TIPO: "decimal", "v": str(obj)}
+    if isinstance(obj, datetime.datetime):
+        return {_JSON_TIPO: "datetime", "v": obj.isoformat()}
+    if isinstance(obj, datetime.date):
+        return {_JSON_TIPO: "date", "v": obj.isoformat()}
+    return str(obj)
+
+
+_JSON_TIPOS: Dict[str, Callable[[str], Any]] = {
+    "uuid": uuid.UUID,
+    "decimal": Decimal,
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+}
+
+
+def _json_object_hook(obj: dict):
+    tipo = obj.get(_JSON_TIPO)
+    if tipo in _JSON_TIPOS and len(obj) == 2:
+        return _JSON_TIPOS[tipo](obj["v"])
+    return obj
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+# ----------------------------------------------------------------------------
+# Registro de codecs y compresores
+# ----------------------------------------------------------------------------
+
+_CODECS: Dict[int, Tuple[str, Optional[Callable], Optional[Callable]]] = {
+    CODEC_JSON: ("json", _json_dumps, _json_loads),
+    CODEC_ORJSON: ("orjson", _orjson_dumps if orjson else None, _orjson_loads if orjson else None),
+    CODEC_MSGPACK: ("msgpack", _msgpack_dumps if msgpack else None, _msgpack_loads if msgpack else None),
+}
+
+_COMPRESSORS: Dict[int, Tuple[str, Optional[Callable], Optional[Callable]]] = {
+    COMPRESSION_ZSTD: (
+        "zstd",
+        (lambda data: zstandard.ZstdCompressor(level=3).compress(data)) if zstandard else None,
+        (lambda data: zstandard.ZstdDecompressor().decompress(data)) if zstandard else None,
+    ),
+    COMPRESSION_LZ4: (
+        "lz4",
+        lz4_frame.compress if lz4_frame else None,
+        lz4_frame.decompress if lz4_frame else None,
+    ),
+}
+
+_CODEC_IDS = {nombre: codec_id for codec_id, (nombre, _, _) in _CODECS.items()}
+_COMPRESSION_IDS = {nombre: comp_id for comp_id, (nombre, _, _) in _COMPRESSORS.items()}
+
+
+class Codec:
+    """
+    Serializa valores de caché con un codec y compresión dados.
+
+    Si el codec o el compresor pedidos no están instalados se usa el
+    siguiente disponible (msgpack -> orjson -> json; sin compresión).
+    """
+
+    def __init__(self, codec: str = "msgpack", compression: str = "none", compression_min_bytes: int = 1024):
+        self.codec_id = self._resolver_codec(codec)
+        self.compression_id = self._resolver_compresion(compression)
+        self.compression_min_bytes = compression_min_bytes
+
+    @staticmethod
+    def _resolver_codec(nombre: str) -> int:
+        preferencia = [nombre, "msgpack", "orjson", "json"]
+        for candidato in preferencia:
+            codec_id = _CODEC_IDS.get(candidato)
+            if codec_id is not None and _CODECS[codec_id][1] is not None:
+                if candidato != nombre:
+                    logger.warning(f"Codec de cache '{nombre}' no disponible, usando '{candidato}'")
+                return codec_id
+        return CODEC_JSON
+
+    @staticmethod
+    def _resolver_compresion(nombre: str) -> int:
+        if nombre == "none":
+            return COMPRESSION_NONE
+        comp_id = _COMPRESSION_IDS.get(nombre)
+        if comp_id is None or _COMPRESSORS[comp_id][1] is None:
+            logger.warning(f"Compresión de cache '{nombre}' no disponible, se guarda sin comprimir")
+            return COMPRESSION_NONE
+        return comp_id
+
+    @property
+    def nombre(self) -> str:
+        codec = _CODECS[self.codec_id][0]
+        if self.compression_id == COMPRESSION_NONE:
+            return codec
+        return f"{codec}+{_COMPRESSORS[self.compression_id][0]}"
+
+    def encode(self, value: Any) -> bytes:
+        payload = _CODECS[self.codec_id][1](value)
+        compression_id = COMPRESSION_NONE
+        if self.compression_id != COMPRESSION_NONE and len(payload) >= self.compression_min_bytes:
+            payload = _COMPRESSORS[self.compression_id][1](payload)
+            compression_id = self.compression_id
+        return bytes((FORMAT_VERSION, self.codec_id, compression_id)) + payload
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """
+        Decodifica un valor escrito con cualquier codec/compresión.
+
+        Raises:
+            CodecError: versión desconocida o codec/compresor no instalado
+        """
+        if not data:
+            raise CodecError("Valor vacío")
+
+        # Valores escritos antes del header: JSON en texto plano
+        if data[0] != FORMAT_VERSION:
+            if data[:1] in (b"{", b"[", b'"', b"-", b"t", b"f", b"n") or data[:1].isdigit():
+                return json.loads(data)
+            raise CodecError(f"Versión de formato desconocida: {data[0]}")
+
+        codec_id, compression_id = data[1], data[2]
+        payload = data[3:]
+
+        if compression_id != COMPRESSION_NONE:
+            compresor = _COMPRESSORS.get(compression_id)
+            if compresor is None or compresor[2] is None:
+                raise CodecError(f"Compresión {compression_id} no disponible")
+            payload = compresor[2](payload)
+
+        codec = _CODECS.get(codec_id)
+        if codec is None or codec[2] is None:
+            raise CodecError(f"Codec {codec_id} no disponible")
+        return codec[2](payload)
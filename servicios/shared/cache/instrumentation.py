@@ -0,0 +1,159 @@
+"""
+Instrumentación de CacheManager por familia de keys.
+
+Cada operación se registra con una familia derivada de la key, sin los
+ids ni hashes (ej: "professional:{id}:profile" -> "professional:profile",
+"func:public_oficios:v1:{hash}" -> "func:public_oficios"), así las
+métricas de Prometheus tienen cardinalidad acotada:
+
+- hits / misses por familia (para el hit ratio);
+- latencia de cada operación (get, set, get_many, ...) por familia;
+- tamaño serializado de lo que se lee y escribe.
+
+Además, KeyStats lleva en memoria del proceso los contadores por key
+(lecturas, hits, escrituras, último acceso) de las keys más activas, para
+ver las keys calientes y las que se escriben pero casi no se leen. Es por
+réplica: lo agregado entre réplicas está en Prometheus.
+"""
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from shared.core.config import settings
+
+try:
+    from shared.monitoring.metrics import MetricsCollector
+except ImportError:  # prometheus_client no está instalado en todos los servicios
+    MetricsCollector = None
+
+# Segmentos de key que son ids: UUID, números, hashes hex
+_ID_SEGMENT = re.compile(
+    r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+|[0-9a-f]{16,}|v\d+)$",
+    re.IGNORECASE,
+)
+
+
+def key_family(key: str) -> str:
+    """Familia de una key: sus segmentos sin ids, hashes ni versiones"""
+    key = key.split("@", 1)[0]
+    segmentos = [s for s in key.split(":") if s and not _ID_SEGMENT.match(s)]
+    return ":".join(segmentos[:3]) or "otros"
+
+
+class KeyStats:
+    """
+    Contadores por key con memoria acotada.
+
+    Si se supera `max_keys` se descarta la mitad menos usada (lecturas +
+    escrituras): las keys calientes sobreviven, las de una sola lectura no.
+    """
+
+    def __init__(self, max_keys: int = 5000):
+        self.max_keys = max_keys
+        self._keys: Dict[str, List[float]] = {}  # key -> [lecturas, hits, escrituras, último acceso]
+        self._lock = threading.Lock()
+
+    def record(self, key: str, hit: Optional[bool] = None):
+        """Registra una lectura (hit True/False) o una escritura (hit None)"""
+        with self._lock:
+            stats = self._keys.get(key)
+            if stats is None:
+                if len(self._keys) >= self.max_keys:
+                    self._prune()
+                stats = self._keys[key] = [0, 0, 0, 0.0]
+            if hit is None:
+                stats[2] += 1
+            else:
+                stats[0] += 1
+                stats[1] += hit
+            stats[3] = time.time()
+
+    def _prune(self):
+        ordenadas = sorted(self._keys.items(), key=lambda item: item[1][0] + item[1][2])
+        for key, _ in ordenadas[: len(ordenadas) // 2]:
+            del self._keys[key]
+
+    def snapshot(self, top: int = 20) -> dict:
+        """Keys más leídas, keys frías (escritas y poco leídas) y hit ratio por familia"""
+        with self._lock:
+            items = [(key, list(stats)) for key, stats in self._keys.items()]
+
+        def _fila(key, stats):
+            lecturas, hits, escrituras, ultimo = stats
+            return {
+                "key": key,
+                "family": key_family(key),
+                "reads": int(lecturas),
+                "hits": int(hits),
+                "writes": int(escrituras),
+                "hit_ratio": round(hits / lecturas, 3) if lecturas else None,
+                "last_access": ultimo,
+            }
+
+        calientes = sorted(items, key=lambda item: item[1][0], reverse=True)[:top]
+        # Frías: escritas al menos una vez, ordenadas por lecturas por escritura
+        escritas = [item for item in items if item[1][2]]
+        frias = sorted(escritas, key=lambda item: (item[1][0] / item[1][2], item[1][3]))[:top]
+
+        familias: Dict[str, Dict[str, int]] = {}
+        for key, (lecturas, hits, escrituras, _) in items:
+            familia = familias.setdefault(key_family(key), {"reads": 0, "hits": 0, "writes": 0, "keys": 0})
+            familia["reads"] += int(lecturas)
+            familia["hits"] += int(hits)
+            familia["writes"] += int(escrituras)
+            familia["keys"] += 1
+        for familia in familias.values():
+            familia["hit_ratio"] = round(familia["hits"] / familia["reads"], 3) if familia["reads"] else None
+
+        return {
+            "tracked_keys": len(items),
+            "families": familias,
+            "hot": [_fila(key, stats) for key, stats in calientes],
+            "cold": [_fila(key, stats) for key, stats in frias],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._keys.clear()
+
+
+key_stats = KeyStats(settings.CACHE_KEY_STATS_MAX_KEYS)
+
+
+def record_read(operation: str, key: str, hit: bool, duration: float, size: int = 0):
+    """Registra una lectura de una key (get o cada key de un get_many)"""
+    if not settings.CACHE_METRICS_ENABLED:
+        return
+    key_stats.record(key, hit)
+    if MetricsCollector is None:
+        return
+    familia = key_family(key)
+    if hit:
+        MetricsCollector.record_cache_hit(familia)
+        if size:
+            MetricsCollector.record_cache_payload(operation, size, familia)
+    else:
+        MetricsCollector.record_cache_miss(familia)
+    if duration:
+        MetricsCollector.record_cache_operation(operation, duration, familia)
+
+
+def record_write(operation: str, key: str, duration: float, size: int = 0):
+    """Registra una escritura (set o cada key de un set_many)"""
+    if not settings.CACHE_METRICS_ENABLED:
+        return
+    key_stats.record(key)
+    if MetricsCollector is None:
+        return
+    familia = key_family(key)
+    if size:
+        MetricsCollector.record_cache_payload(operation, size, familia)
+    if duration:
+        MetricsCollector.record_cache_operation(operation, duration, familia)
+
+
+def record_operation(operation: str, key: str, duration: float):
+    """Registra la latencia de una operación sin hit/miss (delete, invalidate_tag...)"""
+    if settings.CACHE_METRICS_ENABLED and MetricsCollector is not None:
+        MetricsCollector.record_cache_operation(operation, duration, key_family(key))
@@ -0,0 +1,100 @@
+"""
+Keys de caché estables a partir de argumentos de funciones.
+
+La key de una llamada se arma con:
+- el nombre (o key_prefix) y la versión de la función: subir la versión al
+  cambiar la forma del resultado descarta las entradas viejas;
+- los argumentos ligados a sus nombres (posicionales y por nombre dan la
+  misma key, y los defaults se incluyen), sin las dependencias declaradas
+  (db, session, request...), que no cambian el resultado;
+- un hash blake2b de la forma canónica de esos argumentos.
+
+La forma canónica es determinística entre procesos y réplicas: modelos
+Pydantic, dataclasses, dicts (con keys ordenadas), sets, UUID, Decimal,
+fechas y Enums se reducen a JSON con un orden fijo. Un argumento que no se
+puede canonicalizar es un error (TypeError) en lugar de ignorarse en
+silencio: hay que excluirlo explícitamente.
+"""
+import dataclasses
+import datetime
+import hashlib
+import inspect
+import json
+import uuid
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterable
+
+# Argumentos que nunca forman parte de la key (dependencias inyectadas)
+DEPENDENCY_ARGS = frozenset({"self", "cls", "db", "session", "request", "response", "background_tasks"})
+
+# Bytes del digest: 128 bits alcanzan para que no haya colisiones en la práctica
+DIGEST_SIZE = 16
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Reduce un valor a tipos JSON con un orden determinístico.
+
+    Raises:
+        TypeError: si el valor no tiene una forma canónica conocida
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return canonicalize(value.value)
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): canonicalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((canonicalize(v) for v in value), key=_sort_key)
+    if hasattr(value, "model_dump"):  # Pydantic v2
+        return canonicalize(value.model_dump(mode="json"))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return canonicalize(dataclasses.asdict(value))
+    raise TypeError(
+        f"No se puede generar una key de caché para {type(value).__name__}; "
+        f"excluir el argumento o pasar un valor serializable"
+    )
+
+
+def _sort_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def canonical_hash(value: Any) -> str:
+    """Hash hex (blake2b) de la forma canónica de un valor"""
+    canonical = json.dumps(canonicalize(value), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+
+def make_key_builder(func: Callable, name: str, version: int = 1,
+                     exclude: Iterable[str] = ()) -> Callable[[tuple, dict], str]:
+    """
+    Devuelve una función (args, kwargs) -> key para las llamadas a `func`.
+
+    La firma se inspecciona una sola vez, al decorar.
+
+    Args:
+        func: Función cacheada
+        name: Nombre de la familia de keys (key_prefix o nombre de la función)
+        version: Versión del resultado; cambiarla invalida todas las entradas
+        exclude: Argumentos que no forman parte de la key, además de
+                 DEPENDENCY_ARGS
+    """
+    signature = inspect.signature(func)
+    excluidos = DEPENDENCY_ARGS | frozenset(exclude)
+    prefijo = f"func:{name}:v{version}"
+
+    def build(args: tuple, kwargs: dict) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        partes = {k: v for k, v in bound.arguments.items() if k not in excluidos}
+        return f"{prefijo}:{canonical_hash(partes)}"
+
+    return build
@@ -0,0 +1,200 @@
+"""
+Caché en memoria del proceso (L1) delante de Redis (L2).
+
+LocalCache es un LRU con TTL y límite de memoria. Guarda los valores ya
+deserializados, así un hit no paga ni el round trip a Redis ni la
+deserialización.
+
+La coherencia entre réplicas se mantiene con pub/sub: cada escritura o
+invalidación en CacheManager publica un mensaje en el canal de
+invalidaciones y cada proceso borra las entradas afectadas de su L1.
+El TTL local (corto) acota lo que puede durar un dato viejo si se pierde
+un mensaje; si la suscripción se corta, la L1 se vacía entera y no se usa
+hasta volver a suscribirse.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Identifica a este proceso en los mensajes de invalidación
+ORIGEN = uuid.uuid4().hex
+
+
+class LocalCache:
+    """
+    LRU thread-safe con TTL por entrada y límites de entradas y bytes.
+
+    El tamaño de cada entrada se estima con el largo del valor serializado
+    (lo que se leyó de Redis), no con el tamaño real en memoria.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl: int = 30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._tag_listeners: Dict[str, List[Callable[[], None]]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # False mientras la suscripción a las invalidaciones no está activa
+        self.activa = True
+
+    def get(self, key: str) -> Optional[Any]:
+        """Devuelve el valor si está y no venció (y lo marca como usado)"""
+        if not self.activa:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expira, _, _ = entry
+            if expira < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[int] = None,
+            tags: Optional[Iterable[str]] = None):
+        """
+        Guarda un valor. Entradas más grandes que la cuarta parte del límite
+        de bytes no se guardan (desplazarían a todo el resto).
+        """
+        if size > self.max_bytes // 4 or not self.activa:
+            return
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        tags = tuple(tags or ())
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tag(self, tag: str):
+        """Borra todas las entradas guardadas con un tag"""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+        self._notify(tag)
+    
+    def on_tag_invalidated(self, tag: str, callback: Callable[[], None]):
+        """
+        Registra un callback para cuando se invalida un tag (en este proceso
+        o en otra réplica), para datos que se cachean fuera de la L1.
+        """
+        self._tag_listeners.setdefault(tag, []).append(callback)
+    
+    def _notify(self, tag: str):
+        for callback in self._tag_listeners.get(tag, ()):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error en listener de invalidación del tag {tag}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+        for tag in list(self._tag_listeners):
+            self._notify(tag)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        """Borra una entrada (se llama con el lock tomado)"""
+        _, _, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    # ------------------------------------------------------------------
+    # Invalidación entre réplicas (Redis pub/sub)
+    # ------------------------------------------------------------------
+
+    def handle_message(self, message: dict):
+        """Aplica un mensaje del canal de invalidaciones"""
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if data.get("origen") == ORIGEN:
+            return
+
+        if data.get("clear"):
+            self.clear()
+            return
+        for key in data.get("keys", ()):
+            self.delete(key)
+        for tag in data.get("tags", ()):
+            self.invalidate_tag(tag)
+
+    def subscribe(self, redis_client, channel: str) -> threading.Thread:
+        """
+        Escucha el canal de invalidaciones en un thread daemon.
+
+        No abre la conexión en el thread que llama (construir el cache nunca
+        falla por Redis): el thread se suscribe y, si la conexión falla o se
+        corta, vacía la L1 (pudo perderse un mensaje) y reintenta. Mientras
+        no está suscrito la L1 no se usa.
+        """
+        self.activa = False
+        thread = threading.Thread(
+            target=self._escuchar, args=(redis_client, channel),
+            name="l1-invalidaciones", daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _escuchar(self, redis_client, channel: str):
+        avisar = True
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(**{channel: self.handle_message})
+                self.activa = avisar = True
+                while True:
+                    # Los mensajes los procesa handle_message
+                    pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                # Un aviso por corte, no uno por reintento
+                if avisar:
+                    logger.warning(f"Suscripción de invalidaciones L1 interrumpida: {e}")
+                avisar = False
+            finally:
+                self.activa = False
+                self.clear()
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(1)
+
+
+def mensaje_invalidacion(keys: Iterable[str] = (), tags: Iterable[str] = (), clear: bool = False) -> str:
+    """Mensaje para el canal de invalidaciones"""
+    return json.dumps({"origen": ORIGEN, "keys": list(keys), "tags": list(tags), "clear": clear})
+
@@ -0,0 +1,142 @@
+"""
+Precalentamiento (warm-up) de la caché después de un deploy.
+
+Sin warm-up, cada réplica nueva arranca con la L1 vacía y, si también se
+vació Redis, la primera ola de pedidos (catálogo de oficios, leaderboard,
+perfiles y búsquedas populares) va entera a Postgres a la vez.
+
+- registrar_pedido: los servicios anotan (muestreado) qué perfiles y
+  búsquedas se piden, en sorted sets de Redis que sobreviven al deploy.
+- ejecutar_warmup: corre las tareas de warm-up de un servicio (ver
+  services/warmup_service) con un límite de tiempo total.
+- iniciar_warmup: lo corre en un thread al arrancar la app; /health/ready
+  responde "not ready" hasta que termina (ver core/health).
+"""
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from shared.core.config import settings
+from shared.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Sorted sets "warmup:{tipo}" con la frecuencia de cada pedido
+WARMUP_KEY_PREFIX = "warmup"
+
+# Los sorted sets se recortan a este múltiplo de los top que se precalientan
+RECORTE_FACTOR = 5
+
+# Un sorted set que no se actualiza en este tiempo se descarta
+WARMUP_KEY_TTL = 7 * 86400
+
+_estado: Dict[str, Any] = {"listo": False, "inicio": None, "fin": None, "tareas": {}}
+_contexto = threading.local()
+
+
+def _key(tipo: str) -> str:
+    return f"{WARMUP_KEY_PREFIX}:{tipo}"
+
+
+def registrar_pedido(tipo: str, miembro: str, top: int) -> None:
+    """
+    Anota un pedido (ej: tipo="perfiles", miembro=id) para el próximo warm-up.
+
+    Solo se registra una fracción WARMUP_SAMPLE_RATE de los pedidos: alcanza
+    para ordenar por popularidad sin un write a Redis por request. Los
+    pedidos que hace el propio warm-up no cuentan.
+    """
+    if getattr(_contexto, "calentando", False) or random.random() >= settings.WARMUP_SAMPLE_RATE:
+        return
+    try:
+        client = get_redis()
+        pipe = client.pipeline(transaction=False)
+        pipe.zincrby(_key(tipo), 1, miembro)
+        pipe.expire(_key(tipo), WARMUP_KEY_TTL)
+        # De vez en cuando se descartan los menos pedidos
+        if random.random() < 0.01:
+            pipe.zremrangebyrank(_key(tipo), 0, -(top * RECORTE_FACTOR) - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"No se pudo registrar pedido para warm-up: {str(e)}")
+
+
+def pedidos_frecuentes(tipo: str, top: int) -> List[str]:
+    """Los `top` pedidos más frecuentes de un tipo (más frecuente primero)"""
+    try:
+        return get_redis().zrevrange(_key(tipo), 0, top - 1)
+    except Exception as e:
+        logger.error(f"Error leyendo pedidos frecuentes ({tipo}): {str(e)}")
+        return []
+
+
+def ejecutar_warmup(tareas: Dict[str, Callable[[], Any]], timeout: Optional[float] = None) -> dict:
+    """
+    Corre las tareas en orden. Un error en una tarea no frena a las demás;
+    pasado `timeout` (default WARMUP_TIMEOUT) no se empiezan tareas nuevas.
+
+    Returns:
+        Resumen por tarea: estado ("ok" | "error" | "omitida") y duración
+    """
+    timeout = settings.WARMUP_TIMEOUT if timeout is None else timeout
+    limite = time.monotonic() + timeout
+    resumen: Dict[str, dict] = {}
+
+    _contexto.calentando = True
+    try:
+        for nombre, tarea in tareas.items():
+            if time.monotonic() > limite:
+                resumen[nombre] = {"estado": "omitida", "duracion_ms": 0}
+                continue
+            inicio = time.monotonic()
+            try:
+                tarea()
+                resumen[nombre] = {"estado": "ok"}
+            except Exception as e:
+                logger.error(f"Warm-up de caché '{nombre}' falló: {str(e)}")
+                resumen[nombre] = {"estado": "error", "error": str(e)}
+            resumen[nombre]["duracion_ms"] = round((time.monotonic() - inicio) * 1000, 1)
+    finally:
+        _contexto.calentando = False
+
+    logger.info(f"Warm-up de caché terminado: {resumen}")
+    return resumen
+
+
+def iniciar_warmup(calentar: Callable[[], dict]) -> None:
+    """
+    Corre el warm-up en un thread daemon (para el evento de startup).
+
+    La readiness queda en falso hasta que termina, con o sin errores: un
+    warm-up fallido no debe impedir que la réplica reciba tráfico.
+
+    Args:
+        calentar: Corre el warm-up y devuelve el resumen de ejecutar_warmup
+                  (ej. warmup_service.calentar con las tareas del servicio)
+    """
+    if not settings.WARMUP_ENABLED:
+        _estado["listo"] = True
+        return
+
+    def _run():
+        _estado["inicio"] = time.time()
+        try:
+            _estado["tareas"] = calentar()
+        except Exception as e:
+            logger.error(f"Warm-up de caché falló: {str(e)}")
+        finally:
+            _estado["fin"] = time.time()
+            _estado["listo"] = True
+
+    threading.Thread(target=_run, name="cache-warmup", daemon=True).start()
+
+
+def esta_listo() -> bool:
+    """True cuando el warm-up de arranque terminó (o está deshabilitado)"""
+    return _estado["listo"]
+
+
+def estado_warmup() -> dict:
+    return dict(_estado)
@@ -3,7 +3,7 @@ Configuración de la aplicación usando Pydantic Settings.
 Todas las variables de entorno se cargan desde .env
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,18 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "db"
     POSTGRES_PORT: int = 5432
     
+    # Redis (caché, rate limiting, eventos). Un pool por proceso, ver core/redis_client.py
+    REDIS_URL: str = "redis://redis:6379"
+    REDIS_MAX_CONNECTIONS: int = 50
+    
+    # Rate limiting (ver shared/middleware/rate_limiter.py)
+    RATE_LIMIT_ALGORITHM: str = "gcra"  # gcra | sliding_log
+    RATE_LIMIT_LEASE_SIZE: int = 10  # Fichas que cada proceso reserva de a una vez (máx. 1/10 del límite)
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000  # Clientes con reserva/bucket local por proceso
+    RATE_LIMIT_REDIS_RETRY_SECONDS: int = 5  # Sin Redis, se limita en memoria este tiempo antes de reintentar
+    RATE_LIMIT_POLICIES: List[dict] = []  # Tabla de políticas del gateway en JSON (vacía = POLITICAS_DEFAULT)
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []  # IPs/CIDRs de proxies cuyo X-Forwarded-For se respeta (JSON)
+    
     # Security / Auth
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -47,6 +59,91 @@ class Settings(BaseSettings):
     PUNTOS_REVIEW_5_ESTRELLAS: int = 50
     PUNTOS_REVIEW_4_ESTRELLAS: int = 10
     
+    # Búsqueda - Estrategia de conteo de resultados
+    SEARCH_COUNT_CACHE_TTL: int = 60  # Segundos que se cachea un total exacto
+    SEARCH_COUNT_UMBRAL_ESTIMACION: int = 5000  # Debajo de esto, el modo "estimado" cuenta exacto
+    
+    # Búsqueda - Ranking por relevancia (pesos de cada componente, ver ranking_service)
+    SEARCH_PESO_DISTANCIA: float = 0.35
+    SEARCH_PESO_RATING: float = 0.35
+    SEARCH_PESO_NIVEL: float = 0.15
+    SEARCH_PESO_PRECIO: float = 0.10
+    SEARCH_PESO_INSTANT: float = 0.05
+    SEARCH_DISTANCIA_ESCALA_KM: float = 10.0  # A esta distancia el componente vale ~0.37
+    SEARCH_RATING_PRIOR_MEDIA: float = 3.5  # Media a priori del rating bayesiano
+    SEARCH_RATING_PRIOR_PESO: int = 10  # Equivale a N reseñas "virtuales" con la media a priori
+    
+    # Caché L1 en memoria de cada proceso (delante de Redis, ver cache/local_cache.py)
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 10000
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024  # Estimado por el tamaño del valor serializado
+    CACHE_L1_TTL: int = 30  # Segundos; acota datos viejos si se pierde una invalidación
+    
+    # Serialización de valores cacheados (ver shared/cache/codecs.py)
+    CACHE_CODEC: str = "msgpack"  # msgpack | orjson | json
+    CACHE_COMPRESSION: str = "none"  # none | zstd | lz4
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024  # Solo se comprimen payloads más grandes
+    
+    # Métricas de caché por familia de keys (ver shared/cache/instrumentation.py)
+    CACHE_METRICS_ENABLED: bool = True
+    CACHE_KEY_STATS_MAX_KEYS: int = 5000  # Keys con contadores propios (hot/cold) por proceso
+    
+    # Perfil público (read model cacheado, ver profile_service)
+    PROFILE_CACHE_TTL: int = 600  # Segundos; se invalida explícitamente al cambiar el perfil
+    PROFILE_RESENAS_RECIENTES: int = 10  # Reseñas incluidas en el perfil (el resto se pagina)
+    
+    # Resúmenes de entidades para listados (ver resumen_service)
+    ENTITY_CACHE_TTL: int = 300  # Segundos; el resumen de un profesional se borra al cambiar su perfil
+    OFICIOS_REGISTRY_CHECK_SECONDS: int = 30  # Cada cuánto se verifica si cambió el catálogo de oficios
+    
+    # Warm-up de caché al arrancar (ver shared/cache/warmup.py)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT: int = 120  # Segundos; pasado este tiempo la réplica pasa a ready igual
+    WARMUP_SAMPLE_RATE: float = 0.1  # Fracción de pedidos que se registran para el próximo warm-up
+    WARMUP_TOP_PERFILES: int = 200
+    WARMUP_TOP_BUSQUEDAS: int = 100
+    
+    # Event bus sobre Redis Streams (ver shared/events/event_bus.py)
+    EVENT_STREAM_MAXLEN: int = 100000  # Eventos retenidos por tipo (recorte aproximado, MAXLEN ~)
+    EVENT_GROUP_START_ID: str = "$"  # Desde dónde lee un consumer group nuevo ("$" = solo eventos nuevos)
+    EVENT_READ_COUNT: int = 100  # Eventos por lectura (XREADGROUP COUNT)
+    EVENT_BLOCK_MS: int = 5000  # Espera máxima de cada lectura bloqueante
+    EVENT_CLAIM_IDLE_MS: int = 60000  # Un evento sin ACK por este tiempo se reasigna a otro consumidor
+    EVENT_CLAIM_INTERVAL: int = 30  # Segundos entre pasadas de XAUTOCLAIM
+    EVENT_MAX_DELIVERIES: int = 5  # Entregas fallidas antes de mover el evento al dead letter
+    EVENT_DEAD_LETTER_MAXLEN: int = 10000
+    EVENT_CONCURRENCY: int = 10  # Handlers en paralelo por tipo de evento (default de EventConsumer)
+    EVENT_MAX_IN_FLIGHT: int = 200  # Eventos en proceso por réplica; con el cupo lleno no se lee más
+    EVENT_HANDLER_THREADS: int = 8  # Thread pool para handlers síncronos
+    EVENT_LAG_INTERVAL: int = 15  # Segundos entre mediciones de lag (XINFO GROUPS)
+    EVENT_SHUTDOWN_TIMEOUT: int = 20  # Segundos que se espera a los handlers en curso al apagar
+    EVENT_OUTBOX_BATCH_SIZE: int = 500  # Eventos del outbox por pipeline de XADD
+    EVENT_OUTBOX_POLL_INTERVAL: float = 1.0  # Segundos entre revisiones del outbox sin commits locales
+    
+    # Reportes (ver services/reporte_service.py)
+    REPORTES_DIR: str = "/tmp/reportes"  # Carpeta donde se escriben los reportes
+    REPORTES_FORMATO: str = "csv"  # csv | parquet (requiere pyarrow)
+    REPORTES_CHUNK_SIZE: int = 10000  # Filas por lote del cursor del lado del servidor
+    
+    # Email (SMTP, ver services/email_service.py)
+    EMAIL_ENABLED: bool = False  # Deshabilitado hasta configurar SMTP
+    EMAIL_FROM: str = "ConectarProfesionales <no-reply@conectarprofesionales.com>"
+    EMAIL_PROVIDER: str = "smtp"  # Nombre del proveedor (key de su rate limit)
+    EMAIL_SMTP_HOST: str = "localhost"
+    EMAIL_SMTP_PORT: int = 587
+    EMAIL_SMTP_USER: Optional[str] = None
+    EMAIL_SMTP_PASSWORD: Optional[str] = None
+    EMAIL_SMTP_STARTTLS: bool = True
+    EMAIL_SMTP_TIMEOUT: int = 30  # Segundos
+    EMAIL_SMTP_POOL_SIZE: int = 4  # Conexiones abiertas por proveedor y proceso
+    EMAIL_SMTP_MAX_MESSAGES: int = 100  # Mensajes por conexión antes de renovarla
+    EMAIL_SMTP_IDLE_SECONDS: int = 30  # Conexión inactiva más que esto: se verifica con NOOP
+    EMAIL_BATCH_SIZE: int = 50  # Mensajes por lote (una conexión, una reserva de rate limit)
+    EMAIL_RATE_LIMIT: int = 14  # Mensajes por EMAIL_RATE_LIMIT_WINDOW entre todos los workers (0 = sin límite)
+    EMAIL_RATE_LIMIT_WINDOW: int = 1  # Segundos
+    EMAIL_CAMPAIGN_CHUNK: int = 500  # Destinatarios por tarea de Celery en un envío masivo
+    EMAIL_TEMPLATES_DIR: Optional[str] = None  # Plantillas propias (pisan a las incluidas con el mismo nombre)
+    
     def get_database_url(self) -> str:
         """Obtiene o construye la URL de conexión a PostgreSQL"""
         # Si DATABASE_URL está definido directamente, usarlo
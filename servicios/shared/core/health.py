@@ -5,13 +5,42 @@ Implementa /health/live (liveness) y /health/ready (readiness).
 from fastapi import APIRouter, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Health"])
 
+# Condiciones extra de readiness registradas por cada servicio
+# (ej: warm-up de caché terminado). Cada una devuelve True cuando está lista.
+_readiness_gates: Dict[str, Callable[[], bool]] = {}
+
+
+def register_readiness_gate(name: str, check: Callable[[], bool]):
+    """
+    Agrega una condición a /health/ready: mientras devuelva False el servicio
+    responde 503 y no recibe tráfico.
+    """
+    _readiness_gates[name] = check
+
+
+def _check_readiness_gates(checks: Dict[str, Any]) -> bool:
+    """Evalúa las condiciones registradas; devuelve si todas están listas"""
+    all_ready = True
+    for name, check in _readiness_gates.items():
+        try:
+            ready = bool(check())
+        except Exception as e:
+            logger.error(f"Readiness gate {name} failed: {str(e)}")
+            ready = False
+        checks[name] = {
+            "status": "healthy" if ready else "pending",
+            "message": "Ready" if ready else "Not ready yet"
+        }
+        all_ready = all_ready and ready
+    return all_ready
+
 
 def create_health_check_routes(db_dependency, service_name: str = "service"):
     """
@@ -75,6 +104,10 @@ def create_health_check_routes(db_dependency, service_name: str = "service"):
             }
             all_healthy = False
         
+        # Check 2: Condiciones registradas por el servicio (warm-up, etc)
+        if not _check_readiness_gates(checks["checks"]):
+            all_healthy = False
+        
         # Actualizar estado general
         if not all_healthy:
             checks["status"] = "not_ready"
@@ -114,17 +147,21 @@ def create_simple_health_routes(service_name: str = "service"):
         }
     
     @router.get("/health/ready")
-    async def health_readiness():
-        """Readiness probe (sin checks externos)"""
+    async def health_readiness(response: Response):
+        """Readiness probe (sin checks externos, solo las condiciones registradas)"""
+        checks = {
+            "service": {
+                "status": "healthy",
+                "message": "Service is running"
+            }
+        }
+        ready = _check_readiness_gates(checks)
+        if not ready:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
         return {
-            "status": "ready",
+            "status": "ready" if ready else "not_ready",
             "service": service_name,
-            "checks": {
-                "service": {
-                    "status": "healthy",
-                    "message": "Service is running"
-                }
-            }
+            "checks": checks
         }
     
     return router
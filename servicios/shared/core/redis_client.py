@@ -0,0 +1,75 @@
+"""
+Clientes de Redis compartidos por proceso.
+
+Todos los componentes (caché, rate limiter, event bus) toman sus clientes de
+acá para compartir un único pool de conexiones por URL en cada proceso, en
+lugar de abrir un pool propio cada uno.
+
+- get_redis: cliente síncrono (tareas de Celery, scripts, código sync).
+- get_async_redis: cliente redis.asyncio para handlers y middlewares async,
+  así la latencia de Redis no bloquea el event loop.
+
+Por defecto los clientes decodifican las respuestas a str; la caché pide
+decode_responses=False porque guarda valores binarios (ver cache/codecs.py).
+"""
+from typing import Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from shared.core.config import settings
+
+_pools: Dict[Tuple[str, bool], redis.ConnectionPool] = {}
+_async_pools: Dict[Tuple[str, bool], aioredis.ConnectionPool] = {}
+
+
+def get_redis(redis_url: Optional[str] = None, decode_responses: bool = True) -> redis.Redis:
+    """
+    Cliente síncrono sobre el pool compartido de la URL.
+
+    Args:
+        redis_url: URL de Redis (default: settings.REDIS_URL)
+        decode_responses: False para recibir bytes (valores binarios)
+    """
+    redis_url = redis_url or settings.REDIS_URL
+    pool_key = (redis_url, decode_responses)
+    pool = _pools.get(pool_key)
+    if pool is None:
+        pool = redis.ConnectionPool.from_url(
+            redis_url,
+            decode_responses=decode_responses,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        _pools[pool_key] = pool
+    return redis.Redis(connection_pool=pool)
+
+
+def get_async_redis(redis_url: Optional[str] = None, decode_responses: bool = True) -> aioredis.Redis:
+    """
+    Cliente asíncrono sobre el pool compartido de la URL.
+
+    Las conexiones del pool quedan asociadas al event loop que las usa
+    primero: usar solo desde el loop de la aplicación (uvicorn).
+
+    Args:
+        redis_url: URL de Redis (default: settings.REDIS_URL)
+        decode_responses: False para recibir bytes (valores binarios)
+    """
+    redis_url = redis_url or settings.REDIS_URL
+    pool_key = (redis_url, decode_responses)
+    pool = _async_pools.get(pool_key)
+    if pool is None:
+        pool = aioredis.ConnectionPool.from_url(
+            redis_url,
+            decode_responses=decode_responses,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        _async_pools[pool_key] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+async def close_async_redis():
+    """Cierra los pools asíncronos (para el evento de shutdown de la app)"""
+    for pool in _async_pools.values():
+        await pool.disconnect()
+    _async_pools.clear()
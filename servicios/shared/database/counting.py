@@ -0,0 +1,51 @@
+"""
+Helpers para contar filas sin pagar siempre un COUNT(*) completo.
+
+- count_rows: COUNT(*) exacto sobre un SELECT.
+- estimate_row_count: estimación del planner vía EXPLAIN (sin ejecutar la query).
+"""
+from sqlalchemy import func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.orm import Session
+
+
+class _Explain(Executable, ClauseElement):
+    """
+    Construct `EXPLAIN (FORMAT JSON) <select>`.
+    Se compila con el mismo compilador que la query original, así los bind
+    params (enums, geografías, etc.) se procesan igual que al ejecutarla.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def count_rows(db: Session, statement) -> int:
+    """
+    Cuenta exactamente las filas que devolvería un SELECT.
+
+    Args:
+        db: Sesión de SQLAlchemy
+        statement: SELECT sin paginar (sin ORDER BY/LIMIT)
+    """
+    subquery = statement.order_by(None).subquery()
+    return db.execute(select(func.count()).select_from(subquery)).scalar() or 0
+
+
+def estimate_row_count(db: Session, statement) -> int:
+    """
+    Estima las filas que devolvería un SELECT usando las estadísticas del planner.
+    No ejecuta la query: el costo es el de planificarla.
+
+    La precisión depende de que las tablas estén analizadas (autovacuum/ANALYZE);
+    usar solo para consultas amplias donde un total aproximado es aceptable.
+    """
+    plan = db.execute(_Explain(statement.order_by(None))).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,269 @@
+"""
+Runtime asyncio para consumir eventos dentro de un servicio FastAPI.
+
+AsyncEventBus.start_listening procesa los eventos de a uno. EventConsumer
+usa los mismos streams y consumer group pero despacha cada evento como una
+task del event loop:
+
+- Concurrencia acotada por tipo de evento (EVENT_CONCURRENCY, o lo que se
+  indique en `concurrencia`), para que un tipo lento no acapare todo.
+- Backpressure: con EVENT_MAX_IN_FLIGHT eventos en proceso no se lee más
+  del stream; lo no leído queda en Redis (y cuenta como lag).
+- Los handlers síncronos corren en un thread pool propio
+  (EVENT_HANDLER_THREADS); las corrutinas, en el loop.
+- Los ACK se agrupan y se mandan en un XACK por stream antes de cada
+  lectura. Un evento con algún handler fallido no se confirma y se
+  reintenta vía XAUTOCLAIM (ver event_bus).
+- Métricas: duración de cada handler, demora desde la publicación, lag y
+  pendientes del group (XINFO GROUPS) y eventos en proceso.
+
+Uso (en el main del servicio):
+
+    bus = get_async_event_bus(group="profesionales")
+    bus.subscribe(EventType.RESENA_CREADA, invalidar_perfil)
+    setup_event_consumer(app, bus)
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from shared.core.config import settings
+from shared.events.event_bus import AsyncEventBus, Event, EventType, StreamEntry, _decode_event, _entries, _str
+
+try:
+    from shared.monitoring.metrics import MetricsCollector
+except ImportError:  # prometheus_client no está instalado en todos los servicios
+    MetricsCollector = None
+
+logger = logging.getLogger(__name__)
+
+
+def _demora(event: Event) -> Optional[float]:
+    """Segundos desde que se publicó el evento (el id del stream empieza con el timestamp en ms)"""
+    try:
+        return max(time.time() - int(event.stream_id.split("-", 1)[0]) / 1000, 0.0)
+    except (AttributeError, ValueError):
+        return None
+
+
+class EventConsumer:
+    """Consume los eventos suscritos en `bus` con concurrencia acotada"""
+
+    def __init__(self, bus: AsyncEventBus, concurrencia: Optional[Dict[EventType, int]] = None):
+        self.bus = bus
+        self.concurrencia = concurrencia or {}
+        self.running = False
+        self._semaforos: Dict[EventType, asyncio.Semaphore] = {}
+        self._tareas: Set[asyncio.Task] = set()
+        self._acks: Dict[str, List[str]] = defaultdict(list)
+        # Ids despachados y sin terminar: el reclamo periódico no los vuelve a tomar
+        self._en_proceso: Set[str] = set()
+        self._lag: Dict[str, dict] = {}
+        self._loops: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _semaforo(self, event_type: EventType) -> asyncio.Semaphore:
+        semaforo = self._semaforos.get(event_type)
+        if semaforo is None:
+            limite = self.concurrencia.get(event_type, settings.EVENT_CONCURRENCY)
+            semaforo = self._semaforos[event_type] = asyncio.Semaphore(limite)
+        return semaforo
+
+    async def start(self):
+        """Crea los consumer groups y arranca la lectura y el monitoreo de lag"""
+        if self.running:
+            logger.warning("EventConsumer ya está corriendo")
+            return
+        if not self.bus.handlers:
+            logger.info("EventConsumer sin handlers registrados, no se inicia")
+            return
+
+        await self.bus._ensure_groups()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.EVENT_HANDLER_THREADS, thread_name_prefix="event-handler"
+        )
+        self.running = True
+        self._loops = [
+            asyncio.create_task(self._leer(), name="event-consumer"),
+            asyncio.create_task(self._monitorear_lag(), name="event-consumer-lag"),
+        ]
+        logger.info(f"EventConsumer iniciado como {self.bus.group}/{self.bus.consumer}")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Deja de leer y espera hasta `timeout` (default EVENT_SHUTDOWN_TIMEOUT)
+        a los eventos en proceso. Los que no terminan quedan sin ACK y otra
+        réplica los reclama.
+        """
+        if not self.running:
+            return
+        self.running = False
+        for loop in self._loops:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+
+        timeout = settings.EVENT_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        if self._tareas:
+            _, pendientes = await asyncio.wait(self._tareas, timeout=timeout)
+            for tarea in pendientes:
+                tarea.cancel()
+            if pendientes:
+                logger.warning(f"{len(pendientes)} eventos sin terminar al apagar; se reintentarán")
+        await self._flush_acks()
+        self._executor.shutdown(wait=False)
+        logger.info("EventConsumer detenido")
+
+    async def _leer(self):
+        streams = {stream: ">" for stream in self.bus._streams()}
+        ultimo_reclamo = 0.0
+
+        while self.running:
+            try:
+                await self._flush_acks()
+
+                if time.monotonic() - ultimo_reclamo >= settings.EVENT_CLAIM_INTERVAL:
+                    for stream in streams:
+                        async for entries in self.bus._reclamar(stream, self._en_proceso):
+                            await self._despachar(stream, entries)
+                    ultimo_reclamo = time.monotonic()
+
+                # Backpressure: se lee como mucho lo que hay cupo para procesar
+                libres = await self._esperar_cupo()
+                response = await self.bus.redis_client.xreadgroup(
+                    self.bus.group, self.bus.consumer, streams,
+                    count=min(libres, settings.EVENT_READ_COUNT), block=settings.EVENT_BLOCK_MS,
+                )
+                for stream, entries in response or []:
+                    await self._despachar(_str(stream), _entries(entries))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error leyendo eventos: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _esperar_cupo(self) -> int:
+        """Espera a que haya lugar para más eventos en proceso y devuelve cuántos"""
+        while len(self._tareas) >= settings.EVENT_MAX_IN_FLIGHT:
+            await asyncio.wait(self._tareas, return_when=asyncio.FIRST_COMPLETED)
+        return settings.EVENT_MAX_IN_FLIGHT - len(self._tareas)
+
+    async def _despachar(self, stream: str, entries: List[StreamEntry]):
+        for entry_id, fields in entries:
+            await self._esperar_cupo()
+            self._en_proceso.add(entry_id)
+            tarea = asyncio.create_task(self._procesar(stream, entry_id, fields))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+
+    async def _procesar(self, stream: str, entry_id: str, fields):
+        try:
+            try:
+                event = _decode_event(entry_id, fields)
+            except Exception as e:
+                logger.error(f"Evento inválido {stream}/{entry_id}: {str(e)}")
+                await self.bus._dead_letter(stream, entry_id, fields, f"inválido: {e}")
+                self._acks[stream].append(entry_id)
+                return
+
+            async with self._semaforo(event.event_type):
+                self._registrar_inicio(event)
+                try:
+                    ok = await self._ejecutar_handlers(event)
+                finally:
+                    self._registrar_en_curso(-1)
+
+            if ok:
+                self._acks[stream].append(entry_id)
+        finally:
+            self._en_proceso.discard(entry_id)
+
+    async def _ejecutar_handlers(self, event: Event) -> bool:
+        loop = asyncio.get_running_loop()
+        ok = True
+        for handler in self.bus.handlers.get(event.event_type, []):
+            inicio = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(handler):
+                    await handler(event)
+                else:
+                    await loop.run_in_executor(self._executor, handler, event)
+                estado = "ok"
+            except Exception as e:
+                logger.error(f"Error en handler de {event.event_type.value}: {str(e)}")
+                estado = "error"
+                ok = False
+            if MetricsCollector is not None:
+                MetricsCollector.record_event_handled(event.event_type.value, estado, time.perf_counter() - inicio)
+        return ok
+
+    def _registrar_inicio(self, event: Event):
+        self._registrar_en_curso(1)
+        demora = _demora(event)
+        if MetricsCollector is not None and demora is not None:
+            MetricsCollector.record_event_delay(event.event_type.value, demora)
+
+    def _registrar_en_curso(self, delta: int):
+        if MetricsCollector is not None:
+            MetricsCollector.record_event_in_flight(self.bus.group, delta)
+
+    async def _flush_acks(self):
+        """Confirma con un XACK por stream los eventos que terminaron bien"""
+        acks, self._acks = self._acks, defaultdict(list)
+        for stream, ids in acks.items():
+            try:
+                await self.bus.redis_client.xack(stream, self.bus.group, *ids)
+            except Exception as e:
+                # Sin ACK se vuelven a entregar: los handlers son idempotentes
+                logger.error(f"Error confirmando {len(ids)} eventos de {stream}: {str(e)}")
+
+    async def _monitorear_lag(self):
+        while self.running:
+            await asyncio.sleep(settings.EVENT_LAG_INTERVAL)
+            for stream in self.bus._streams():
+                try:
+                    grupos = await self.bus.redis_client.xinfo_groups(stream)
+                except Exception as e:
+                    logger.debug(f"No se pudo leer XINFO GROUPS de {stream}: {str(e)}")
+                    continue
+                for grupo in grupos:
+                    if _str(grupo["name"]) != self.bus.group:
+                        continue
+                    # "lag" existe desde Redis 7.0
+                    self._lag[stream] = {"lag": grupo.get("lag"), "pending": grupo.get("pending")}
+                    if MetricsCollector is not None:
+                        MetricsCollector.record_event_consumer_lag(
+                            stream, self.bus.group, grupo.get("lag"), grupo.get("pending")
+                        )
+
+    def estado(self) -> dict:
+        """Estado del consumidor (para debugging / health)"""
+        return {
+            "running": self.running,
+            "group": self.bus.group,
+            "consumer": self.bus.consumer,
+            "in_flight": len(self._tareas),
+            "streams": dict(self._lag),
+        }
+
+
+def setup_event_consumer(app, bus: AsyncEventBus,
+                         concurrencia: Optional[Dict[EventType, int]] = None) -> EventConsumer:
+    """
+    Corre un EventConsumer mientras la app está levantada (startup/shutdown).
+    Los handlers se registran en `bus` antes de que arranque la app.
+    """
+    consumer = EventConsumer(bus, concurrencia)
+
+    @app.on_event("startup")
+    async def start_event_consumer():
+        await consumer.start()
+
+    @app.on_event("shutdown")
+    async def stop_event_consumer():
+        await consumer.stop()
+
+    return consumer
@@ -0,0 +1,129 @@
+"""
+Envelope binario de los eventos en Redis Streams.
+
+Cada evento es una entrada del stream con campos cortos:
+
+    v   versión del envelope
+    t   tipo de evento (EventType.value)
+    sv  versión del schema del payload (ver schemas.py)
+    ts  timestamp de creación en epoch-ms
+    s   servicio de origen
+    u   user_id (si hay)
+    c   correlation_id (si hay)
+    p   payload serializado con el Codec de caché (msgpack, con header)
+
+El header va en campos separados y el payload en uno solo: un consumidor
+puede leer tipo, origen o timestamp sin deserializar el payload, que se
+decodifica recién cuando el handler accede a event.data. Redis guarda una
+sola vez los nombres de campo repetidos dentro de cada nodo del stream, así
+que los nombres no se repiten en memoria como en el JSON anterior.
+
+Las entradas con el formato anterior (un campo "event" con JSON) se siguen
+leyendo.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from shared.cache.codecs import Codec, CodecError
+
+ENVELOPE_VERSION = 1
+
+F_VERSION = b"v"
+F_TYPE = b"t"
+F_SCHEMA = b"sv"
+F_TIMESTAMP = b"ts"
+F_SOURCE = b"s"
+F_USER = b"u"
+F_CORRELATION = b"c"
+F_PAYLOAD = b"p"
+
+# Campo único con el evento en JSON (formato anterior al envelope)
+F_LEGACY = b"event"
+
+_codec = Codec("msgpack")
+
+
+class EnvelopeError(Exception):
+    """Entrada del stream que no es un envelope válido"""
+
+
+@dataclass(frozen=True)
+class Envelope:
+    version: int
+    event_type: str
+    schema_version: int
+    timestamp_ms: int
+    source_service: str
+    user_id: Optional[str]
+    correlation_id: Optional[str]
+    payload: bytes
+
+
+def codificar(
+    event_type: str,
+    schema_version: int,
+    timestamp_ms: int,
+    source_service: str,
+    user_id: Optional[str],
+    correlation_id: Optional[str],
+    data: Dict[str, Any],
+) -> Dict[bytes, Any]:
+    """Campos de la entrada del stream para un evento"""
+    fields = {
+        F_VERSION: ENVELOPE_VERSION,
+        F_TYPE: event_type,
+        F_SCHEMA: schema_version,
+        F_TIMESTAMP: timestamp_ms,
+        F_SOURCE: source_service,
+        F_PAYLOAD: _codec.encode(data),
+    }
+    if user_id is not None:
+        fields[F_USER] = str(user_id)
+    if correlation_id is not None:
+        fields[F_CORRELATION] = correlation_id
+    return fields
+
+
+def _texto(fields: Mapping[bytes, bytes], campo: bytes) -> Optional[str]:
+    valor = fields.get(campo)
+    return valor.decode() if valor is not None else None
+
+
+def leer(fields: Mapping[bytes, bytes]) -> Envelope:
+    """
+    Lee el header de una entrada (el payload queda sin decodificar).
+
+    Raises:
+        EnvelopeError: versión desconocida o campos faltantes
+    """
+    try:
+        version = int(fields[F_VERSION])
+        if version != ENVELOPE_VERSION:
+            raise EnvelopeError(f"Versión de envelope desconocida: {version}")
+        return Envelope(
+            version=version,
+            event_type=fields[F_TYPE].decode(),
+            schema_version=int(fields.get(F_SCHEMA, 0)),
+            timestamp_ms=int(fields[F_TIMESTAMP]),
+            source_service=fields[F_SOURCE].decode(),
+            user_id=_texto(fields, F_USER),
+            correlation_id=_texto(fields, F_CORRELATION),
+            payload=fields[F_PAYLOAD],
+        )
+    except (KeyError, ValueError, AttributeError) as e:
+        raise EnvelopeError(f"Envelope inválido: {e}") from e
+
+
+def decodificar_payload(payload: bytes) -> Dict[str, Any]:
+    """
+    Raises:
+        EnvelopeError: el payload no se puede decodificar en este proceso
+    """
+    try:
+        return Codec.decode(payload)
+    except CodecError as e:
+        raise EnvelopeError(str(e)) from e
+
+
+def es_legacy(fields: Mapping[bytes, bytes]) -> bool:
+    return F_LEGACY in fields
@@ -1,55 +1,57 @@
 """
-Sistema de eventos distribuido usando Redis Pub/Sub.
+Sistema de eventos distribuido usando Redis Streams.
 Permite comunicación asíncrona entre microservicios.
+
+Cada tipo de evento es un stream ("events:{tipo}") recortado a
+EVENT_STREAM_MAXLEN. Los servicios consumen con un consumer group propio
+(ej: "notificaciones"): las réplicas de un mismo servicio se reparten los
+eventos, cada servicio recibe todos, y lo publicado mientras un consumidor
+está caído se procesa cuando vuelve (el group recuerda hasta dónde leyó).
+
+- Los eventos se leen de a lotes (XREADGROUP COUNT) y se confirman con
+  XACK solo si todos los handlers terminaron bien: los handlers deben ser
+  idempotentes, porque un evento fallido se vuelve a entregar.
+- Los eventos sin ACK por más de EVENT_CLAIM_IDLE_MS (handler fallido,
+  réplica caída) se reasignan con XAUTOCLAIM; pasadas EVENT_MAX_DELIVERIES
+  entregas van al stream de dead letter "events:dead:{tipo}".
+- replay() relee el historial de un stream y seek() mueve el group a otro
+  offset para reprocesar.
+- Cada entrada es un envelope binario versionado (ver envelope.py) con el
+  payload validado contra el schema de su tipo (ver schemas.py).
+
+EventBus usa el cliente síncrono (workers, tareas); AsyncEventBus es la
+variante para publicar y escuchar desde el event loop de FastAPI. Para
+consumir con concurrencia dentro de un servicio, ver events/consumer.py.
 """
+import asyncio
+import inspect
 import json
-import redis
 import logging
-from typing import Callable, Dict, Any, Optional
-from datetime import datetime
-from enum import Enum
+import os
+import socket
+import time
+from typing import Callable, Dict, Any, Iterator, AsyncIterator, List, Optional, Set, Tuple
+from datetime import datetime, timezone
 
-logger = logging.getLogger(__name__)
+from redis.exceptions import ResponseError
 
+from shared.core.config import settings
+from shared.core.redis_client import get_redis, get_async_redis
+from shared.events.envelope import F_LEGACY, codificar, decodificar_payload, es_legacy, leer
+from shared.events.schemas import validar_payload, version_schema
+from shared.events.types import EventType
 
-class EventType(str, Enum):
-    """Tipos de eventos del sistema"""
-    # Eventos de Trabajos
-    TRABAJO_CREADO = "trabajo.creado"
-    TRABAJO_PAGADO = "trabajo.pagado"
-    TRABAJO_EN_CURSO = "trabajo.en_curso"
-    TRABAJO_COMPLETADO = "trabajo.completado"
-    TRABAJO_CANCELADO = "trabajo.cancelado"
-    
-    # Eventos de Pagos
-    PAGO_RECIBIDO = "pago.recibido"
-    PAGO_LIBERADO = "pago.liberado"
-    PAGO_REEMBOLSADO = "pago.reembolsado"
-    
-    # Eventos de Ofertas
-    OFERTA_CREADA = "oferta.creada"
-    OFERTA_ACEPTADA = "oferta.aceptada"
-    OFERTA_RECHAZADA = "oferta.rechazada"
-    
-    # Eventos de Reseñas
-    RESENA_CREADA = "resena.creada"
-    
-    # Eventos de Usuario
-    USUARIO_REGISTRADO = "usuario.registrado"
-    KYC_APROBADO = "kyc.aprobado"
-    KYC_RECHAZADO = "kyc.rechazado"
-    
-    # Eventos de Gamificación
-    NIVEL_SUBIDO = "gamificacion.nivel_subido"
-    LOGRO_DESBLOQUEADO = "gamificacion.logro_desbloqueado"
-    
-    # Eventos de Chat
-    MENSAJE_ENVIADO = "chat.mensaje_enviado"
-    CHAT_MODERADO = "chat.moderado"
+logger = logging.getLogger(__name__)
 
 
 class Event:
-    """Representa un evento del sistema"""
+    """
+    Representa un evento del sistema.
+    
+    El payload se valida contra el schema de su tipo al crear el evento
+    (ver schemas.py). En los eventos leídos del stream, `data` se
+    decodifica recién la primera vez que se accede (ver envelope.py).
+    """
     
     def __init__(
         self,
@@ -57,46 +59,159 @@ class Event:
         data: Dict[str, Any],
         source_service: str,
         user_id: Optional[str] = None,
-        correlation_id: Optional[str] = None
+        correlation_id: Optional[str] = None,
+        timestamp_ms: Optional[int] = None
     ):
         self.event_type = event_type
-        self.data = data
+        self._data: Optional[Dict[str, Any]] = validar_payload(event_type, data)
+        self._payload: Optional[bytes] = None
+        self.schema_version = version_schema(event_type)
         self.source_service = source_service
         self.user_id = user_id
         self.correlation_id = correlation_id
-        self.timestamp = datetime.utcnow().isoformat()
+        self.timestamp_ms = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+        # Id de la entrada en el stream (solo en eventos recibidos)
+        self.stream_id: Optional[str] = None
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = decodificar_payload(self._payload)
+        return self._data
+    
+    @property
+    def timestamp(self) -> str:
+        """Timestamp de creación en ISO 8601 (UTC)"""
+        return datetime.utcfromtimestamp(self.timestamp_ms / 1000).isoformat()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el evento a diccionario"""
         return {
             "event_type": self.event_type.value,
+            "schema_version": self.schema_version,
             "data": self.data,
             "source_service": self.source_service,
             "user_id": self.user_id,
             "correlation_id": self.correlation_id,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "timestamp_ms": self.timestamp_ms
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Event':
         """Crea un evento desde un diccionario"""
-        event = cls(
+        timestamp_ms = data.get("timestamp_ms")
+        if timestamp_ms is None and data.get("timestamp"):
+            timestamp_ms = int(datetime.fromisoformat(data["timestamp"]).replace(tzinfo=timezone.utc).timestamp() * 1000)
+        return cls(
             event_type=EventType(data["event_type"]),
             data=data["data"],
             source_service=data["source_service"],
             user_id=data.get("user_id"),
-            correlation_id=data.get("correlation_id")
+            correlation_id=data.get("correlation_id"),
+            timestamp_ms=timestamp_ms
         )
-        event.timestamp = data.get("timestamp", datetime.utcnow().isoformat())
+    
+    def to_fields(self) -> Dict[bytes, Any]:
+        """Campos de la entrada del stream (envelope binario)"""
+        return codificar(
+            self.event_type.value,
+            self.schema_version,
+            self.timestamp_ms,
+            self.source_service,
+            self.user_id,
+            self.correlation_id,
+            self.data,
+        )
+    
+    @classmethod
+    def from_fields(cls, stream_id: str, fields: Dict[bytes, bytes]) -> 'Event':
+        """
+        Crea un evento desde una entrada del stream, sin decodificar el payload.
+        
+        Raises:
+            EnvelopeError: la entrada no es un envelope válido
+            ValueError: tipo de evento desconocido
+        """
+        if es_legacy(fields):
+            event = cls.from_dict(json.loads(fields[F_LEGACY]))
+        else:
+            envelope = leer(fields)
+            event = cls.__new__(cls)
+            event.event_type = EventType(envelope.event_type)
+            event._data = None
+            event._payload = envelope.payload
+            event.schema_version = envelope.schema_version
+            event.source_service = envelope.source_service
+            event.user_id = envelope.user_id
+            event.correlation_id = envelope.correlation_id
+            event.timestamp_ms = envelope.timestamp_ms
+        event.stream_id = stream_id
         return event
 
 
+STREAM_PREFIX = "events"
+DEAD_LETTER_PREFIX = "events:dead"
+
+# Entradas del stream: (id, campos)
+StreamEntry = Tuple[str, Optional[Dict[bytes, bytes]]]
+
+
+def stream_key(event_type: EventType) -> str:
+    """Stream de un tipo de evento"""
+    return f"{STREAM_PREFIX}:{event_type.value}"
+
+
+def dead_letter_key(stream: str) -> str:
+    """Stream de dead letter de un stream de eventos"""
+    return f"{DEAD_LETTER_PREFIX}:{stream[len(STREAM_PREFIX) + 1:]}"
+
+
+def _default_consumer() -> str:
+    """Nombre de consumidor único por proceso (réplica + pid)"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _str(valor) -> str:
+    """El cliente del bus es binario: ids y nombres de stream llegan como bytes"""
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+
+def _entries(entries) -> List[StreamEntry]:
+    return [(_str(entry_id), fields) for entry_id, fields in entries]
+
+
+def _decode_event(entry_id: str, fields: Dict[bytes, bytes]) -> Event:
+    return Event.from_fields(entry_id, fields)
+
+
+def _dead_letter_fields(stream: str, entry_id: str, fields: Optional[Dict[bytes, bytes]], motivo: str) -> Dict[Any, Any]:
+    return {
+        **(fields or {}),
+        b"dl_stream": stream,
+        b"dl_stream_id": entry_id,
+        b"dl_motivo": motivo,
+    }
+
+
+def _entregas(pendientes: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Cantidad de entregas por id, desde la respuesta de XPENDING"""
+    return {_str(p["message_id"]): p["times_delivered"] for p in pendientes}
+
+
 class EventBus:
-    """Sistema de eventos distribuido usando Redis Pub/Sub"""
+    """
+    Sistema de eventos distribuido usando Redis Streams.
+
+    Para publicar alcanza con EventBus(). Para consumir hace falta un
+    `group` (uno por servicio); `consumer` identifica a la réplica dentro
+    del group (default: hostname-pid).
+    """
     
-    def __init__(self, redis_url: str = "redis://redis:6379"):
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
-        self.pubsub = None
+    def __init__(self, redis_url: Optional[str] = None, group: Optional[str] = None, consumer: Optional[str] = None):
+        self.redis_client = get_redis(redis_url, decode_responses=False)
+        self.group = group
+        self.consumer = consumer or _default_consumer()
         self.handlers: Dict[EventType, list[Callable]] = {}
         self.running = False
     
@@ -111,10 +226,12 @@ class EventBus:
             True si se publicó correctamente
         """
         try:
-            channel = f"events:{event.event_type.value}"
-            message = json.dumps(event.to_dict())
-            
-            self.redis_client.publish(channel, message)
+            self.redis_client.xadd(
+                stream_key(event.event_type),
+                event.to_fields(),
+                maxlen=settings.EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
             logger.info(f"Evento publicado: {event.event_type.value} desde {event.source_service}")
             return True
             
@@ -136,66 +253,348 @@ class EventBus:
         self.handlers[event_type].append(handler)
         logger.info(f"Handler registrado para evento: {event_type.value}")
     
+    def _streams(self) -> List[str]:
+        if not self.group:
+            raise ValueError("Para consumir eventos hay que indicar un consumer group")
+        return [stream_key(event_type) for event_type in self.handlers]
+    
+    def _ensure_groups(self):
+        """Crea el consumer group en cada stream (y el stream si no existe)"""
+        for stream in self._streams():
+            try:
+                self.redis_client.xgroup_create(stream, self.group, id=settings.EVENT_GROUP_START_ID, mkstream=True)
+                logger.info(f"Consumer group '{self.group}' creado en {stream}")
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+    
     def start_listening(self):
-        """Inicia el listener de eventos en background"""
+        """
+        Consume los eventos registrados hasta que se llame a stop_listening.
+        Bloquea el thread: pensado para un proceso o thread dedicado.
+        """
         if self.running:
             logger.warning("EventBus ya está corriendo")
             return
         
-        self.pubsub = self.redis_client.pubsub()
-        
-        # Suscribirse a todos los canales de eventos registrados
-        for event_type in self.handlers.keys():
-            channel = f"events:{event_type.value}"
-            self.pubsub.subscribe(channel)
-            logger.info(f"Suscrito al canal: {channel}")
+        self._ensure_groups()
+        streams = {stream: ">" for stream in self._streams()}
+        logger.info(f"Consumiendo {list(streams)} como {self.group}/{self.consumer}")
         
         self.running = True
+        ultimo_reclamo = 0.0
         
-        # Escuchar mensajes
-        for message in self.pubsub.listen():
-            if not self.running:
-                break
-            
-            if message['type'] == 'message':
-                self._handle_message(message)
+        while self.running:
+            try:
+                if time.monotonic() - ultimo_reclamo >= settings.EVENT_CLAIM_INTERVAL:
+                    self._reclaim_pending()
+                    ultimo_reclamo = time.monotonic()
+                
+                response = self.redis_client.xreadgroup(
+                    self.group, self.consumer, streams,
+                    count=settings.EVENT_READ_COUNT, block=settings.EVENT_BLOCK_MS,
+                )
+                for stream, entries in response or []:
+                    self._handle_batch(_str(stream), _entries(entries))
+            except Exception as e:
+                logger.error(f"Error leyendo eventos: {str(e)}")
+                time.sleep(1)
     
-    def _handle_message(self, message: Dict[str, Any]):
-        """Procesa un mensaje recibido"""
+    def _handle_batch(self, stream: str, entries: List[StreamEntry]):
+        """Procesa un lote de un stream y confirma (XACK) los que terminaron bien"""
+        procesados = [entry_id for entry_id, fields in entries if self._handle_entry(stream, entry_id, fields)]
+        if procesados:
+            self.redis_client.xack(stream, self.group, *procesados)
+    
+    def _handle_entry(self, stream: str, entry_id: str, fields: Optional[Dict[bytes, bytes]]) -> bool:
+        """
+        Ejecuta los handlers de un evento.
+        
+        Returns:
+            True si el evento se puede confirmar; False para que se reintente
+        """
         try:
-            # Parsear el evento
-            event_data = json.loads(message['data'])
-            event = Event.from_dict(event_data)
-            
-            # Ejecutar handlers registrados
-            if event.event_type in self.handlers:
-                for handler in self.handlers[event.event_type]:
-                    try:
-                        handler(event)
-                    except Exception as e:
-                        logger.error(f"Error en handler de {event.event_type.value}: {str(e)}")
-            
+            event = _decode_event(entry_id, fields)
         except Exception as e:
-            logger.error(f"Error procesando mensaje: {str(e)}")
+            # Un evento ilegible no se va a poder procesar nunca
+            logger.error(f"Evento inválido {stream}/{entry_id}: {str(e)}")
+            self._dead_letter(stream, entry_id, fields, f"inválido: {e}")
+            return True
+        
+        ok = True
+        for handler in self.handlers.get(event.event_type, []):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Error en handler de {event.event_type.value}: {str(e)}")
+                ok = False
+        return ok
+    
+    def _reclaim_pending(self):
+        """
+        Toma los eventos que otro consumidor (o este) dejó sin ACK por más de
+        EVENT_CLAIM_IDLE_MS y los vuelve a procesar.
+        """
+        for stream in self._streams():
+            for entries in self._reclamar(stream):
+                self._handle_batch(stream, entries)
+    
+    def _reclamar(self, stream: str) -> Iterator[List[StreamEntry]]:
+        """
+        Lotes de eventos reclamados con XAUTOCLAIM. Los que ya superaron
+        EVENT_MAX_DELIVERIES van al dead letter y no se devuelven.
+        """
+        start_id = "0-0"
+        while True:
+            respuesta = self.redis_client.xautoclaim(
+                stream, self.group, self.consumer,
+                min_idle_time=settings.EVENT_CLAIM_IDLE_MS,
+                start_id=start_id, count=settings.EVENT_READ_COUNT,
+            )
+            start_id, entries = _str(respuesta[0]), _entries(e for e in respuesta[1] if e[1] is not None)
+            if entries:
+                entregas = _entregas(self.redis_client.xpending_range(
+                    stream, self.group, min=entries[0][0], max=entries[-1][0], count=len(entries),
+                ))
+                vigentes = []
+                for entry_id, fields in entries:
+                    if entregas.get(entry_id, 0) > settings.EVENT_MAX_DELIVERIES:
+                        self._dead_letter(stream, entry_id, fields, "máximo de entregas")
+                        self.redis_client.xack(stream, self.group, entry_id)
+                    else:
+                        vigentes.append((entry_id, fields))
+                if vigentes:
+                    yield vigentes
+            if start_id == "0-0":
+                return
+    
+    def _dead_letter(self, stream: str, entry_id: str, fields: Optional[Dict[bytes, bytes]], motivo: str):
+        logger.warning(f"Evento {stream}/{entry_id} movido al dead letter: {motivo}")
+        self.redis_client.xadd(
+            dead_letter_key(stream),
+            _dead_letter_fields(stream, entry_id, fields, motivo),
+            maxlen=settings.EVENT_DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+    
+    def replay(self, event_type: EventType, desde: str = "-", hasta: str = "+") -> Iterator[Event]:
+        """
+        Relee el historial de un tipo de evento (lo que queda dentro de
+        EVENT_STREAM_MAXLEN), de a EVENT_READ_COUNT eventos por consulta.
+        No afecta a los consumer groups.
+        
+        Args:
+            event_type: Tipo de evento
+            desde: Id de stream inicial, inclusive ("-" = el más viejo; un
+                   timestamp en ms también sirve, ej: "1700000000000")
+            hasta: Id de stream final, inclusive ("+" = el último)
+        """
+        stream = stream_key(event_type)
+        while True:
+            entries = self.redis_client.xrange(stream, min=desde, max=hasta, count=settings.EVENT_READ_COUNT)
+            for entry_id, fields in _entries(entries):
+                yield _decode_event(entry_id, fields)
+            if len(entries) < settings.EVENT_READ_COUNT:
+                return
+            desde = f"({_str(entries[-1][0])}"
+    
+    def seek(self, event_type: EventType, desde: str):
+        """
+        Mueve el consumer group de este bus al offset `desde` ("0" = todo el
+        historial, "$" = solo lo nuevo): los eventos posteriores se vuelven a
+        entregar a los handlers.
+        """
+        self.redis_client.xgroup_setid(stream_key(event_type), self.group, desde)
+        logger.info(f"Consumer group '{self.group}' de {event_type.value} movido a {desde}")
     
     def stop_listening(self):
-        """Detiene el listener de eventos"""
+        """Detiene el listener de eventos (termina después de la lectura en curso)"""
+        self.running = False
+        logger.info("EventBus detenido")
+
+
+class AsyncEventBus(EventBus):
+    """
+    Variante de EventBus sobre redis.asyncio. Mismos streams, groups y
+    formato de evento que EventBus. Los handlers pueden ser funciones o
+    corrutinas.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, group: Optional[str] = None, consumer: Optional[str] = None):
+        self.redis_client = get_async_redis(redis_url, decode_responses=False)
+        self.group = group
+        self.consumer = consumer or _default_consumer()
+        self.handlers: Dict[EventType, list[Callable]] = {}
+        self.running = False
+    
+    async def publish(self, event: Event) -> bool:
+        """Publica un evento en el bus"""
+        try:
+            await self.redis_client.xadd(
+                stream_key(event.event_type),
+                event.to_fields(),
+                maxlen=settings.EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
+            logger.info(f"Evento publicado: {event.event_type.value} desde {event.source_service}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error publicando evento: {str(e)}")
+            return False
+    
+    async def _ensure_groups(self):
+        for stream in self._streams():
+            try:
+                await self.redis_client.xgroup_create(stream, self.group, id=settings.EVENT_GROUP_START_ID, mkstream=True)
+                logger.info(f"Consumer group '{self.group}' creado en {stream}")
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+    
+    async def start_listening(self):
+        """
+        Consume los eventos registrados hasta que se llame a stop_listening.
+        Pensado para correr como task: asyncio.create_task(bus.start_listening())
+        """
+        if self.running:
+            logger.warning("EventBus ya está corriendo")
+            return
+        
+        await self._ensure_groups()
+        streams = {stream: ">" for stream in self._streams()}
+        logger.info(f"Consumiendo {list(streams)} como {self.group}/{self.consumer}")
+        
+        self.running = True
+        ultimo_reclamo = 0.0
+        
+        while self.running:
+            try:
+                if time.monotonic() - ultimo_reclamo >= settings.EVENT_CLAIM_INTERVAL:
+                    await self._reclaim_pending()
+                    ultimo_reclamo = time.monotonic()
+                
+                response = await self.redis_client.xreadgroup(
+                    self.group, self.consumer, streams,
+                    count=settings.EVENT_READ_COUNT, block=settings.EVENT_BLOCK_MS,
+                )
+                for stream, entries in response or []:
+                    await self._handle_batch(_str(stream), _entries(entries))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error leyendo eventos: {str(e)}")
+                await asyncio.sleep(1)
+    
+    async def _handle_batch(self, stream: str, entries: List[StreamEntry]):
+        procesados = [entry_id for entry_id, fields in entries if await self._handle_entry(stream, entry_id, fields)]
+        if procesados:
+            await self.redis_client.xack(stream, self.group, *procesados)
+    
+    async def _handle_entry(self, stream: str, entry_id: str, fields: Optional[Dict[bytes, bytes]]) -> bool:
+        try:
+            event = _decode_event(entry_id, fields)
+        except Exception as e:
+            logger.error(f"Evento inválido {stream}/{entry_id}: {str(e)}")
+            await self._dead_letter(stream, entry_id, fields, f"inválido: {e}")
+            return True
+        
+        ok = True
+        for handler in self.handlers.get(event.event_type, []):
+            try:
+                if inspect.iscoroutinefunction(handler):
+                    await handler(event)
+                else:
+                    # Handlers síncronos en un thread, sin bloquear el loop
+                    await asyncio.to_thread(handler, event)
+            except Exception as e:
+                logger.error(f"Error en handler de {event.event_type.value}: {str(e)}")
+                ok = False
+        return ok
+    
+    async def _reclaim_pending(self):
+        for stream in self._streams():
+            async for entries in self._reclamar(stream):
+                await self._handle_batch(stream, entries)
+    
+    async def _reclamar(self, stream: str, en_proceso: Optional[Set[str]] = None) -> AsyncIterator[List[StreamEntry]]:
+        """
+        Lotes de eventos reclamados con XAUTOCLAIM (ver EventBus._reclamar).
+
+        Los ids de `en_proceso` (eventos que este consumidor todavía está
+        procesando) no se devuelven ni cuentan para EVENT_MAX_DELIVERIES.
+        """
+        en_proceso = en_proceso or set()
+        start_id = "0-0"
+        while True:
+            respuesta = await self.redis_client.xautoclaim(
+                stream, self.group, self.consumer,
+                min_idle_time=settings.EVENT_CLAIM_IDLE_MS,
+                start_id=start_id, count=settings.EVENT_READ_COUNT,
+            )
+            start_id, entries = _str(respuesta[0]), _entries(e for e in respuesta[1] if e[1] is not None)
+            if entries:
+                entregas = _entregas(await self.redis_client.xpending_range(
+                    stream, self.group, min=entries[0][0], max=entries[-1][0], count=len(entries),
+                ))
+                vigentes = []
+                for entry_id, fields in entries:
+                    if entry_id in en_proceso:
+                        continue
+                    if entregas.get(entry_id, 0) > settings.EVENT_MAX_DELIVERIES:
+                        await self._dead_letter(stream, entry_id, fields, "máximo de entregas")
+                        await self.redis_client.xack(stream, self.group, entry_id)
+                    else:
+                        vigentes.append((entry_id, fields))
+                if vigentes:
+                    yield vigentes
+            if start_id == "0-0":
+                return
+    
+    async def _dead_letter(self, stream: str, entry_id: str, fields: Optional[Dict[bytes, bytes]], motivo: str):
+        logger.warning(f"Evento {stream}/{entry_id} movido al dead letter: {motivo}")
+        await self.redis_client.xadd(
+            dead_letter_key(stream),
+            _dead_letter_fields(stream, entry_id, fields, motivo),
+            maxlen=settings.EVENT_DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+    
+    async def replay(self, event_type: EventType, desde: str = "-", hasta: str = "+") -> AsyncIterator[Event]:
+        """Relee el historial de un tipo de evento (ver EventBus.replay)"""
+        stream = stream_key(event_type)
+        while True:
+            entries = await self.redis_client.xrange(stream, min=desde, max=hasta, count=settings.EVENT_READ_COUNT)
+            for entry_id, fields in _entries(entries):
+                yield _decode_event(entry_id, fields)
+            if len(entries) < settings.EVENT_READ_COUNT:
+                return
+            desde = f"({_str(entries[-1][0])}"
+    
+    async def seek(self, event_type: EventType, desde: str):
+        """Mueve el consumer group de este bus al offset `desde` (ver EventBus.seek)"""
+        await self.redis_client.xgroup_setid(stream_key(event_type), self.group, desde)
+        logger.info(f"Consumer group '{self.group}' de {event_type.value} movido a {desde}")
+    
+    async def stop_listening(self):
+        """Detiene el listener de eventos (termina después de la lectura en curso)"""
         self.running = False
-        if self.pubsub:
-            self.pubsub.close()
         logger.info("EventBus detenido")
 
 
-# Instancia global del event bus
+# Instancias globales del event bus (sync y async)
 _event_bus: Optional[EventBus] = None
+_async_event_bus: Optional[AsyncEventBus] = None
 
 
-def get_event_bus(redis_url: str = "redis://redis:6379") -> EventBus:
+def get_event_bus(redis_url: Optional[str] = None, group: Optional[str] = None) -> EventBus:
     """
     Obtiene la instancia global del event bus.
     
     Args:
-        redis_url: URL de conexión a Redis
+        redis_url: URL de conexión a Redis (default: settings.REDIS_URL)
+        group: Consumer group del servicio (solo hace falta para consumir;
+               se toma en la primera llamada)
         
     Returns:
         Instancia del EventBus
@@ -203,15 +602,32 @@ def get_event_bus(redis_url: str = "redis://redis:6379") -> EventBus:
     global _event_bus
     
     if _event_bus is None:
-        _event_bus = EventBus(redis_url)
+        _event_bus = EventBus(redis_url, group=group)
     
     return _event_bus
 
 
-# Helpers para publicar eventos comunes
+def get_async_event_bus(redis_url: Optional[str] = None, group: Optional[str] = None) -> AsyncEventBus:
+    """Obtiene la instancia global del event bus async"""
+    global _async_event_bus
+    
+    if _async_event_bus is None:
+        _async_event_bus = AsyncEventBus(redis_url, group=group)
+    
+    return _async_event_bus
+
+
+# Helpers para publicar eventos comunes. Encolan el evento en el outbox de
+# la sesión `db`: se publica cuando el llamador hace commit (ver outbox.py)
+
+def _encolar(db, event: Event):
+    from shared.events.outbox import encolar_evento
+    
+    encolar_evento(db, event)
+
 
-def publish_trabajo_creado(trabajo_id: str, cliente_id: str, profesional_id: str, monto: float, source_service: str):
-    """Publica evento de trabajo creado"""
+def publish_trabajo_creado(db, trabajo_id: str, cliente_id: str, profesional_id: str, monto: float, source_service: str):
+    """Encola evento de trabajo creado"""
     event = Event(
         event_type=EventType.TRABAJO_CREADO,
         data={
@@ -223,11 +639,11 @@ def publish_trabajo_creado(trabajo_id: str, cliente_id: str, profesional_id: str
         source_service=source_service,
         user_id=cliente_id
     )
-    get_event_bus().publish(event)
+    _encolar(db, event)
 
 
-def publish_pago_recibido(trabajo_id: str, monto: float, payment_id: str, source_service: str):
-    """Publica evento de pago recibido"""
+def publish_pago_recibido(db, trabajo_id: str, monto: float, payment_id: str, source_service: str):
+    """Encola evento de pago recibido"""
     event = Event(
         event_type=EventType.PAGO_RECIBIDO,
         data={
@@ -237,11 +653,11 @@ def publish_pago_recibido(trabajo_id: str, monto: float, payment_id: str, source
         },
         source_service=source_service
     )
-    get_event_bus().publish(event)
+    _encolar(db, event)
 
 
-def publish_trabajo_completado(trabajo_id: str, profesional_id: str, cliente_id: str, source_service: str):
-    """Publica evento de trabajo completado"""
+def publish_trabajo_completado(db, trabajo_id: str, profesional_id: str, cliente_id: str, source_service: str):
+    """Encola evento de trabajo completado"""
     event = Event(
         event_type=EventType.TRABAJO_COMPLETADO,
         data={
@@ -252,11 +668,11 @@ def publish_trabajo_completado(trabajo_id: str, profesional_id: str, cliente_id:
         source_service=source_service,
         user_id=profesional_id
     )
-    get_event_bus().publish(event)
+    _encolar(db, event)
 
 
-def publish_resena_creada(resena_id: str, trabajo_id: str, profesional_id: str, rating: float, source_service: str):
-    """Publica evento de reseña creada"""
+def publish_resena_creada(db, resena_id: str, trabajo_id: str, profesional_id: str, rating: float, source_service: str):
+    """Encola evento de reseña creada"""
     event = Event(
         event_type=EventType.RESENA_CREADA,
         data={
@@ -268,11 +684,11 @@ def publish_resena_creada(resena_id: str, trabajo_id: str, profesional_id: str,
         source_service=source_service,
         user_id=profesional_id
     )
-    get_event_bus().publish(event)
+    _encolar(db, event)
 
 
-def publish_kyc_aprobado(profesional_id: str, user_id: str, source_service: str):
-    """Publica evento de KYC aprobado"""
+def publish_kyc_aprobado(db, profesional_id: str, user_id: str, source_service: str):
+    """Encola evento de KYC aprobado"""
     event = Event(
         event_type=EventType.KYC_APROBADO,
         data={
@@ -282,4 +698,4 @@ def publish_kyc_aprobado(profesional_id: str, user_id: str, source_service: str)
         source_service=source_service,
         user_id=user_id
     )
-    get_event_bus().publish(event)
+    _encolar(db, event)
@@ -0,0 +1,165 @@
+"""
+Outbox transaccional para publicar eventos.
+
+Publicar en Redis desde el request tiene dos problemas: suma un round trip
+a la latencia de cada request y, si el proceso se cae entre el commit y el
+publish, el evento se pierde. Con el outbox:
+
+- encolar_evento(db, event) agrega el evento a la tabla outbox_eventos en
+  la misma transacción que el cambio de negocio: si hay rollback, no hay
+  evento.
+- OutboxRelay (un thread por proceso, ver iniciar_relay) toma lotes de
+  EVENT_OUTBOX_BATCH_SIZE filas con FOR UPDATE SKIP LOCKED, los publica
+  con un solo pipeline de XADD y borra las filas en la misma transacción.
+  Varias réplicas pueden correr el relay sin publicar dos veces un lote.
+
+El relay se despierta apenas se hace commit de una sesión que encoló
+eventos; si no, revisa la tabla cada EVENT_OUTBOX_POLL_INTERVAL segundos
+(eventos encolados por otra réplica). La entrega es at-least-once: si el
+relay se cae entre el XADD y el commit, el lote se vuelve a publicar.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import delete, event as sa_event, func, select
+from sqlalchemy.orm import Session
+
+from shared.core.config import settings
+from shared.core.redis_client import get_redis
+from shared.events.event_bus import Event, EventType, stream_key
+from shared.models.outbox import OutboxEvento
+
+logger = logging.getLogger(__name__)
+
+# Marca en Session.info de que la transacción encoló eventos
+_PENDIENTE = "outbox_pendiente"
+
+_despertar = threading.Event()
+
+
+def encolar_evento(db: Session, event: Event) -> None:
+    """
+    Agrega un evento al outbox. Se publica cuando el llamador hace commit
+    de `db` (no hace commit por su cuenta).
+    """
+    db.add(OutboxEvento(event_type=event.event_type.value, payload=event.to_dict()))
+    db.info[_PENDIENTE] = True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _despertar_relay(session: Session):
+    if session.info.pop(_PENDIENTE, False):
+        _despertar.set()
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _descartar_marca(session: Session):
+    session.info.pop(_PENDIENTE, None)
+
+
+class OutboxRelay:
+    """Publica los eventos del outbox en Redis Streams"""
+
+    def __init__(self, session_factory, redis_url: Optional[str] = None):
+        self.session_factory = session_factory
+        self.redis_client = get_redis(redis_url, decode_responses=False)
+        self.running = False
+
+    def publicar_lote(self, db: Session) -> int:
+        """
+        Publica y borra un lote del outbox.
+
+        Returns:
+            Cantidad de eventos publicados (0 si no había o los tiene otra réplica)
+        """
+        filas = db.execute(
+            select(OutboxEvento.id, OutboxEvento.event_type, OutboxEvento.payload)
+            .order_by(OutboxEvento.id)
+            .limit(settings.EVENT_OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not filas:
+            db.rollback()
+            return 0
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for fila in filas:
+            pipe.xadd(
+                stream_key(EventType(fila.event_type)),
+                Event.from_dict(fila.payload).to_fields(),
+                maxlen=settings.EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
+        pipe.execute()
+
+        db.execute(delete(OutboxEvento).where(OutboxEvento.id.in_([fila.id for fila in filas])))
+        db.commit()
+        return len(filas)
+
+    def drenar(self) -> int:
+        """Publica lotes hasta vaciar el outbox. Devuelve el total publicado"""
+        total = 0
+        db = self.session_factory()
+        try:
+            while True:
+                publicados = self.publicar_lote(db)
+                total += publicados
+                if publicados < settings.EVENT_OUTBOX_BATCH_SIZE:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return total
+
+    def run(self):
+        """Loop del relay; termina con stop()"""
+        self.running = True
+        while self.running:
+            _despertar.wait(settings.EVENT_OUTBOX_POLL_INTERVAL)
+            _despertar.clear()
+            try:
+                publicados = self.drenar()
+                if publicados:
+                    logger.info(f"Outbox: {publicados} eventos publicados")
+            except Exception as e:
+                logger.error(f"Error publicando eventos del outbox: {str(e)}")
+                time.sleep(settings.EVENT_OUTBOX_POLL_INTERVAL)
+
+    def stop(self):
+        self.running = False
+        _despertar.set()
+
+    def pendientes(self) -> dict:
+        """Eventos sin publicar y antigüedad del más viejo (para debugging / health)"""
+        db = self.session_factory()
+        try:
+            total, mas_viejo = db.execute(
+                select(func.count(OutboxEvento.id), func.min(OutboxEvento.fecha_creacion))
+            ).one()
+        finally:
+            db.close()
+        return {"pendientes": total, "mas_viejo": mas_viejo.isoformat() if mas_viejo else None}
+
+
+_relay: Optional[OutboxRelay] = None
+
+
+def iniciar_relay() -> OutboxRelay:
+    """Arranca el relay del proceso en un thread daemon (para el evento de startup)"""
+    global _relay
+    if _relay is None:
+        from shared.core.database import SessionLocal
+
+        _relay = OutboxRelay(SessionLocal)
+        threading.Thread(target=_relay.run, name="outbox-relay", daemon=True).start()
+    return _relay
+
+
+def detener_relay():
+    """Detiene el relay del proceso (para el evento de shutdown)"""
+    if _relay is not None:
+        _relay.stop()
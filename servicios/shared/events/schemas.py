@@ -0,0 +1,115 @@
+"""
+Registro de schemas de payload por tipo de evento.
+
+Cada tipo registrado declara sus campos con tipo (y default si es
+opcional) y una versión. A partir de eso se genera un modelo de Pydantic
+que valida y normaliza el payload al crear el evento: un productor con un
+campo faltante o de otro tipo falla en el request que lo origina, no en
+el consumidor.
+
+La versión viaja en el envelope (ver envelope.py). Al agregar un campo
+opcional alcanza con agregarlo acá; al cambiar uno existente hay que
+subir la versión para que los consumidores puedan distinguir los eventos
+viejos que todavía estén en el stream.
+
+Los tipos sin schema registrado se publican sin validar.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+from shared.events.types import EventType
+
+
+@dataclass(frozen=True)
+class EventSchema:
+    event_type: EventType
+    version: int
+    modelo: Type[BaseModel]
+
+
+_REGISTRO: Dict[EventType, EventSchema] = {}
+
+
+def registrar(event_type: EventType, version: int = 1, **campos: Any) -> EventSchema:
+    """
+    Registra el schema del payload de un tipo de evento.
+
+    Args:
+        event_type: Tipo de evento
+        version: Versión del schema
+        **campos: nombre=tipo (obligatorio) o nombre=(tipo, default)
+    """
+    definiciones = {
+        nombre: campo if isinstance(campo, tuple) else (campo, ...)
+        for nombre, campo in campos.items()
+    }
+    nombre_modelo = "".join(parte.title() for parte in event_type.name.split("_")) + "Payload"
+    modelo = create_model(nombre_modelo, __config__=ConfigDict(extra="allow"), **definiciones)
+    schema = _REGISTRO[event_type] = EventSchema(event_type, version, modelo)
+    return schema
+
+
+def obtener_schema(event_type: EventType) -> Optional[EventSchema]:
+    return _REGISTRO.get(event_type)
+
+
+def version_schema(event_type: EventType) -> int:
+    """Versión vigente del schema (0 si el tipo no tiene schema)"""
+    schema = _REGISTRO.get(event_type)
+    return schema.version if schema else 0
+
+
+def validar_payload(event_type: EventType, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valida y normaliza el payload de un evento.
+
+    Raises:
+        pydantic.ValidationError: el payload no cumple el schema
+    """
+    schema = _REGISTRO.get(event_type)
+    if schema is None:
+        return data
+    return schema.modelo.model_validate(data).model_dump()
+
+
+# ============================================================================
+# SCHEMAS
+# ============================================================================
+
+registrar(
+    EventType.TRABAJO_CREADO,
+    trabajo_id=str,
+    cliente_id=str,
+    profesional_id=str,
+    monto=float,
+)
+
+registrar(
+    EventType.TRABAJO_COMPLETADO,
+    trabajo_id=str,
+    profesional_id=str,
+    cliente_id=str,
+)
+
+registrar(
+    EventType.PAGO_RECIBIDO,
+    trabajo_id=str,
+    monto=float,
+    payment_id=str,
+)
+
+registrar(
+    EventType.RESENA_CREADA,
+    resena_id=str,
+    trabajo_id=str,
+    profesional_id=str,
+    rating=float,
+)
+
+registrar(
+    EventType.KYC_APROBADO,
+    profesional_id=str,
+    user_id=str,
+)
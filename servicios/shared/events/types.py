@@ -0,0 +1,40 @@
+"""
+Tipos de eventos del sistema (un stream de Redis por tipo).
+"""
+from enum import Enum
+
+
+class EventType(str, Enum):
+    """Tipos de eventos del sistema"""
+    # Eventos de Trabajos
+    TRABAJO_CREADO = "trabajo.creado"
+    TRABAJO_PAGADO = "trabajo.pagado"
+    TRABAJO_EN_CURSO = "trabajo.en_curso"
+    TRABAJO_COMPLETADO = "trabajo.completado"
+    TRABAJO_CANCELADO = "trabajo.cancelado"
+    
+    # Eventos de Pagos
+    PAGO_RECIBIDO = "pago.recibido"
+    PAGO_LIBERADO = "pago.liberado"
+    PAGO_REEMBOLSADO = "pago.reembolsado"
+    
+    # Eventos de Ofertas
+    OFERTA_CREADA = "oferta.creada"
+    OFERTA_ACEPTADA = "oferta.aceptada"
+    OFERTA_RECHAZADA = "oferta.rechazada"
+    
+    # Eventos de Reseñas
+    RESENA_CREADA = "resena.creada"
+    
+    # Eventos de Usuario
+    USUARIO_REGISTRADO = "usuario.registrado"
+    KYC_APROBADO = "kyc.aprobado"
+    KYC_RECHAZADO = "kyc.rechazado"
+    
+    # Eventos de Gamificación
+    NIVEL_SUBIDO = "gamificacion.nivel_subido"
+    LOGRO_DESBLOQUEADO = "gamificacion.logro_desbloqueado"
+    
+    # Eventos de Chat
+    MENSAJE_ENVIADO = "chat.mensaje_enviado"
+    CHAT_MODERADO = "chat.moderado"
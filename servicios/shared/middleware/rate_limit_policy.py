@@ -0,0 +1,239 @@
+"""
+Tabla de políticas de rate limiting por ruta, aplicada en la puerta de enlace.
+
+Cada política es (prefijo de ruta × métodos × tipo de key) → algoritmo +
+presupuesto. La puerta de enlace la evalúa una sola vez por request, antes
+de reenviarlo: lo que excede el límite se rechaza sin costar un salto al
+microservicio ni una sesión de base de datos, y los servicios no necesitan
+aplicar los decoradores rate_limit_* a mano.
+
+Para cada request se usa la política más específica: la de prefijo más
+largo y, a igual prefijo, la que declara métodos antes que la que aplica a
+todos. Los prefijos se comparan por segmentos ("/search" cubre
+"/search/batch" pero no "/searches") y sobre la ruta sin versión
+("/auth/login", no "/api/v1/auth/login").
+
+Tipos de key:
+- "ip": IP del cliente. X-Forwarded-For solo se respeta si el request
+  llega de un proxy de RATE_LIMIT_TRUSTED_PROXIES (ver client_ip).
+- "user": `sub` del JWT del header Authorization. El token se verifica
+  (firma y expiración) pero sin ir a la base; sin token válido se limita
+  por IP.
+
+Cada política tiene su propio contador, así los intentos de login no
+gastan el presupuesto general del cliente.
+
+La tabla por defecto es POLITICAS_DEFAULT; RATE_LIMIT_POLICIES (JSON)
+la reemplaza completa. Cada entrada:
+
+    {"prefix": "/auth/login", "methods": ["POST"], "per": "ip",
+     "budget": "AUTH", "algorithm": "sliding_log"}
+
+`budget` es el nombre de un presupuesto de RateLimitConfig; en su lugar
+se pueden dar "max_requests" y "window_seconds". "methods" y "algorithm"
+son opcionales (todos los métodos / RATE_LIMIT_ALGORITHM).
+"""
+import logging
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from jose import jwt, JWTError
+
+from shared.core.config import settings
+from shared.middleware.rate_limiter import (
+    ALGORITHMS,
+    HybridRateLimiter,
+    RateLimitConfig,
+    get_hybrid_rate_limiter,
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_TYPES = ("ip", "user")
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    prefix: str
+    methods: FrozenSet[str]  # vacío = todos los métodos
+    per: str
+    max_requests: int
+    window_seconds: int
+    algorithm: Optional[str] = None
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        base = self.prefix.rstrip("/")
+        return path == base or path.startswith(base + "/")
+
+
+POLITICAS_DEFAULT: List[dict] = [
+    # Autenticación: límites bajos y exactos por IP
+    {"prefix": "/auth/login", "methods": ["POST"], "per": "ip", "budget": "AUTH", "algorithm": "sliding_log"},
+    {"prefix": "/auth/reset-password", "methods": ["POST"], "per": "ip", "budget": "AUTH", "algorithm": "sliding_log"},
+    {"prefix": "/auth/forgot-password", "methods": ["POST"], "per": "ip", "budget": "EMAIL", "algorithm": "sliding_log"},
+    {"prefix": "/auth/register", "methods": ["POST"], "per": "ip", "budget": "STRICT"},
+
+    # Búsquedas
+    {"prefix": "/search", "methods": ["POST"], "per": "ip", "budget": "SEARCH"},
+    {"prefix": "/users/search", "methods": ["GET"], "per": "ip", "budget": "SEARCH"},
+
+    # Creación de recursos y uploads
+    {"prefix": "/ofertas", "methods": ["POST"], "per": "user", "budget": "CREATE_OFERTA"},
+    {"prefix": "/users/me/avatar", "methods": ["POST"], "per": "user", "budget": "UPLOAD"},
+    {"prefix": "/professional/kyc/submit", "methods": ["POST"], "per": "user", "budget": "UPLOAD"},
+
+    # Webhooks de MercadoPago (vienen de pocas IPs)
+    {"prefix": "/webhook", "methods": ["POST"], "per": "ip", "budget": "WEBHOOK"},
+
+    # Resto de la API
+    {"prefix": "/", "per": "user", "budget": "GENERAL"},
+]
+
+
+def _parse_policy(raw: dict) -> RateLimitPolicy:
+    """
+    Raises:
+        ValueError: entrada incompleta o con valores desconocidos
+    """
+    try:
+        prefix = raw["prefix"]
+        if not prefix.startswith("/"):
+            raise ValueError(f"el prefijo debe empezar con '/': {prefix}")
+
+        per = raw.get("per", "ip")
+        if per not in KEY_TYPES:
+            raise ValueError(f"tipo de key desconocido: {per}")
+
+        algorithm = raw.get("algorithm")
+        if algorithm is not None and algorithm not in ALGORITHMS:
+            raise ValueError(f"algoritmo desconocido: {algorithm}")
+
+        if "budget" in raw:
+            budget = raw["budget"].upper()
+            if not isinstance(getattr(RateLimitConfig, budget, None), tuple):
+                raise ValueError(f"presupuesto desconocido: {raw['budget']}")
+            max_requests, window_seconds = getattr(RateLimitConfig, budget)
+        else:
+            max_requests, window_seconds = int(raw["max_requests"]), int(raw["window_seconds"])
+        if max_requests < 1 or window_seconds < 1:
+            raise ValueError("max_requests y window_seconds deben ser positivos")
+
+        methods = frozenset(m.upper() for m in raw.get("methods") or [])
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Política de rate limit inválida {raw!r}: {e}") from e
+
+    name = raw.get("name") or f"{'|'.join(sorted(methods)) or '*'}:{prefix}"
+    return RateLimitPolicy(name, prefix, methods, per, max_requests, window_seconds, algorithm)
+
+
+def load_policies(raw_policies: Optional[Iterable[dict]] = None) -> List[RateLimitPolicy]:
+    """
+    Parsea la tabla (default: RATE_LIMIT_POLICIES o POLITICAS_DEFAULT) y la
+    ordena de más a menos específica.
+
+    Raises:
+        ValueError: alguna entrada es inválida (mejor fallar al arrancar)
+    """
+    if raw_policies is None:
+        raw_policies = settings.RATE_LIMIT_POLICIES or POLITICAS_DEFAULT
+    policies = [_parse_policy(raw) for raw in raw_policies]
+    policies.sort(key=lambda p: (len(p.prefix.rstrip("/")), bool(p.methods)), reverse=True)
+    return policies
+
+
+class PolicyRateLimiter:
+    """Aplica la tabla de políticas con HybridRateLimiter"""
+
+    def __init__(self, limiter: HybridRateLimiter, policies: List[RateLimitPolicy]):
+        self.limiter = limiter
+        self.policies = policies
+
+    def policy_for(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return None
+
+    @staticmethod
+    def _user_id(request: Request) -> Optional[str]:
+        """`sub` del access token, si es válido (sin consultar la base)"""
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            # Misma verificación que core.security.decode_token_payload, sin
+            # importar ese módulo (depende de la base de datos)
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        sub = payload.get("sub")
+        return str(sub) if sub else None
+
+    def client_key(self, request: Request, policy: RateLimitPolicy) -> str:
+        user_id = self._user_id(request) if policy.per == "user" else None
+        return f"policy:{policy.name}:{self.limiter.get_client_key(request, user_id)}"
+
+    async def check(self, request: Request, path: str) -> tuple[Optional[RateLimitPolicy], bool, dict]:
+        """
+        Verifica el request contra la política que le corresponde.
+
+        Args:
+            request: Request original
+            path: Ruta sin prefijo de versión
+
+        Returns:
+            (política, permitido, info); (None, True, {}) si ninguna aplica
+        """
+        policy = self.policy_for(request.method, path)
+        if policy is None:
+            return None, True, {}
+        allowed, info = await self.limiter.check_rate_limit(
+            self.client_key(request, policy),
+            policy.max_requests,
+            policy.window_seconds,
+            algorithm=policy.algorithm,
+        )
+        return policy, allowed, info
+
+
+def rate_limit_headers(info: dict) -> dict:
+    """Headers X-RateLimit-* para la respuesta"""
+    if not info:
+        return {}
+    return {
+        "X-RateLimit-Limit": str(info["limit"]),
+        "X-RateLimit-Remaining": str(info["remaining"]),
+        "X-RateLimit-Reset": str(info["reset"]),
+    }
+
+
+def rate_limit_exceeded_response(policy: RateLimitPolicy, info: dict) -> JSONResponse:
+    """Respuesta 429 para un request rechazado por `policy`"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": "Rate limit excedido",
+            "message": f"Límite: {policy.max_requests} requests por {policy.window_seconds} segundos",
+            "retry_after": info["retry_after"]
+        },
+        headers={**rate_limit_headers(info), "Retry-After": str(info["retry_after"])}
+    )
+
+
+_policy_rate_limiter: Optional[PolicyRateLimiter] = None
+
+
+def get_policy_rate_limiter() -> PolicyRateLimiter:
+    """Obtiene la instancia global (la tabla se carga una vez por proceso)"""
+    global _policy_rate_limiter
+
+    if _policy_rate_limiter is None:
+        _policy_rate_limiter = PolicyRateLimiter(get_hybrid_rate_limiter(), load_policies())
+
+    return _policy_rate_limiter
@@ -1,37 +1,201 @@
 """
 Sistema de Rate Limiting usando Redis.
 Implementa límites de requests por IP y por usuario.
+
+Cada verificación es un único script Lua atómico (EVALSHA; redis-py
+manda el script completo solo si Redis todavía no lo tiene cacheado), que
+calcula y devuelve permitido/restantes/reset en un round trip. El tiempo
+sale de Redis (TIME), así todas las réplicas comparten el mismo reloj.
+
+Algoritmos (RATE_LIMIT_ALGORITHM, o `algorithm` por llamada):
+- "gcra" (default): Generic Cell Rate Algorithm, equivalente a un token
+  bucket de `max_requests` fichas que se reponen a razón de
+  max_requests/window_seconds. Permite ráfagas de hasta `max_requests` y
+  después reparte el resto en el tiempo; una sola key con un timestamp.
+- "sliding_log": log de timestamps en un sorted set; cuenta exactamente
+  los requests de los últimos `window_seconds`. Más preciso, pero guarda
+  un elemento por request (para límites bajos: login, emails).
+
+A diferencia de las ventanas fijas, ninguno deja pasar el doble del
+límite en el borde entre dos ventanas.
+
+RateLimiter usa el cliente síncrono; el middleware y el decorador corren
+dentro del event loop y usan HybridRateLimiter, que reserva fichas de a
+lotes con AsyncRateLimiter (redis.asyncio) y las gasta en memoria.
 """
-import redis
+import asyncio
+import heapq
+import ipaddress
 import time
+import uuid
 import logging
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from typing import Optional, Callable
+from typing import Dict, Optional, Callable
 import functools
 
+from shared.core.config import settings
+from shared.core.redis_client import get_redis, get_async_redis
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _redes_confiables(proxies: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def proxies_confiables() -> tuple:
+    """
+    Redes de RATE_LIMIT_TRUSTED_PROXIES.
+
+    Raises:
+        ValueError: alguna entrada no es una IP o CIDR válido
+    """
+    return _redes_confiables(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES))
+
+
+def _es_confiable(ip: str) -> bool:
+    try:
+        direccion = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(direccion in red for red in proxies_confiables())
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP del cliente para las keys de rate limiting.
+
+    X-Forwarded-For lo arma el cliente, así que solo se usa si el request
+    llega de un proxy de RATE_LIMIT_TRUSTED_PROXIES; en ese caso la IP es
+    el primer salto no confiable empezando por la derecha (cada proxy
+    agrega al final la IP de quien le habló).
+    """
+    ip = request.client.host if request.client else "unknown"
+    if not _es_confiable(ip):
+        return ip
+
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    for salto in reversed([s.strip() for s in forwarded.split(",") if s.strip()]):
+        ip = salto
+        if not _es_confiable(salto):
+            break
+    return ip
+
+
+# KEYS[1]: key del cliente
+# ARGV: límite, período (s), costo, parcial (1 = otorgar lo que haya si no alcanza para `costo`)
+# Devuelve {otorgados, restantes, retry_after (s), reset_after (s)}; otorgados = 0 si se rechaza
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local partial = ARGV[4] == '1'
+local emission = period / limit
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+-- Fichas disponibles: cuántas emisiones entran entre tat - período y ahora
+local available = math.floor((now - tat + period) / emission + 1e-9)
+local granted = cost
+if available < cost then
+    if partial and available > 0 then
+        granted = available
+    else
+        local needed = partial and 1 or cost
+        local retry_after = tat - period + emission * needed - now
+        return {0, math.max(available, 0), string.format('%.6f', retry_after), string.format('%.6f', tat - now)}
+    end
+end
+
+local new_tat = tat + emission * granted
+local reset_after = new_tat - now
+redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil(reset_after * 1000))
+return {granted, available - granted, '0', string.format('%.6f', reset_after)}
+"""
+
+# KEYS[1]: key del cliente
+# ARGV: límite, ventana (s), costo, id único del request, parcial
+# Devuelve {otorgados, restantes, retry_after (s), reset_after (s)}; otorgados = 0 si se rechaza
+SLIDING_LOG_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_us = tonumber(ARGV[2]) * 1000000
+local cost = tonumber(ARGV[3])
+local partial = ARGV[5] == '1'
+
+local t = redis.call('TIME')
+local now_us = tonumber(t[1]) * 1000000 + tonumber(t[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_us - window_us)
+local available = limit - redis.call('ZCARD', KEYS[1])
+
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+local reset_us = window_us
+if oldest[2] then
+    reset_us = tonumber(oldest[2]) + window_us - now_us
+end
+
+local granted = cost
+if available < cost then
+    if partial and available > 0 then
+        granted = available
+    else
+        return {0, math.max(available, 0), string.format('%.6f', reset_us / 1000000), string.format('%.6f', reset_us / 1000000)}
+    end
+end
+
+for i = 1, granted do
+    redis.call('ZADD', KEYS[1], now_us, ARGV[4] .. ':' .. i)
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(window_us / 1000))
+return {granted, available - granted, '0', string.format('%.6f', reset_us / 1000000)}
+"""
+
+ALGORITHMS = {
+    "gcra": GCRA_SCRIPT,
+    "sliding_log": SLIDING_LOG_SCRIPT,
+}
+
+
 class RateLimiter:
     """Gestor de rate limiting con Redis"""
     
-    def __init__(self, redis_url: str = "redis://redis:6379"):
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_client = get_redis(redis_url)
+        self._register_scripts()
+    
+    def _register_scripts(self):
+        # register_script no hace round trip: calcula el SHA y usa EVALSHA
+        # (con EVAL de respaldo si Redis responde NOSCRIPT)
+        self.scripts = {
+            nombre: self.redis_client.register_script(script)
+            for nombre, script in ALGORITHMS.items()
+        }
     
     def check_rate_limit(
         self,
         key: str,
         max_requests: int,
-        window_seconds: int
+        window_seconds: int,
+        algorithm: Optional[str] = None,
+        cost: int = 1
     ) -> tuple[bool, dict]:
         """
-        Verifica si se ha excedido el rate limit.
+        Verifica si se ha excedido el rate limit y, si no, consume `cost`.
         
         Args:
             key: Identificador único (IP, user_id, etc.)
             max_requests: Número máximo de requests permitidos
             window_seconds: Ventana de tiempo en segundos
+            algorithm: "gcra" o "sliding_log" (default: RATE_LIMIT_ALGORITHM)
+            cost: Requests que consume esta llamada
             
         Returns:
             Tupla (permitido, info_dict)
@@ -39,38 +203,86 @@ class RateLimiter:
             - info_dict: Información sobre el rate limit
         """
         try:
-            now = time.time()
-            window_key = f"ratelimit:{key}:{int(now // window_seconds)}"
-            
-            # Incrementar contador
-            pipe = self.redis_client.pipeline()
-            pipe.incr(window_key)
-            pipe.expire(window_key, window_seconds)
-            results = pipe.execute()
-            
-            current_requests = results[0]
-            
-            # Calcular tiempo hasta reset
-            time_until_reset = window_seconds - (now % window_seconds)
-            
-            info = {
-                "limit": max_requests,
-                "remaining": max(0, max_requests - current_requests),
-                "reset": int(now + time_until_reset),
-                "reset_in_seconds": int(time_until_reset)
-            }
-            
-            allowed = current_requests <= max_requests
-            
-            if not allowed:
-                logger.warning(f"Rate limit excedido para {key}: {current_requests}/{max_requests}")
-            
-            return allowed, info
+            return self.reserve(key, max_requests, window_seconds, algorithm, cost)
             
         except Exception as e:
             logger.error(f"Error en rate limiter: {str(e)}")
             # En caso de error, permitir el request
-            return True, {"limit": max_requests, "remaining": max_requests}
+            return self._fail_open(max_requests)
+    
+    def reserve(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        algorithm: Optional[str] = None,
+        cost: int = 1,
+        partial: bool = False
+    ) -> tuple[bool, dict]:
+        """
+        Como check_rate_limit, pero propaga los errores de Redis. Con
+        `partial`, si no alcanza para `cost` se otorga lo que haya
+        (info["granted"]).
+        """
+        algorithm = self._algorithm(algorithm)
+        result = self.scripts[algorithm](
+            keys=[self._limit_key(algorithm, key)],
+            args=self._script_args(algorithm, max_requests, window_seconds, cost, partial),
+        )
+        return self._result(key, result, max_requests)
+    
+    @staticmethod
+    def _algorithm(algorithm: Optional[str]) -> str:
+        algorithm = algorithm or settings.RATE_LIMIT_ALGORITHM
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algoritmo de rate limiting desconocido: {algorithm}")
+        return algorithm
+    
+    @staticmethod
+    def _limit_key(algorithm: str, key: str) -> str:
+        return f"ratelimit:{algorithm}:{key}"
+    
+    @staticmethod
+    def _script_args(algorithm: str, max_requests: int, window_seconds: int, cost: int,
+                     partial: bool = False) -> list:
+        args = [max_requests, window_seconds, cost]
+        if algorithm == "sliding_log":
+            # Miembro único en el sorted set (dos requests en el mismo µs no se pisan)
+            args.append(uuid.uuid4().hex)
+        args.append(1 if partial else 0)
+        return args
+    
+    @staticmethod
+    def _fail_open(max_requests: int) -> tuple[bool, dict]:
+        return True, {
+            "limit": max_requests,
+            "remaining": max_requests,
+            "reset": int(time.time()),
+            "reset_in_seconds": 0,
+            "retry_after": 0,
+            "granted": 1
+        }
+    
+    @staticmethod
+    def _result(key: str, result: list, max_requests: int) -> tuple[bool, dict]:
+        """Arma la respuesta de check_rate_limit a partir de lo que devuelve el script"""
+        granted, remaining, retry_after, reset_after = result
+        retry_after = float(retry_after)
+        reset_after = float(reset_after)
+        
+        info = {
+            "limit": max_requests,
+            "remaining": int(remaining),
+            "reset": int(time.time() + reset_after),
+            "reset_in_seconds": int(reset_after + 0.999),
+            "retry_after": int(retry_after + 0.999),
+            "granted": int(granted)
+        }
+        
+        if not granted:
+            logger.warning(f"Rate limit excedido para {key}: límite {max_requests}")
+        
+        return bool(granted), info
     
     def get_client_key(self, request: Request, user_id: Optional[str] = None) -> str:
         """
@@ -86,21 +298,252 @@ class RateLimiter:
         if user_id:
             return f"user:{user_id}"
         
-        # Usar IP del cliente
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            client_ip = forwarded.split(",")[0].strip()
+        return f"ip:{client_ip(request)}"
+
+
+class AsyncRateLimiter(RateLimiter):
+    """Rate limiter para código async (redis.asyncio); mismas keys y scripts que RateLimiter"""
+    
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_client = get_async_redis(redis_url)
+        self._register_scripts()
+    
+    async def check_rate_limit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        algorithm: Optional[str] = None,
+        cost: int = 1
+    ) -> tuple[bool, dict]:
+        """Verifica si se ha excedido el rate limit (ver RateLimiter.check_rate_limit)"""
+        try:
+            return await self.reserve(key, max_requests, window_seconds, algorithm, cost)
+            
+        except Exception as e:
+            logger.error(f"Error en rate limiter: {str(e)}")
+            # En caso de error, permitir el request
+            return self._fail_open(max_requests)
+    
+    async def reserve(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        algorithm: Optional[str] = None,
+        cost: int = 1,
+        partial: bool = False
+    ) -> tuple[bool, dict]:
+        """Ver RateLimiter.reserve"""
+        algorithm = self._algorithm(algorithm)
+        result = await self.scripts[algorithm](
+            keys=[self._limit_key(algorithm, key)],
+            args=self._script_args(algorithm, max_requests, window_seconds, cost, partial),
+        )
+        return self._result(key, result, max_requests)
+
+
+class _Lease:
+    """Fichas reservadas en Redis que este proceso puede gastar sin consultar"""
+    __slots__ = ("tokens", "expires_at", "remaining", "reset")
+    
+    def __init__(self, tokens: int, expires_at: float, remaining: int, reset: int):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.remaining = remaining
+        self.reset = reset
+
+
+class _LocalBucket:
+    """Token bucket en memoria, para cuando Redis no responde"""
+    __slots__ = ("tokens", "updated", "full_at")
+    
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = updated  # Desde cuándo está lleno (igual a uno nuevo) si no se usa
+
+
+class HybridRateLimiter:
+    """
+    Rate limiter con reservas locales delante de AsyncRateLimiter.
+    
+    En lugar de ir a Redis en cada request, el proceso reserva de a lotes
+    (hasta RATE_LIMIT_LEASE_SIZE fichas, y nunca más de 1/10 del límite)
+    y los gasta localmente; solo vuelve a Redis cuando se le acaba el lote
+    o vence (a los `window_seconds`). Las fichas salen del mismo límite en
+    Redis, así que entre todas las réplicas nunca se supera: lo aproximado
+    es que un cliente puede ser rechazado un poco antes si otra réplica
+    tiene fichas suyas sin usar. Los límites bajos (menos de 10 requests
+    por ventana, ej: login) reservan de a 1, o sea exactos. Por key hay una
+    sola reserva en vuelo: los requests concurrentes la esperan y se reparten
+    lo que trae, y lo otorgado se suma a lo que quede del lote.
+    
+    Si Redis falla se limita solo en memoria (token bucket por proceso con
+    el mismo límite) durante RATE_LIMIT_REDIS_RETRY_SECONDS, en lugar de
+    dejar pasar todo.
+    """
+    
+    def __init__(self, limiter: AsyncRateLimiter):
+        self.limiter = limiter
+        self._leases: Dict[str, _Lease] = {}
+        self._buckets: Dict[str, _LocalBucket] = {}
+        # Reserva en Redis en curso por lease_key; el resultado es la info del
+        # rechazo (None si otorgó fichas o si Redis falló)
+        self._reservas: Dict[str, asyncio.Future] = {}
+        self._redis_down_until = 0.0
+    
+    def get_client_key(self, request: Request, user_id: Optional[str] = None) -> str:
+        return self.limiter.get_client_key(request, user_id)
+    
+    @staticmethod
+    def _lease_size(max_requests: int) -> int:
+        return max(1, min(settings.RATE_LIMIT_LEASE_SIZE, max_requests // 10))
+    
+    async def check_rate_limit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        algorithm: Optional[str] = None
+    ) -> tuple[bool, dict]:
+        """Verifica el rate limit (ver RateLimiter.check_rate_limit)"""
+        lease_key = f"{algorithm or ''}:{key}:{max_requests}:{window_seconds}"
+        
+        while True:
+            now = time.monotonic()
+            lease = self._leases.get(lease_key)
+            if lease is not None and lease.tokens > 0 and lease.expires_at > now:
+                lease.tokens -= 1
+                return True, self._lease_info(lease, max_requests)
+            
+            if now < self._redis_down_until:
+                return self._check_local(lease_key, max_requests, window_seconds, now)
+            
+            # Una sola reserva en vuelo por key: los requests concurrentes la
+            # esperan y gastan lo que trae, en lugar de reservar cada uno un
+            # lote (que quedaría descontado en Redis sin usarse)
+            pendiente = self._reservas.get(lease_key)
+            if pendiente is None:
+                break
+            rechazo = await asyncio.shield(pendiente)
+            if rechazo is not None:
+                return False, rechazo
+        
+        reserva = asyncio.get_running_loop().create_future()
+        self._reservas[lease_key] = reserva
+        rechazo = None
+        try:
+            allowed, info = await self._recargar(lease_key, key, max_requests, window_seconds, algorithm, now)
+            if not allowed and now >= self._redis_down_until:
+                rechazo = info
+            return allowed, info
+        finally:
+            del self._reservas[lease_key]
+            reserva.set_result(rechazo)
+    
+    async def _recargar(self, lease_key: str, key: str, max_requests: int, window_seconds: int,
+                        algorithm: Optional[str], now: float) -> tuple[bool, dict]:
+        """Reserva un lote en Redis, lo suma a la reserva local y gasta una ficha"""
+        try:
+            allowed, info = await self.limiter.reserve(
+                key, max_requests, window_seconds, algorithm,
+                cost=self._lease_size(max_requests), partial=True,
+            )
+        except Exception as e:
+            logger.error(f"Rate limiter sin Redis, limitando en memoria: {str(e)}")
+            self._redis_down_until = now + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            return self._check_local(lease_key, max_requests, window_seconds, now)
+        
+        if not allowed:
+            return False, info
+        
+        lease = self._leases.get(lease_key)
+        if lease is not None and lease.expires_at > now:
+            lease.tokens += info["granted"]
+            lease.remaining, lease.reset = info["remaining"], info["reset"]
         else:
-            client_ip = request.client.host if request.client else "unknown"
+            self._prune_leases(now)
+            lease = self._leases[lease_key] = _Lease(info["granted"], now + window_seconds, info["remaining"], info["reset"])
+        lease.tokens -= 1
+        return True, self._lease_info(lease, max_requests)
+    
+    @staticmethod
+    def _lease_info(lease: _Lease, max_requests: int) -> dict:
+        reset_in = max(0, lease.reset - int(time.time()))
+        return {
+            "limit": max_requests,
+            "remaining": lease.remaining + lease.tokens,
+            "reset": lease.reset,
+            "reset_in_seconds": reset_in,
+            "retry_after": 0
+        }
+    
+    def _check_local(self, lease_key: str, max_requests: int, window_seconds: int,
+                     now: float) -> tuple[bool, dict]:
+        bucket = self._buckets.get(lease_key)
+        if bucket is None:
+            self._prune_buckets(now)
+            bucket = self._buckets[lease_key] = _LocalBucket(max_requests, now)
+        
+        rate = max_requests / window_seconds
+        bucket.tokens = min(max_requests, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
         
-        return f"ip:{client_ip}"
+        allowed = bucket.tokens >= 1
+        if allowed:
+            bucket.tokens -= 1
+        retry_after = 0 if allowed else int((1 - bucket.tokens) / rate + 0.999)
+        bucket.full_at = now + (max_requests - bucket.tokens) / rate
+        reset_in = int((max_requests - bucket.tokens) / rate + 0.999)
+        return allowed, {
+            "limit": max_requests,
+            "remaining": int(bucket.tokens),
+            "reset": int(time.time()) + reset_in,
+            "reset_in_seconds": reset_in,
+            "retry_after": retry_after
+        }
+    
+    def _prune_leases(self, now: float):
+        """
+        Acota la memoria: descarta las reservas vencidas y, si no alcanza, el
+        10% más cercano a vencer (sus fichas sin usar quedan descontadas en
+        Redis, así que nunca se regala nada).
+        """
+        maximo = settings.RATE_LIMIT_LOCAL_MAX_KEYS
+        if len(self._leases) < maximo:
+            return
+        for lease_key in [k for k, v in self._leases.items() if v.expires_at <= now]:
+            del self._leases[lease_key]
+        if len(self._leases) >= maximo:
+            for lease_key in heapq.nsmallest(max(1, maximo // 10), self._leases,
+                                             key=lambda k: self._leases[k].expires_at):
+                del self._leases[lease_key]
+    
+    def _prune_buckets(self, now: float):
+        """
+        Acota la memoria sin regalar fichas: descarta los buckets que ya se
+        volvieron a llenar (equivalen a uno nuevo). Si no alcanza, descarta
+        el 10% más cercano a llenarse, nunca todos.
+        """
+        maximo = settings.RATE_LIMIT_LOCAL_MAX_KEYS
+        if len(self._buckets) < maximo:
+            return
+        for lease_key in [k for k, v in self._buckets.items() if v.full_at <= now]:
+            del self._buckets[lease_key]
+        if len(self._buckets) >= maximo:
+            for lease_key in heapq.nsmallest(max(1, maximo // 10), self._buckets,
+                                             key=lambda k: self._buckets[k].full_at):
+                del self._buckets[lease_key]
 
 
-# Instancia global del rate limiter
+# Instancias globales del rate limiter (sync, async e híbrido)
 _rate_limiter: Optional[RateLimiter] = None
+_async_rate_limiter: Optional[AsyncRateLimiter] = None
+_hybrid_rate_limiter: Optional[HybridRateLimiter] = None
 
 
-def get_rate_limiter(redis_url: str = "redis://redis:6379") -> RateLimiter:
+def get_rate_limiter(redis_url: Optional[str] = None) -> RateLimiter:
     """Obtiene la instancia global del rate limiter"""
     global _rate_limiter
     
@@ -110,6 +553,26 @@ def get_rate_limiter(redis_url: str = "redis://redis:6379") -> RateLimiter:
     return _rate_limiter
 
 
+def get_async_rate_limiter(redis_url: Optional[str] = None) -> AsyncRateLimiter:
+    """Obtiene la instancia global del rate limiter async"""
+    global _async_rate_limiter
+    
+    if _async_rate_limiter is None:
+        _async_rate_limiter = AsyncRateLimiter(redis_url)
+    
+    return _async_rate_limiter
+
+
+def get_hybrid_rate_limiter(redis_url: Optional[str] = None) -> HybridRateLimiter:
+    """Obtiene la instancia global del rate limiter híbrido (reservas locales + Redis)"""
+    global _hybrid_rate_limiter
+    
+    if _hybrid_rate_limiter is None:
+        _hybrid_rate_limiter = HybridRateLimiter(get_async_rate_limiter(redis_url))
+    
+    return _hybrid_rate_limiter
+
+
 async def rate_limit_middleware(request: Request, call_next):
     """
     Middleware de rate limiting global.
@@ -117,7 +580,7 @@ async def rate_limit_middleware(request: Request, call_next):
     Se puede agregar a la aplicación FastAPI:
         app.middleware("http")(rate_limit_middleware)
     """
-    limiter = get_rate_limiter()
+    limiter = get_hybrid_rate_limiter()
     
     # Obtener key del cliente
     client_key = limiter.get_client_key(request)
@@ -127,7 +590,7 @@ async def rate_limit_middleware(request: Request, call_next):
     window_seconds = 60
     
     # Verificar rate limit
-    allowed, info = limiter.check_rate_limit(client_key, max_requests, window_seconds)
+    allowed, info = await limiter.check_rate_limit(client_key, max_requests, window_seconds)
     
     if not allowed:
         return JSONResponse(
@@ -135,13 +598,13 @@ async def rate_limit_middleware(request: Request, call_next):
             content={
                 "error": "Rate limit excedido",
                 "message": f"Has excedido el límite de {max_requests} requests por minuto",
-                "retry_after": info["reset_in_seconds"]
+                "retry_after": info["retry_after"]
             },
             headers={
                 "X-RateLimit-Limit": str(info["limit"]),
                 "X-RateLimit-Remaining": str(info["remaining"]),
                 "X-RateLimit-Reset": str(info["reset"]),
-                "Retry-After": str(info["reset_in_seconds"])
+                "Retry-After": str(info["retry_after"])
             }
         )
     
@@ -156,7 +619,8 @@ async def rate_limit_middleware(request: Request, call_next):
     return response
 
 
-def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip"):
+def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip",
+               algorithm: Optional[str] = None):
     """
     Decorador para aplicar rate limiting a endpoints específicos.
     
@@ -164,6 +628,7 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip"
         max_requests: Número máximo de requests permitidos
         window_seconds: Ventana de tiempo en segundos
         per: Tipo de límite ("ip" o "user")
+        algorithm: "gcra" o "sliding_log" (default: RATE_LIMIT_ALGORITHM)
         
     Ejemplo:
         @app.get("/api/expensive-operation")
@@ -175,7 +640,7 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip"
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            limiter = get_rate_limiter()
+            limiter = get_hybrid_rate_limiter()
             
             # Buscar el Request en los argumentos
             request = None
@@ -205,10 +670,11 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip"
                 client_key = limiter.get_client_key(request)
             
             # Verificar rate limit
-            allowed, info = limiter.check_rate_limit(
+            allowed, info = await limiter.check_rate_limit(
                 client_key,
                 max_requests,
-                window_seconds
+                window_seconds,
+                algorithm=algorithm
             )
             
             if not allowed:
@@ -217,7 +683,7 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60, per: str = "ip"
                     detail={
                         "error": "Rate limit excedido",
                         "message": f"Límite: {max_requests} requests por {window_seconds} segundos",
-                        "retry_after": info["reset_in_seconds"]
+                        "retry_after": info["retry_after"]
                     }
                 )
             
@@ -254,7 +720,8 @@ class RateLimitConfig:
 
 def rate_limit_auth(func: Callable) -> Callable:
     """Rate limit para endpoints de autenticación (5 intentos cada 5 minutos)"""
-    return rate_limit(*RateLimitConfig.AUTH, per="ip")(func)
+    # Límite bajo: log exacto, sin ráfagas de reposición
+    return rate_limit(*RateLimitConfig.AUTH, per="ip", algorithm="sliding_log")(func)
 
 
 def rate_limit_search(func: Callable) -> Callable:
@@ -0,0 +1,66 @@
+"""agregar_area_cobertura_a_profesionales
+
+Revision ID: 5c1e7a9b2d40
+Revises: 46608a703e02
+Create Date: 2026-10-19 10:12:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9b2d40'
+down_revision: Union[str, None] = '46608a703e02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Columna con el polígono de cobertura precalculado
+    op.add_column('profesionales', sa.Column(
+        'area_cobertura',
+        geoalchemy2.types.Geography(geometry_type='POLYGON', srid=4326, spatial_index=False, from_text='ST_GeogFromText', name='geography'),
+        nullable=True,
+        comment='Área de cobertura precalculada (buffer de base_location por radio_cobertura_km)'
+    ))
+
+    # 2. Trigger que mantiene el área sincronizada con ubicación y radio
+    op.execute("""
+        CREATE OR REPLACE FUNCTION profesionales_actualizar_area_cobertura()
+        RETURNS trigger AS $$
+        BEGIN
+            IF NEW.base_location IS NULL THEN
+                NEW.area_cobertura := NULL;
+            ELSE
+                NEW.area_cobertura := ST_Buffer(NEW.base_location, NEW.radio_cobertura_km * 1000);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_profesionales_area_cobertura
+        BEFORE INSERT OR UPDATE OF base_location, radio_cobertura_km ON profesionales
+        FOR EACH ROW EXECUTE FUNCTION profesionales_actualizar_area_cobertura();
+    """)
+
+    # 3. Backfill de los registros existentes
+    op.execute("""
+        UPDATE profesionales
+        SET area_cobertura = ST_Buffer(base_location, radio_cobertura_km * 1000)
+        WHERE base_location IS NOT NULL
+    """)
+
+    # 4. Índice espacial para que ST_Intersects use el índice
+    op.create_index('idx_profesional_cobertura_gist', 'profesionales', ['area_cobertura'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_profesional_cobertura_gist', table_name='profesionales', postgresql_using='gist')
+    op.execute("DROP TRIGGER IF EXISTS trg_profesionales_area_cobertura ON profesionales")
+    op.execute("DROP FUNCTION IF EXISTS profesionales_actualizar_area_cobertura()")
+    op.drop_column('profesionales', 'area_cobertura')
@@ -0,0 +1,38 @@
+"""agregar_rating_bayesiano_a_profesionales
+
+Revision ID: 9e4b2f6a1c83
+Revises: 5c1e7a9b2d40
+Create Date: 2026-10-19 12:03:18.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2f6a1c83'
+down_revision: Union[str, None] = '5c1e7a9b2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Agregar la columna con el valor del prior por defecto
+    op.add_column('profesionales', sa.Column('rating_bayesiano', sa.Numeric(precision=3, scale=2), nullable=False, server_default='3.50', comment='Rating suavizado con total_resenas (precalculado para el ranking de búsqueda)'))
+
+    # 2. Backfill con el prior por defecto (media 3.5, peso 10).
+    #    update_professional_ratings recalcula con los valores de settings.
+    op.execute("""
+        UPDATE profesionales
+        SET rating_bayesiano = ROUND((3.5 * 10 + rating_promedio * total_resenas) / (10 + total_resenas), 2)
+    """)
+
+    # 3. Índice para ordenar por rating dentro de los profesionales aprobados
+    op.create_index('idx_profesional_estado_rating_bayesiano', 'profesionales', ['estado_verificacion', sa.text('rating_bayesiano DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_profesional_estado_rating_bayesiano', table_name='profesionales')
+    op.drop_column('profesionales', 'rating_bayesiano')
@@ -0,0 +1,27 @@
+"""agregar_indice_resenas_por_fecha
+
+Revision ID: b3d8f1e5a247
+Revises: 9e4b2f6a1c83
+Create Date: 2026-10-19 13:41:07.214583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8f1e5a247'
+down_revision: Union[str, None] = '9e4b2f6a1c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Últimas reseñas de un profesional (perfil público) sin ordenar todas sus reseñas
+    op.create_index('idx_resena_profesional_fecha', 'resenas', ['profesional_id', 'fecha_creacion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_resena_profesional_fecha', table_name='resenas')
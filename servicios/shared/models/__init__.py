@@ -12,6 +12,7 @@ from .portfolio import PortfolioItem, PortfolioImagen
 from .oferta import Oferta, EstadoOferta
 from .trabajo import Trabajo
 from .resena import Resena
+from .outbox import OutboxEvento
 
 __all__ = [
     "Base",
@@ -30,5 +31,6 @@ __all__ = [
     "Oferta",
     "EstadoOferta",
     "Trabajo",
-    "Resena"
+    "Resena",
+    "OutboxEvento"
 ]
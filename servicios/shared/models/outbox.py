@@ -0,0 +1,51 @@
+"""
+Modelo de Outbox - Eventos pendientes de publicar en el event bus.
+"""
+from sqlalchemy import Column, BigInteger, String, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import Base
+
+
+class OutboxEvento(Base):
+    """
+    Eventos escritos en la misma transacción que el cambio que los origina.
+
+    El relay de events/outbox.py los publica en Redis Streams en orden de id
+    y borra las filas publicadas: si la transacción hace rollback el evento
+    no existe, y si el proceso se cae después del commit el evento sigue
+    acá hasta que algún relay lo publique.
+    """
+    __tablename__ = "outbox_eventos"
+    
+    id = Column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True,
+        comment="Orden de publicación"
+    )
+    
+    event_type = Column(
+        String(64),
+        nullable=False,
+        comment="Tipo de evento (EventType.value)"
+    )
+    
+    payload = Column(
+        JSONB,
+        nullable=False,
+        comment="Evento serializado (Event.to_dict)"
+    )
+    
+    fecha_creacion = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="Fecha en que se encoló el evento"
+    )
+    
+    __table_args__ = (
+        Index('idx_outbox_eventos_fecha', fecha_creacion),
+    )
+    
+    def __repr__(self):
+        return f"<OutboxEvento(id={self.id}, event_type={self.event_type})>"
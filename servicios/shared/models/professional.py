@@ -56,6 +56,12 @@ class Profesional(Base, UUIDMixin, TimestampMixin):
         comment="Radio de cobertura en kilómetros desde la ubicación base"
     )
     
+    area_cobertura = Column(
+        Geography(geometry_type='POLYGON', srid=4326, spatial_index=False),
+        nullable=True,  # Lo mantiene un trigger de la base a partir de base_location y radio_cobertura_km
+        comment="Área de cobertura precalculada (buffer de base_location por radio_cobertura_km)"
+    )
+    
     # ==========================================
     # CAMPOS DE CONFIGURACIÓN DE SERVICIO
     # ==========================================
@@ -124,6 +130,13 @@ class Profesional(Base, UUIDMixin, TimestampMixin):
         comment="Total de reseñas recibidas (denormalizado para performance)"
     )
     
+    rating_bayesiano = Column(
+        Numeric(3, 2),
+        default=3.50,
+        nullable=False,
+        comment="Rating suavizado con total_resenas (precalculado para el ranking de búsqueda)"
+    )
+    
     # Relación inversa con Usuario
     usuario = relationship(
         "Usuario",
@@ -152,11 +165,21 @@ class Profesional(Base, UUIDMixin, TimestampMixin):
             base_location,
             postgresql_using='gist'
         ),
+        Index(
+            'idx_profesional_cobertura_gist',
+            area_cobertura,
+            postgresql_using='gist'
+        ),
         Index(
             'idx_profesional_estado_nivel',
             estado_verificacion,
             nivel
         ),
+        Index(
+            'idx_profesional_estado_rating_bayesiano',
+            estado_verificacion,
+            rating_bayesiano.desc()
+        ),
     )
     
     def __repr__(self):
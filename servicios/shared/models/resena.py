@@ -90,6 +90,7 @@ class Resena(Base, UUIDMixin, TimestampMixin):
             name='check_rating_rango'
         ),
         Index('idx_resena_profesional_rating', profesional_id, rating),
+        Index('idx_resena_profesional_fecha', profesional_id, 'fecha_creacion'),
         Index('idx_resena_cliente', cliente_id),
     )
     
@@ -130,6 +130,8 @@ class Trabajo(Base, UUIDMixin, TimestampMixin):
         Index('idx_trabajo_mp_payment', mercadopago_payment_id),
         Index('idx_trabajo_cliente_estado', cliente_id, estado_escrow),
         Index('idx_trabajo_profesional_estado', profesional_id, estado_escrow),
+        # Rangos por fecha (reportes mensuales); BRIN porque la tabla crece en orden de fecha
+        Index('idx_trabajo_fecha_creacion_brin', 'fecha_creacion', postgresql_using='brin'),
     )
     
     def __repr__(self):
@@ -12,8 +12,17 @@ from .metrics import (
     database_query_duration_seconds,
     cache_hits_total,
     cache_misses_total,
+    cache_recomputes_total,
+    cache_stale_served_total,
+    cache_operations_duration_seconds,
+    cache_payload_bytes,
     websocket_connections_active,
     celery_tasks_total,
+    events_handled_total,
+    event_handler_duration_seconds,
+    event_delivery_delay_seconds,
+    event_consumer_lag,
+    event_consumer_pending,
     # Métricas de negocio
     trabajos_created_total,
     trabajos_completed_total,
@@ -40,8 +49,17 @@ __all__ = [
     "database_query_duration_seconds",
     "cache_hits_total",
     "cache_misses_total",
+    "cache_recomputes_total",
+    "cache_stale_served_total",
+    "cache_operations_duration_seconds",
+    "cache_payload_bytes",
     "websocket_connections_active",
     "celery_tasks_total",
+    "events_handled_total",
+    "event_handler_duration_seconds",
+    "event_delivery_delay_seconds",
+    "event_consumer_lag",
+    "event_consumer_pending",
     # Métricas de negocio
     "trabajos_created_total",
     "trabajos_completed_total",
@@ -9,7 +9,7 @@ from prometheus_client import (
 from fastapi import Request, Response
 from fastapi.responses import PlainTextResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+from typing import Callable, Optional
 import time
 import logging
 
@@ -104,11 +104,33 @@ cache_misses_total = Counter(
     registry=REGISTRY
 )
 
+cache_recomputes_total = Counter(
+    "cache_recomputes_total",
+    "Total de recálculos de entradas de @cached",
+    ["function", "reason"],  # reason: miss | early | stale | lock_timeout
+    registry=REGISTRY
+)
+
+cache_stale_served_total = Counter(
+    "cache_stale_served_total",
+    "Total de valores vencidos servidos mientras otro worker recalculaba",
+    ["function"],
+    registry=REGISTRY
+)
+
 cache_operations_duration_seconds = Histogram(
     "cache_operations_duration_seconds",
     "Duración de operaciones de cache",
-    ["operation"],
-    buckets=(0.001, 0.005, 0.01, 0.05, 0.1),
+    ["operation", "cache_key_pattern"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    registry=REGISTRY
+)
+
+cache_payload_bytes = Histogram(
+    "cache_payload_bytes",
+    "Tamaño serializado de los valores leídos/escritos en cache",
+    ["operation", "cache_key_pattern"],
+    buckets=(128, 512, 1024, 4096, 16384, 65536, 262144, 1048576),
     registry=REGISTRY
 )
 
@@ -142,6 +164,51 @@ celery_task_duration_seconds = Histogram(
     registry=REGISTRY
 )
 
+# Eventos (Redis Streams, ver shared/events)
+events_handled_total = Counter(
+    "events_handled_total",
+    "Total de ejecuciones de handlers de eventos",
+    ["event_type", "status"],  # status: ok/error
+    registry=REGISTRY
+)
+
+event_handler_duration_seconds = Histogram(
+    "event_handler_duration_seconds",
+    "Duración de los handlers de eventos",
+    ["event_type"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    registry=REGISTRY
+)
+
+event_delivery_delay_seconds = Histogram(
+    "event_delivery_delay_seconds",
+    "Tiempo entre la publicación de un evento y el inicio de su procesamiento",
+    ["event_type"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 3600.0),
+    registry=REGISTRY
+)
+
+event_consumer_lag = Gauge(
+    "event_consumer_lag",
+    "Eventos del stream todavía no leídos por el consumer group",
+    ["stream", "group"],
+    registry=REGISTRY
+)
+
+event_consumer_pending = Gauge(
+    "event_consumer_pending",
+    "Eventos entregados al consumer group y todavía sin ACK",
+    ["stream", "group"],
+    registry=REGISTRY
+)
+
+event_consumer_in_flight = Gauge(
+    "event_consumer_in_flight",
+    "Eventos que se están procesando en este proceso",
+    ["group"],
+    registry=REGISTRY
+)
+
 # ============================================================================
 # MÉTRICAS DE NEGOCIO
 # ============================================================================
@@ -325,12 +392,34 @@ class MetricsCollector:
         ).inc()
     
     @staticmethod
-    def record_cache_operation(operation: str, duration: float):
+    def record_cache_recompute(function: str, reason: str):
+        """Registra un recálculo de una entrada de @cached"""
+        cache_recomputes_total.labels(
+            function=function,
+            reason=reason
+        ).inc()
+    
+    @staticmethod
+    def record_cache_stale_served(function: str):
+        """Registra un valor vencido servido (stale-while-revalidate)"""
+        cache_stale_served_total.labels(function=function).inc()
+    
+    @staticmethod
+    def record_cache_operation(operation: str, duration: float, cache_key_pattern: str = "otros"):
         """Registra operación de cache"""
         cache_operations_duration_seconds.labels(
-            operation=operation
+            operation=operation,
+            cache_key_pattern=cache_key_pattern
         ).observe(duration)
     
+    @staticmethod
+    def record_cache_payload(operation: str, size: int, cache_key_pattern: str):
+        """Registra el tamaño serializado de un valor de cache"""
+        cache_payload_bytes.labels(
+            operation=operation,
+            cache_key_pattern=cache_key_pattern
+        ).observe(size)
+    
     @staticmethod
     def record_websocket_connection(delta: int):
         """Incrementa/decrementa conexiones WebSocket activas"""
@@ -357,6 +446,30 @@ class MetricsCollector:
                 task_name=task_name
             ).observe(duration)
     
+    @staticmethod
+    def record_event_handled(event_type: str, status: str, duration: float):
+        """Registra la ejecución de un handler de eventos"""
+        events_handled_total.labels(event_type=event_type, status=status).inc()
+        event_handler_duration_seconds.labels(event_type=event_type).observe(duration)
+    
+    @staticmethod
+    def record_event_delay(event_type: str, delay: float):
+        """Registra la demora entre la publicación y el procesamiento de un evento"""
+        event_delivery_delay_seconds.labels(event_type=event_type).observe(delay)
+    
+    @staticmethod
+    def record_event_consumer_lag(stream: str, group: str, lag: Optional[int], pending: Optional[int]):
+        """Registra el lag y los pendientes de un consumer group"""
+        if lag is not None:
+            event_consumer_lag.labels(stream=stream, group=group).set(lag)
+        if pending is not None:
+            event_consumer_pending.labels(stream=stream, group=group).set(pending)
+    
+    @staticmethod
+    def record_event_in_flight(group: str, delta: int):
+        """Incrementa/decrementa los eventos en proceso"""
+        event_consumer_in_flight.labels(group=group).inc(delta)
+    
     # Métricas de negocio
     
     @staticmethod
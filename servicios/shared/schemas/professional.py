@@ -1,7 +1,7 @@
 """
 Schemas Pydantic para Profesionales.
 """
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Dict, TYPE_CHECKING
 from uuid import UUID
 from decimal import Decimal
 from pydantic import BaseModel, Field, ConfigDict
@@ -158,14 +158,20 @@ class PublicProfileResponse(BaseModel):
     # Relaciones anidadas
     oficios: List = []
     portfolio: List = []
-    resenas: List = []
+    resenas: List = Field(default=[], description="Reseñas más recientes (el resto, paginado)")
+    distribucion_ratings: Dict[str, int] = Field(
+        default={}, description="Cantidad de reseñas por rating, de \"1\" a \"5\""
+    )
     
     model_config = ConfigDict(from_attributes=True)
     
     @classmethod
-    def from_professional(cls, professional):
+    def from_professional(cls, professional, resenas=None, distribucion_ratings=None):
         """
         Constructor helper para crear desde un objeto Profesional con todas sus relaciones cargadas.
+        
+        Si se pasan `resenas` (ResenaPublicRead ya proyectadas) no se lee la
+        relación `resenas_recibidas`.
         """
         from shared.schemas.oficio import OficioRead
         from shared.schemas.portfolio import PortfolioItemRead
@@ -188,7 +194,10 @@ class PublicProfileResponse(BaseModel):
             # Relaciones
             oficios=[OficioRead.model_validate(oficio) for oficio in professional.oficios],
             portfolio=[PortfolioItemRead.model_validate(item) for item in professional.portfolio_items],
-            resenas=[ResenaPublicRead.from_resena(resena) for resena in professional.resenas_recibidas]
+            resenas=resenas if resenas is not None else [
+                ResenaPublicRead.from_resena(resena) for resena in professional.resenas_recibidas
+            ],
+            distribucion_ratings=distribucion_ratings or {},
         )
 
 
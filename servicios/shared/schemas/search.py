@@ -1,16 +1,31 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from uuid import UUID
-from typing import Optional, List
+from typing import Optional, List, Literal
 from decimal import Decimal
 from shared.models.enums import ProfessionalLevel
 
 
+class BoundingBox(BaseModel):
+    """Área visible del mapa (viewport) en coordenadas WGS84."""
+    min_lat: float = Field(..., ge=-90, le=90)
+    min_lng: float = Field(..., ge=-180, le=180)
+    max_lat: float = Field(..., ge=-90, le=90)
+    max_lng: float = Field(..., ge=-180, le=180)
+
+
 class SearchProfessionalsRequest(BaseModel):
     """Parámetros de búsqueda de profesionales esperados por el frontend."""
     oficio: Optional[str] = Field(None, description="Nombre del oficio (ej: Plomería)")
     latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitud del cliente")
     longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitud del cliente")
     radio_km: int = Field(default=10, ge=1, le=500, description="Radio de búsqueda en KM")
+    modo: Literal["radio", "cobertura"] = Field(
+        default="radio",
+        description=(
+            "radio: profesionales a radio_km del cliente (al ordenar por distancia o relevancia); "
+            "cobertura: profesionales cuyo radio de cobertura incluye la ubicación del cliente"
+        )
+    )
     incluir_fuera_de_radio: bool = Field(default=False)
     solo_disponibles_ahora: Optional[bool] = Field(default=False)
     rating_minimo: Optional[float] = None
@@ -18,7 +33,16 @@ class SearchProfessionalsRequest(BaseModel):
     precio_maximo: Optional[Decimal] = None
     skip: int = Field(default=0, ge=0)
     limit: int = Field(default=100, ge=1, le=1000)
-    ordenar_por: Optional[str] = Field(default="rating")
+    ordenar_por: Optional[str] = Field(default="rating", description="rating | precio | distancia | relevancia")
+    bbox: Optional[BoundingBox] = Field(None, description="Limitar a profesionales dentro del viewport del mapa")
+    modo_conteo: Literal["exacto", "estimado", "has_more"] = Field(
+        default="exacto",
+        description=(
+            "exacto: COUNT cacheado por filtros; "
+            "estimado: estimación del planner para búsquedas amplias; "
+            "has_more: sin total, solo indica si hay otra página"
+        )
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -40,13 +64,59 @@ class ProfessionalSearchResult(BaseModel):
 
 
 class SearchResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     resultados: List[ProfessionalSearchResult]
     pagina: int
-    total_paginas: int
+    total_paginas: Optional[int] = None
+    total_estimado: bool = False
+    has_more: Optional[bool] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchSearchRequest(BaseModel):
+    """
+    Búsqueda múltiple para la vista de mapa.
+    Acepta una lista explícita de búsquedas y/o un viewport + lista de oficios
+    (que se expande en una búsqueda por oficio). Todo se resuelve en una sola
+    consulta a la base de datos.
+    """
+    busquedas: List[SearchProfessionalsRequest] = Field(default_factory=list, max_length=20)
+    bbox: Optional[BoundingBox] = None
+    oficios: List[str] = Field(default_factory=list, max_length=20)
+    limit_por_oficio: int = Field(default=50, ge=1, le=200)
+
+    @model_validator(mode="after")
+    def validar_busquedas(self):
+        if not self.busquedas and self.bbox is None:
+            raise ValueError("Se requiere al menos una búsqueda o un bbox")
+        if len(self.busquedas) + max(len(self.oficios), 1 if self.bbox else 0) > 20:
+            raise ValueError("Máximo 20 búsquedas por request")
+        return self
+
+    def expandir_busquedas(self) -> List[SearchProfessionalsRequest]:
+        """Devuelve la lista final de búsquedas (explícitas + una por oficio del viewport)"""
+        busquedas = list(self.busquedas)
+        if self.bbox is not None:
+            for oficio in (self.oficios or [None]):
+                busquedas.append(SearchProfessionalsRequest(
+                    oficio=oficio,
+                    bbox=self.bbox,
+                    limit=self.limit_por_oficio,
+                ))
+        return busquedas
+
+
+class BatchSearchGroup(BaseModel):
+    indice: int
+    oficio: Optional[str] = None
+    resultados: List[ProfessionalSearchResult]
+    desde_cache: bool = False
+
+
+class BatchSearchResponse(BaseModel):
+    grupos: List[BatchSearchGroup]
+
+
 # Alias para compatibilidad
 SearchRequest = SearchProfessionalsRequest
@@ -1,21 +1,439 @@
 """
-Servicio de envío de correos electrónicos.
-Placeholder para futuras implementaciones con SMTP, SendGrid, etc.
+Servicio de envío de correos electrónicos por SMTP.
+
+Pensado para que un envío masivo (campañas, avisos a todos los
+profesionales) no cueste una tarea y un handshake SMTP por mensaje:
+
+- Conexiones reutilizables: SMTPPool mantiene hasta EMAIL_SMTP_POOL_SIZE
+  conexiones abiertas por proveedor y proceso. Cada una manda hasta
+  EMAIL_SMTP_MAX_MESSAGES mensajes y después se renueva (los proveedores
+  cortan las sesiones largas); si estuvo inactiva más de
+  EMAIL_SMTP_IDLE_SECONDS se verifica con NOOP antes de usarla.
+- Lotes: enviar() recibe cualquier iterable de mensajes y los manda de a
+  EMAIL_BATCH_SIZE por conexión.
+- Rate limit por proveedor: antes de cada lote se reservan fichas en el
+  rate limiter compartido (GCRA en Redis, key "email:<proveedor>"), así
+  todos los workers juntos respetan el límite del proveedor. Si se otorgan
+  menos de las pedidas se manda esa parte y se espera por el resto.
+- Plantillas Jinja: cada plantilla se compila una vez por proceso;
+  enviar_plantilla() la renderiza para cada destinatario.
+
+Los métodos send_* son async (endpoints de FastAPI) y mandan en un thread
+para no bloquear el event loop. Con EMAIL_ENABLED=False no se envía nada.
 """
-from typing import Optional
+import asyncio
+import itertools
 import logging
+import smtplib
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemLoader, Template, TemplateNotFound, select_autoescape
+
+from shared.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# PROVEEDOR Y MENSAJES
+# ============================================================================
+
+@dataclass(frozen=True)
+class SMTPProvider:
+    nombre: str
+    host: str
+    port: int
+    usuario: Optional[str] = None
+    password: Optional[str] = None
+    starttls: bool = True
+    rate_limit: int = 0  # Mensajes por rate_limit_window (0 = sin límite)
+    rate_limit_window: int = 1
+
+
+def proveedor_default() -> SMTPProvider:
+    """Proveedor configurado en EMAIL_SMTP_*"""
+    return SMTPProvider(
+        nombre=settings.EMAIL_PROVIDER,
+        host=settings.EMAIL_SMTP_HOST,
+        port=settings.EMAIL_SMTP_PORT,
+        usuario=settings.EMAIL_SMTP_USER,
+        password=settings.EMAIL_SMTP_PASSWORD,
+        starttls=settings.EMAIL_SMTP_STARTTLS,
+        rate_limit=settings.EMAIL_RATE_LIMIT,
+        rate_limit_window=settings.EMAIL_RATE_LIMIT_WINDOW,
+    )
+
+
+@dataclass
+class Mensaje:
+    to_email: str
+    subject: str
+    body: str
+    html_body: Optional[str] = None
+
+    def to_email_message(self, remitente: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = remitente
+        message["To"] = self.to_email
+        message["Subject"] = self.subject
+        message.set_content(self.body)
+        if self.html_body:
+            message.add_alternative(self.html_body, subtype="html")
+        return message
+
+
+@dataclass
+class ResultadoEnvio:
+    enviados: int = 0
+    fallidos: List[str] = field(default_factory=list)
+
+    def sumar(self, otro: "ResultadoEnvio"):
+        self.enviados += otro.enviados
+        self.fallidos.extend(otro.fallidos)
+
+
+# ============================================================================
+# PLANTILLAS
+# ============================================================================
+
+# Cada plantilla tiene <nombre>.subject, <nombre>.txt y opcionalmente <nombre>.html.
+# Las de EMAIL_TEMPLATES_DIR con el mismo nombre tienen prioridad.
+PLANTILLAS: Dict[str, str] = {
+    "welcome.subject": "¡Bienvenido a ConectarProfesionales, {{ nombre }}!",
+    "welcome.txt": (
+        "Hola {{ nombre }},\n\n"
+        "Tu cuenta en ConectarProfesionales ya está activa. "
+        "Ya podés buscar profesionales o publicar tus servicios.\n"
+    ),
+    "welcome.html": (
+        "<p>Hola {{ nombre }},</p>"
+        "<p>Tu cuenta en <strong>ConectarProfesionales</strong> ya está activa. "
+        "Ya podés buscar profesionales o publicar tus servicios.</p>"
+    ),
+    "verification.subject": "Verifica tu cuenta",
+    "verification.txt": "Tu código de verificación es: {{ codigo }}\n",
+    "password_reset.subject": "Restablece tu contraseña",
+    "password_reset.txt": "Usa este código para restablecer tu contraseña: {{ token }}\n",
+    "notification.subject": "{{ titulo }}",
+    "notification.txt": "{{ mensaje }}\n",
+}
+
+
+@dataclass(frozen=True)
+class Plantilla:
+    nombre: str
+    subject: Template
+    txt: Template
+    html: Optional[Template]
+
+    def renderizar(self, to_email: str, contexto: dict) -> Mensaje:
+        return Mensaje(
+            to_email=to_email,
+            subject=self.subject.render(contexto).strip(),
+            body=self.txt.render(contexto),
+            html_body=self.html.render(contexto) if self.html else None,
+        )
+
+
+_entorno: Optional[Environment] = None
+_plantillas: Dict[str, Plantilla] = {}
+_plantillas_lock = threading.Lock()
+
+
+def _crear_entorno() -> Environment:
+    loaders = [DictLoader(PLANTILLAS)]
+    if settings.EMAIL_TEMPLATES_DIR:
+        loaders.insert(0, FileSystemLoader(settings.EMAIL_TEMPLATES_DIR))
+    return Environment(
+        loader=ChoiceLoader(loaders),
+        autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+        # Las plantillas no cambian con el proceso corriendo: sin stat() por render
+        auto_reload=False,
+    )
+
+
+def obtener_plantilla(nombre: str) -> Plantilla:
+    """
+    Plantilla compilada (se compila la primera vez que se pide en el proceso).
+
+    Raises:
+        jinja2.TemplateNotFound: no existe <nombre>.subject o <nombre>.txt
+    """
+    global _entorno
+    plantilla = _plantillas.get(nombre)
+    if plantilla is not None:
+        return plantilla
+
+    with _plantillas_lock:
+        if _entorno is None:
+            _entorno = _crear_entorno()
+        try:
+            html = _entorno.get_template(f"{nombre}.html")
+        except TemplateNotFound:
+            html = None
+        plantilla = _plantillas[nombre] = Plantilla(
+            nombre,
+            _entorno.get_template(f"{nombre}.subject"),
+            _entorno.get_template(f"{nombre}.txt"),
+            html,
+        )
+    return plantilla
+
+
+# ============================================================================
+# POOL DE CONEXIONES SMTP
+# ============================================================================
+
+# Errores de un mensaje puntual: la conexión sigue sirviendo para los demás
+_ERRORES_MENSAJE = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class _Conexion:
+    """Sesión SMTP abierta con la cuenta de mensajes enviados"""
+
+    def __init__(self, pool: "SMTPPool"):
+        self._pool = pool
+        self.smtp = pool._conectar()
+        self.enviados = 0
+        self.usada_en = time.monotonic()
+
+    def verificar(self):
+        """Si estuvo inactiva, confirma que el servidor no cerró la sesión"""
+        if time.monotonic() - self.usada_en < settings.EMAIL_SMTP_IDLE_SECONDS:
+            return
+        try:
+            if self.smtp.noop()[0] == 250:
+                return
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.reconectar()
+
+    def reconectar(self):
+        self.cerrar()
+        self.smtp = self._pool._conectar()
+        self.enviados = 0
+
+    def enviar(self, message: EmailMessage):
+        try:
+            self.smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # El servidor cortó la sesión: se reintenta una vez con otra
+            self.reconectar()
+            self.smtp.send_message(message)
+        self.enviados += 1
+        self.usada_en = time.monotonic()
+
+    def cerrar(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+
+class SMTPPool:
+    """Conexiones SMTP reutilizables hacia un proveedor (thread-safe)"""
+
+    def __init__(self, proveedor: SMTPProvider, size: Optional[int] = None):
+        self.proveedor = proveedor
+        self.size = size or settings.EMAIL_SMTP_POOL_SIZE
+        self._libres: List[_Conexion] = []
+        self._abiertas = 0
+        self._cond = threading.Condition()
+
+    def _conectar(self) -> smtplib.SMTP:
+        proveedor = self.proveedor
+        smtp = smtplib.SMTP(proveedor.host, proveedor.port, timeout=settings.EMAIL_SMTP_TIMEOUT)
+        try:
+            if proveedor.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+            if proveedor.usuario:
+                smtp.login(proveedor.usuario, proveedor.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    @contextmanager
+    def conexion(self) -> Iterator[_Conexion]:
+        """
+        Toma una conexión del pool (o abre una si hay lugar; si no, espera)
+        y la devuelve al terminar. Si hubo un error de conexión se descarta.
+        """
+        with self._cond:
+            while not self._libres and self._abiertas >= self.size:
+                self._cond.wait()
+            conexion = self._libres.pop() if self._libres else None
+            if conexion is None:
+                self._abiertas += 1
+
+        ok = False
+        try:
+            if conexion is None:
+                conexion = _Conexion(self)
+            else:
+                conexion.verificar()
+            yield conexion
+            ok = True
+        finally:
+            self._devolver(conexion, ok)
+
+    def _devolver(self, conexion: Optional[_Conexion], ok: bool):
+        descartar = conexion is None or not ok or conexion.enviados >= settings.EMAIL_SMTP_MAX_MESSAGES
+        if descartar and conexion is not None:
+            conexion.cerrar()
+        with self._cond:
+            if descartar:
+                self._abiertas -= 1
+            else:
+                self._libres.append(conexion)
+            self._cond.notify()
+
+    def cerrar(self):
+        with self._cond:
+            libres, self._libres = self._libres, []
+            self._abiertas -= len(libres)
+        for conexion in libres:
+            conexion.cerrar()
+
+
+_pools: Dict[SMTPProvider, SMTPPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(proveedor: SMTPProvider) -> SMTPPool:
+    """Pool del proceso para el proveedor (compartido por todas las instancias)"""
+    pool = _pools.get(proveedor)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(proveedor)
+            if pool is None:
+                pool = _pools[proveedor] = SMTPPool(proveedor)
+    return pool
+
+
+# ============================================================================
+# SERVICIO
+# ============================================================================
+
+_LIMITER_DEFAULT = object()
+
+
 class EmailService:
     """Servicio para enviar correos electrónicos"""
-    
-    def __init__(self):
-        """Inicializa el servicio de email"""
-        self.enabled = False  # Deshabilitado por defecto hasta configurar SMTP
-        logger.info("EmailService inicializado (actualmente deshabilitado)")
-    
+
+    def __init__(self, proveedor: Optional[SMTPProvider] = None, limiter=_LIMITER_DEFAULT,
+                 enabled: Optional[bool] = None):
+        """
+        Args:
+            proveedor: Proveedor SMTP (default: EMAIL_SMTP_*)
+            limiter: RateLimiter para el límite del proveedor (default: el
+                compartido; None para no limitar)
+            enabled: Default EMAIL_ENABLED
+        """
+        self.proveedor = proveedor or proveedor_default()
+        self.enabled = settings.EMAIL_ENABLED if enabled is None else enabled
+        if limiter is _LIMITER_DEFAULT:
+            limiter = None
+            if self.proveedor.rate_limit:
+                from shared.middleware.rate_limiter import get_rate_limiter
+                limiter = get_rate_limiter()
+        self.limiter = limiter
+
+    # ------------------------------------------------------------------
+    # Envío en lotes (síncrono: tareas de Celery, scripts)
+    # ------------------------------------------------------------------
+
+    def enviar(self, mensajes: Iterable[Mensaje]) -> ResultadoEnvio:
+        """
+        Envía los mensajes en lotes de EMAIL_BATCH_SIZE por conexión. Los
+        mensajes se consumen de a un lote (se puede pasar un generador).
+
+        Returns:
+            Enviados y destinatarios que fallaron
+        """
+        resultado = ResultadoEnvio()
+        mensajes = iter(mensajes)
+        while True:
+            lote = list(itertools.islice(mensajes, settings.EMAIL_BATCH_SIZE))
+            if not lote:
+                break
+            if not self.enabled:
+                logger.warning(f"EmailService deshabilitado. {len(lote)} emails no enviados")
+                resultado.fallidos.extend(m.to_email for m in lote)
+                continue
+            resultado.sumar(self._enviar_lote(lote))
+        return resultado
+
+    def enviar_plantilla(self, nombre: str, destinatarios: Iterable[dict],
+                         contexto: Optional[dict] = None) -> ResultadoEnvio:
+        """
+        Envía una plantilla a varios destinatarios.
+
+        Args:
+            nombre: Nombre de la plantilla (ver PLANTILLAS)
+            destinatarios: Dicts con "email" y el contexto propio de cada uno
+            contexto: Contexto común a todos
+        """
+        plantilla = obtener_plantilla(nombre)
+        contexto = contexto or {}
+        return self.enviar(
+            plantilla.renderizar(destinatario["email"], {**contexto, **destinatario})
+            for destinatario in destinatarios
+        )
+
+    def _reservar(self, cantidad: int) -> int:
+        """Fichas del proveedor para hasta `cantidad` mensajes; espera si no hay ninguna"""
+        proveedor = self.proveedor
+        if self.limiter is None or not proveedor.rate_limit:
+            return cantidad
+        while True:
+            try:
+                _, info = self.limiter.reserve(
+                    f"email:{proveedor.nombre}", proveedor.rate_limit, proveedor.rate_limit_window,
+                    algorithm="gcra", cost=cantidad, partial=True,
+                )
+            except Exception as e:
+                # Sin Redis no se frena el envío (mismo criterio que el resto del rate limiting)
+                logger.error(f"Rate limit de email sin Redis: {str(e)}")
+                return cantidad
+            if info["granted"]:
+                return info["granted"]
+            time.sleep(max(info["retry_after"], 0.05))
+
+    def _enviar_lote(self, lote: List[Mensaje]) -> ResultadoEnvio:
+        resultado = ResultadoEnvio()
+        procesados = 0
+        try:
+            with get_smtp_pool(self.proveedor).conexion() as conexion:
+                while procesados < len(lote):
+                    otorgados = self._reservar(len(lote) - procesados)
+                    for mensaje in lote[procesados:procesados + otorgados]:
+                        try:
+                            # EmailMessage rechaza con ValueError headers con CR/LF
+                            # o direcciones mal formadas (datos de campañas, nombres)
+                            conexion.enviar(mensaje.to_email_message(settings.EMAIL_FROM))
+                            resultado.enviados += 1
+                        except (*_ERRORES_MENSAJE, ValueError) as e:
+                            logger.error(f"Email a {mensaje.to_email!r} rechazado: {str(e)}")
+                            resultado.fallidos.append(mensaje.to_email)
+                        procesados += 1
+        except (smtplib.SMTPException, OSError) as e:
+            sin_enviar = lote[procesados:]
+            logger.error(f"Error SMTP con {self.proveedor.nombre}, {len(sin_enviar)} emails sin enviar: {str(e)}")
+            resultado.fallidos.extend(m.to_email for m in sin_enviar)
+        logger.info(f"Lote de emails: {resultado.enviados} enviados, {len(resultado.fallidos)} fallidos")
+        return resultado
+
+    # ------------------------------------------------------------------
+    # API async (endpoints)
+    # ------------------------------------------------------------------
+
     async def send_email(
         self,
         to_email: str,
@@ -25,36 +443,35 @@ class EmailService:
     ) -> bool:
         """
         Envía un correo electrónico.
-        
+
         Args:
             to_email: Dirección de correo del destinatario
             subject: Asunto del correo
             body: Cuerpo del correo en texto plano
             html_body: Cuerpo del correo en HTML (opcional)
-            
+
         Returns:
             True si se envió correctamente, False en caso contrario
         """
-        if not self.enabled:
-            logger.warning(f"EmailService deshabilitado. Email no enviado a {to_email}: {subject}")
-            return False
-        
-        # TODO: Implementar envío real de correos con SMTP, SendGrid, etc.
-        logger.info(f"Enviando email a {to_email}: {subject}")
-        return True
-    
+        resultado = await asyncio.to_thread(self.enviar, [Mensaje(to_email, subject, body, html_body)])
+        return resultado.enviados == 1
+
+    async def _send_plantilla(self, nombre: str, to_email: str, **contexto) -> bool:
+        resultado = await asyncio.to_thread(self.enviar_plantilla, nombre, [{"email": to_email, **contexto}])
+        return resultado.enviados == 1
+
+    async def send_welcome_email(self, to_email: str, user_name: str) -> bool:
+        """Envía el correo de bienvenida"""
+        return await self._send_plantilla("welcome", to_email, nombre=user_name)
+
     async def send_verification_email(self, to_email: str, verification_code: str) -> bool:
         """Envía un correo de verificación de cuenta"""
-        subject = "Verifica tu cuenta"
-        body = f"Tu código de verificación es: {verification_code}"
-        return await self.send_email(to_email, subject, body)
-    
+        return await self._send_plantilla("verification", to_email, codigo=verification_code)
+
     async def send_password_reset_email(self, to_email: str, reset_token: str) -> bool:
         """Envía un correo para restablecer la contraseña"""
-        subject = "Restablece tu contraseña"
-        body = f"Usa este código para restablecer tu contraseña: {reset_token}"
-        return await self.send_email(to_email, subject, body)
-    
+        return await self._send_plantilla("password_reset", to_email, token=reset_token)
+
     async def send_notification_email(
         self,
         to_email: str,
@@ -62,7 +479,7 @@ class EmailService:
         message: str
     ) -> bool:
         """Envía un correo de notificación genérica"""
-        return await self.send_email(to_email, title, message)
+        return await self._send_plantilla("notification", to_email, titulo=title, mensaje=message)
 
 
 # Instancia global del servicio
@@ -3,10 +3,15 @@ Servicio de gamificación para profesionales.
 Maneja puntos, niveles y recompensas.
 """
 from decimal import Decimal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from shared.cache.cache_manager import cached
 from shared.models.professional import Profesional
-from shared.models.enums import ProfessionalLevel
+from shared.models.user import Usuario
+from shared.models.trabajo import Trabajo
+from shared.models.enums import ProfessionalLevel, EstadoEscrow
 from shared.core.config import settings
+from shared.services.resumen_service import resumenes_profesionales
 import logging
 
 logger = logging.getLogger(__name__)
@@ -136,3 +141,46 @@ class GamificacionService:
 def get_gamificacion_service(db: Session) -> GamificacionService:
     """Factory function para obtener el servicio de gamificación"""
     return GamificacionService(db)
+
+
+@cached(ttl=60, key_prefix="leaderboard", stale_ttl=60)
+def obtener_leaderboard(db: Session, limit: int = 10) -> list:
+    """
+    Ranking de profesionales activos por puntos de experiencia.
+    
+    Cacheado un minuto (más uno sirviendo el valor anterior mientras se
+    recalcula): los puntos cambian seguido y el ranking tolera ese atraso.
+    """
+    top_professionals = db.query(
+        Profesional.id, Profesional.usuario_id, Profesional.puntos_experiencia, Profesional.nivel
+    ).join(Usuario, Profesional.usuario_id == Usuario.id).filter(
+        Usuario.is_active == True
+    ).order_by(
+        Profesional.puntos_experiencia.desc()
+    ).limit(limit).all()
+    
+    # Nombre y rating de todo el ranking en un lote (caché + una consulta por los faltantes)
+    ids = [prof.id for prof in top_professionals]
+    resumenes = resumenes_profesionales(db, ids)
+    # trabajos.profesional_id es el usuarios.id del profesional
+    usuario_ids = [prof.usuario_id for prof in top_professionals]
+    trabajos = dict(
+        db.query(Trabajo.profesional_id, func.count(Trabajo.id)).filter(
+            Trabajo.profesional_id.in_(usuario_ids),
+            Trabajo.estado_escrow == EstadoEscrow.LIBERADO
+        ).group_by(Trabajo.profesional_id).all()
+    ) if usuario_ids else {}
+    
+    leaderboard = []
+    for i, prof in enumerate(top_professionals, 1):
+        resumen = resumenes.get(str(prof.id), {})
+        leaderboard.append({
+            "posicion": i,
+            "nombre": resumen.get("nombre"),
+            "puntos": prof.puntos_experiencia,
+            "nivel": prof.nivel.value if prof.nivel else None,
+            "rating": resumen.get("rating_promedio", 0),
+            "trabajos_completados": trabajos.get(prof.usuario_id, 0)
+        })
+    
+    return leaderboard
@@ -0,0 +1,153 @@
+"""
+Servicio de Oficios - Registro en memoria del catálogo de oficios.
+
+El catálogo (sembrado con seed_oficios.sql) cambia solo cuando se agrega
+un oficio, pero se lee en cada pantalla de búsqueda y en cada filtro por
+oficio. Cada proceso guarda un OficioRegistry inmutable con el catálogo
+completo (id, nombre, nombre normalizado) y su JSON ya serializado:
+
+- /public/oficios lo sirve sin tocar Postgres ni Redis, con un ETag fuerte
+  derivado del contenido (los clientes revalidan con If-None-Match).
+- La búsqueda resuelve el filtro por nombre de oficio a ids en memoria y
+  filtra professional_oficios por id, sin el JOIN + LIKE contra oficios.
+
+El registro se recarga cuando cambia la generación de OFICIOS_TAG:
+invalidar_catalogo() la incrementa y avisa por pub/sub a las demás
+réplicas (que descartan su registro al instante); además cada réplica
+compara la generación cada OFICIOS_REGISTRY_CHECK_SECONDS por si se pierde
+el aviso.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from shared.cache.cache_manager import OFICIOS_TAG, get_cache_manager, invalidate_tag
+from shared.core.config import settings
+from shared.models.oficio import Oficio
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_nombre(nombre: str) -> str:
+    """Minúsculas, sin acentos y con espacios simples ("Plomería " -> "plomeria")"""
+    sin_acentos = unicodedata.normalize("NFKD", nombre)
+    sin_acentos = "".join(c for c in sin_acentos if not unicodedata.combining(c))
+    return " ".join(sin_acentos.lower().split())
+
+
+@dataclass(frozen=True)
+class OficioRef:
+    id: UUID
+    nombre: str
+    nombre_normalizado: str
+    descripcion: Optional[str]
+
+
+class OficioRegistry:
+    """Snapshot inmutable del catálogo; para cambiarlo se arma uno nuevo"""
+
+    def __init__(self, oficios: Tuple[OficioRef, ...], generacion: Optional[int]):
+        self.oficios = oficios
+        self.generacion = generacion
+        self.por_id: Mapping[UUID, OficioRef] = MappingProxyType({o.id: o for o in oficios})
+        self.por_nombre: Mapping[str, OficioRef] = MappingProxyType({o.nombre_normalizado: o for o in oficios})
+        self.lista = tuple(
+            {"id": str(o.id), "nombre": o.nombre, "descripcion": o.descripcion} for o in oficios
+        )
+        self.json = json.dumps(list(self.lista), ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = f'"{hashlib.sha256(self.json).hexdigest()[:32]}"'
+
+    def resolver(self, nombre: str) -> Tuple[UUID, ...]:
+        """
+        Ids de los oficios cuyo nombre contiene `nombre` (sin distinguir
+        mayúsculas ni acentos: "plomeria" encuentra "Plomería")
+        """
+        buscado = normalizar_nombre(nombre)
+        exacto = self.por_nombre.get(buscado)
+        if exacto is not None:
+            return (exacto.id,)
+        return tuple(o.id for o in self.oficios if buscado in o.nombre_normalizado)
+
+    def __len__(self) -> int:
+        return len(self.oficios)
+
+
+_registro: Optional[OficioRegistry] = None
+_verificado_en = 0.0
+_lock = threading.Lock()
+_escuchando = False
+
+
+def _cargar(db: Session, generacion: Optional[int]) -> OficioRegistry:
+    rows = db.execute(
+        select(Oficio.id, Oficio.nombre, Oficio.descripcion).order_by(Oficio.nombre)
+    ).all()
+    registro = OficioRegistry(
+        tuple(OficioRef(row.id, row.nombre, normalizar_nombre(row.nombre), row.descripcion) for row in rows),
+        generacion,
+    )
+    logger.info(f"Registro de oficios cargado: {len(registro)} oficios (generación {generacion})")
+    return registro
+
+
+def _descartar_registro():
+    """Se llama al invalidar OFICIOS_TAG, en este proceso o en otra réplica"""
+    global _registro
+    _registro = None
+
+
+def _escuchar_cambios():
+    global _escuchando
+    if _escuchando:
+        return
+    local_cache = get_cache_manager().local_cache
+    if local_cache is not None:
+        local_cache.on_tag_invalidated(OFICIOS_TAG, _descartar_registro)
+    _escuchando = True
+
+
+def obtener_registro(db: Session) -> OficioRegistry:
+    """
+    Registro vigente del catálogo. Solo consulta la DB si no hay registro o
+    si cambió la generación de OFICIOS_TAG (se compara como mucho cada
+    OFICIOS_REGISTRY_CHECK_SECONDS).
+    """
+    global _registro, _verificado_en
+    registro = _registro
+    if registro is not None and time.monotonic() - _verificado_en < settings.OFICIOS_REGISTRY_CHECK_SECONDS:
+        return registro
+
+    with _lock:
+        _escuchar_cambios()
+        registro = _registro
+        if registro is not None and time.monotonic() - _verificado_en < settings.OFICIOS_REGISTRY_CHECK_SECONDS:
+            return registro
+        # La generación se lee antes de cargar: si cambia en el medio, la
+        # próxima verificación vuelve a cargar
+        generacion = get_cache_manager().tag_version(OFICIOS_TAG)
+        if registro is None or generacion is None or registro.generacion != generacion:
+            registro = _cargar(db, generacion)
+            _registro = registro
+        _verificado_en = time.monotonic()
+        return registro
+
+
+def registro_actual() -> Optional[OficioRegistry]:
+    """Registro cargado en este proceso, sin consultar nada (None si no hay)"""
+    return _registro
+
+
+def invalidar_catalogo() -> None:
+    """Invalida el catálogo en todas las réplicas (después de crear/editar un oficio)"""
+    invalidate_tag(OFICIOS_TAG)
+    _descartar_registro()
@@ -0,0 +1,134 @@
+"""
+Servicio de Perfil Público - Read model cacheado del perfil de un profesional.
+
+El perfil se arma con consultas acotadas:
+- Profesional + usuario en una fila; oficios y portfolio (con imágenes) con
+  selectinload, una consulta por colección en lugar de un JOIN cartesiano.
+- Solo las últimas PROFILE_RESENAS_RECIENTES reseñas (proyectadas con el
+  nombre del cliente) y la distribución de ratings agregada en SQL. El resto
+  de las reseñas se pagina en /public/professional/{id}/resenas.
+
+El resultado se serializa una vez a JSON y se guarda en ProfessionalCache;
+se invalida con invalidate_public_profile() al cambiar el perfil, el
+portfolio, los oficios o las reseñas del profesional.
+"""
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from shared.cache.cache_manager import ProfessionalCache
+from shared.cache.warmup import registrar_pedido
+from shared.core.config import settings
+from shared.models.enums import VerificationStatus
+from shared.models.portfolio import PortfolioItem
+from shared.models.professional import Profesional
+from shared.models.resena import Resena
+from shared.models.user import Usuario
+from shared.schemas.professional import PublicProfileResponse
+from shared.schemas.resena import ResenaPublicRead
+
+
+def _resenas_select(profesional_id: UUID):
+    """SELECT proyectado de reseñas públicas (sin cargar entidades Resena/Usuario)"""
+    return (
+        select(
+            Resena.id,
+            Resena.rating,
+            Resena.texto_resena,
+            (Usuario.nombre + " " + Usuario.apellido).label("nombre_cliente"),
+            Resena.fecha_creacion,
+        )
+        .join(Usuario, Resena.cliente_id == Usuario.id)
+        .where(Resena.profesional_id == profesional_id)
+        .order_by(Resena.fecha_creacion.desc(), Resena.id)
+    )
+
+
+def get_resenas_publicas(db: Session, profesional_id: UUID, skip: int = 0, limit: int = 10) -> List[ResenaPublicRead]:
+    """Página de reseñas públicas de un profesional, de la más reciente a la más antigua"""
+    rows = db.execute(_resenas_select(profesional_id).offset(skip).limit(limit)).all()
+    return [ResenaPublicRead.model_validate(row) for row in rows]
+
+
+def _distribucion_ratings(db: Session, profesional_id: UUID) -> dict:
+    """Cantidad de reseñas por rating ("1".."5"), resuelto con GROUP BY"""
+    rows = db.execute(
+        select(Resena.rating, func.count())
+        .where(Resena.profesional_id == profesional_id)
+        .group_by(Resena.rating)
+    ).all()
+    distribucion = {str(rating): 0 for rating in range(1, 6)}
+    for rating, cantidad in rows:
+        distribucion[str(rating)] = cantidad
+    return distribucion
+
+
+def build_public_profile(db: Session, profesional_id: UUID) -> Optional[dict]:
+    """
+    Arma el perfil público serializado a JSON.
+
+    Returns:
+        Dict listo para devolver/cachear, o None si el profesional no existe
+        o no es público (usuario inactivo o KYC no aprobado)
+    """
+    professional = db.execute(
+        select(Profesional)
+        .options(
+            joinedload(Profesional.usuario),
+            selectinload(Profesional.oficios),
+            selectinload(Profesional.portfolio_items).selectinload(PortfolioItem.imagenes),
+        )
+        .where(Profesional.id == profesional_id)
+    ).unique().scalar_one_or_none()
+
+    if professional is None:
+        return None
+
+    user = professional.usuario
+    if not user or not user.is_active or professional.estado_verificacion != VerificationStatus.APROBADO:
+        return None
+
+    perfil = PublicProfileResponse.from_professional(
+        professional,
+        resenas=get_resenas_publicas(db, profesional_id, limit=settings.PROFILE_RESENAS_RECIENTES),
+        distribucion_ratings=_distribucion_ratings(db, profesional_id),
+    )
+    return perfil.model_dump(mode="json")
+
+
+def get_public_profile(db: Session, profesional_id: UUID) -> Optional[dict]:
+    """Perfil público desde ProfessionalCache o, si no está, armado y cacheado"""
+    registrar_pedido("perfiles", str(profesional_id), settings.WARMUP_TOP_PERFILES)
+    perfil = ProfessionalCache.get_profile(str(profesional_id))
+    if perfil is not None:
+        return perfil
+
+    perfil = build_public_profile(db, profesional_id)
+    if perfil is not None:
+        ProfessionalCache.set_profile(str(profesional_id), perfil, ttl=settings.PROFILE_CACHE_TTL)
+    return perfil
+
+
+def invalidate_public_profile(profesional_id) -> None:
+    """Invalida el perfil público cacheado de un profesional"""
+    ProfessionalCache.invalidate(str(profesional_id))
+
+
+def invalidate_public_profile_by_user(db: Session, usuario_id) -> Optional[UUID]:
+    """
+    Invalida el perfil público a partir del usuario del profesional.
+
+    Los eventos de trabajos y reseñas traen trabajos.profesional_id, que es
+    un usuarios.id; el perfil se cachea por profesionales.id.
+
+    Returns:
+        El profesionales.id invalidado, o None si el usuario no es profesional
+    """
+    profesional_id = db.execute(
+        select(Profesional.id).where(Profesional.usuario_id == UUID(str(usuario_id)))
+    ).scalar_one_or_none()
+    if profesional_id is not None:
+        invalidate_public_profile(profesional_id)
+    return profesional_id
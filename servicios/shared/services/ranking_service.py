@@ -0,0 +1,130 @@
+"""
+Servicio de Ranking - Puntaje de relevancia para la búsqueda de profesionales.
+
+El puntaje se calcula en SQL como suma ponderada de componentes en [0, 1]:
+- distancia: decaimiento exponencial exp(-km / SEARCH_DISTANCIA_ESCALA_KM)
+- rating: rating bayesiano (suavizado con total_resenas) / 5
+- nivel: BRONCE=0, PLATA=1/3, ORO=2/3, DIAMANTE=1
+- precio: cercanía de la tarifa al precio objetivo de la búsqueda
+- instant: 1 si acepta trabajos instantáneos
+
+Los pesos se configuran en settings (SEARCH_PESO_*). El rating bayesiano se
+precalcula en Profesional.rating_bayesiano para no recalcularlo por consulta.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import case, func, literal
+from shared.core.config import settings
+from shared.models.professional import Profesional
+from shared.models.enums import ProfessionalLevel
+
+
+@dataclass(frozen=True)
+class PesosRelevancia:
+    """Pesos de cada componente del puntaje de relevancia"""
+    distancia: float
+    rating: float
+    nivel: float
+    precio: float
+    instant: float
+
+    @classmethod
+    def desde_settings(cls) -> "PesosRelevancia":
+        return cls(
+            distancia=settings.SEARCH_PESO_DISTANCIA,
+            rating=settings.SEARCH_PESO_RATING,
+            nivel=settings.SEARCH_PESO_NIVEL,
+            precio=settings.SEARCH_PESO_PRECIO,
+            instant=settings.SEARCH_PESO_INSTANT,
+        )
+
+
+def calcular_rating_bayesiano(rating_promedio, total_resenas: int) -> Decimal:
+    """
+    Rating promedio suavizado hacia un prior (media bayesiana).
+
+    Con pocas reseñas el resultado queda cerca de SEARCH_RATING_PRIOR_MEDIA;
+    a medida que crecen las reseñas converge al promedio real. Evita que un
+    profesional con una sola reseña de 5 estrellas quede primero.
+
+    Example:
+        >>> calcular_rating_bayesiano(5.0, 1)   # prior 3.5, peso 10
+        Decimal('3.64')
+        >>> calcular_rating_bayesiano(4.8, 200)
+        Decimal('4.74')
+    """
+    prior_media = Decimal(str(settings.SEARCH_RATING_PRIOR_MEDIA))
+    prior_peso = Decimal(settings.SEARCH_RATING_PRIOR_PESO)
+    n = Decimal(total_resenas or 0)
+    promedio = Decimal(str(rating_promedio or 0))
+
+    valor = (prior_media * prior_peso + promedio * n) / (prior_peso + n)
+    return valor.quantize(Decimal("0.01"))
+
+
+def rating_bayesiano_sql(rating_promedio, total_resenas):
+    """Misma fórmula que calcular_rating_bayesiano, como expresión SQL (para recalcular en lote)"""
+    prior_media = literal(Decimal(str(settings.SEARCH_RATING_PRIOR_MEDIA)))
+    prior_peso = settings.SEARCH_RATING_PRIOR_PESO
+    return func.round((prior_media * prior_peso + rating_promedio * total_resenas) / (prior_peso + total_resenas), 2)
+
+
+def _componente_nivel():
+    return case(
+        (Profesional.nivel == ProfessionalLevel.DIAMANTE, 1.0),
+        (Profesional.nivel == ProfessionalLevel.ORO, 2.0 / 3.0),
+        (Profesional.nivel == ProfessionalLevel.PLATA, 1.0 / 3.0),
+        else_=0.0
+    )
+
+
+def _precio_objetivo(params) -> Optional[float]:
+    """Precio de referencia de la búsqueda (centro del rango pedido)"""
+    minimo = float(params.precio_minimo) if params.precio_minimo else None
+    maximo = float(params.precio_maximo) if params.precio_maximo else None
+    if minimo is not None and maximo is not None:
+        return (minimo + maximo) / 2
+    return maximo if maximo is not None else minimo
+
+
+def _componente_precio(params):
+    """
+    1 cuando la tarifa coincide con el precio objetivo, decrece linealmente
+    hasta 0 al alejarse un 100%. Sin rango de precios el componente es
+    constante (no altera el orden). Tarifa sin configurar puntúa 0.
+    """
+    objetivo = _precio_objetivo(params)
+    if not objetivo:
+        return literal(0.5)
+    desvio = func.abs(Profesional.tarifa_por_hora - objetivo) / objetivo
+    return func.coalesce(func.greatest(0.0, 1.0 - desvio), 0.0)
+
+
+def puntaje_relevancia(params, distancia_km, pesos: Optional[PesosRelevancia] = None):
+    """
+    Expresión SQL del puntaje de relevancia para ORDER BY.
+
+    Args:
+        params: SearchProfessionalsRequest de la búsqueda
+        distancia_km: Expresión SQL de la distancia en km (o None sin ubicación)
+        pesos: Pesos a usar (default: los de settings)
+    """
+    pesos = pesos or PesosRelevancia.desde_settings()
+
+    componentes = [
+        pesos.rating * (func.coalesce(Profesional.rating_bayesiano, 0) / 5.0),
+        pesos.nivel * _componente_nivel(),
+        pesos.precio * _componente_precio(params),
+        pesos.instant * case((Profesional.acepta_instant == True, 1.0), else_=0.0),
+    ]
+    if distancia_km is not None:
+        componentes.append(
+            pesos.distancia * func.exp(-distancia_km / settings.SEARCH_DISTANCIA_ESCALA_KM)
+        )
+
+    puntaje = componentes[0]
+    for componente in componentes[1:]:
+        puntaje = puntaje + componente
+    return puntaje
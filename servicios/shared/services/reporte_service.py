@@ -0,0 +1,300 @@
+"""
+Servicio de Reportes - Reporte mensual de trabajos.
+
+El reporte agrega los trabajos creados en el mes por varias dimensiones
+(total, oficio, nivel del profesional, estado del escrow) sin recorrer la
+tabla una vez por dimensión:
+
+- Solo resumen: una consulta con GROUPING SETS; Postgres lee los trabajos
+  del mes una vez y devuelve todas las agregaciones juntas.
+- Con detalle: los trabajos del mes se leen una sola vez con un cursor del
+  lado del servidor (yield_per, de a REPORTES_CHUNK_SIZE filas); cada lote
+  se escribe en el archivo de detalle y se suma a las agregaciones en la
+  misma pasada. La memoria no depende del tamaño del mes.
+
+Los archivos (CSV, o Parquet si pyarrow está instalado) se escriben en
+REPORTES_DIR con un nombre temporal y se renombran al terminar, así nunca
+queda a la vista un reporte a medio escribir.
+
+El modelo no tiene la ubicación del trabajo (provincia): el desglose
+geográfico se puede sumar como otra dimensión cuando exista el dato.
+"""
+import csv
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from shared.core.config import settings
+from shared.models.professional import Profesional
+from shared.models.servicio_instantaneo import ServicioInstantaneo
+from shared.models.trabajo import Trabajo
+from shared.services.oficio_service import obtener_registro
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional (solo para formato parquet)
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ("csv", "parquet")
+
+DIMENSIONES = ("total", "oficio", "nivel", "estado_escrow")
+
+SIN_VALOR = "(sin dato)"
+
+COLUMNAS_RESUMEN = ("dimension", "valor", "trabajos", "ingresos", "comisiones", "liberado")
+COLUMNAS_DETALLE = (
+    "id", "fecha_creacion", "oficio", "nivel", "estado_escrow",
+    "precio_final", "comision_plataforma", "monto_liberado",
+)
+_COLUMNAS_DINERO = {"ingresos", "comisiones", "liberado", "precio_final", "comision_plataforma", "monto_liberado"}
+
+# GROUPING(oficio, nivel, estado) -> dimensión de la fila (bit en 1 = columna agregada)
+_GRUPOS = {0b111: "total", 0b011: "oficio", 0b101: "nivel", 0b110: "estado_escrow"}
+
+RESUMEN_SQL = text("""
+    SELECT
+        s.oficio_id AS oficio_id,
+        p.nivel::text AS nivel,
+        t.estado_escrow::text AS estado_escrow,
+        GROUPING(s.oficio_id, p.nivel, t.estado_escrow) AS grupo,
+        count(*) AS trabajos,
+        coalesce(sum(t.precio_final), 0) AS ingresos,
+        coalesce(sum(t.comision_plataforma), 0) AS comisiones,
+        coalesce(sum(t.monto_liberado), 0) AS liberado
+    FROM trabajos t
+    LEFT JOIN servicios_instantaneos s ON s.id = t.servicio_instant_id
+    LEFT JOIN profesionales p ON p.usuario_id = t.profesional_id
+    WHERE t.fecha_creacion >= :desde AND t.fecha_creacion < :hasta
+    GROUP BY GROUPING SETS ((), (s.oficio_id), (p.nivel), (t.estado_escrow))
+""")
+
+
+def rango_mes(anio: int, mes: int) -> Tuple[datetime, datetime]:
+    """[desde, hasta) del mes en UTC"""
+    desde = datetime(anio, mes, 1, tzinfo=timezone.utc)
+    hasta = datetime(anio + 1, 1, 1, tzinfo=timezone.utc) if mes == 12 else datetime(anio, mes + 1, 1, tzinfo=timezone.utc)
+    return desde, hasta
+
+
+def _detalle_query(desde: datetime, hasta: datetime):
+    return (
+        select(
+            Trabajo.id,
+            Trabajo.fecha_creacion,
+            ServicioInstantaneo.oficio_id,
+            Profesional.nivel,
+            Trabajo.estado_escrow,
+            Trabajo.precio_final,
+            Trabajo.comision_plataforma,
+            Trabajo.monto_liberado,
+        )
+        .select_from(Trabajo)
+        .outerjoin(ServicioInstantaneo, ServicioInstantaneo.id == Trabajo.servicio_instant_id)
+        .outerjoin(Profesional, Profesional.usuario_id == Trabajo.profesional_id)
+        .where(Trabajo.fecha_creacion >= desde, Trabajo.fecha_creacion < hasta)
+    )
+
+
+class _Acumulador:
+    """Agregaciones por dimensión, calculadas en la misma pasada que el detalle"""
+
+    def __init__(self):
+        # (dimensión, valor) -> [trabajos, ingresos, comisiones, liberado]
+        self.grupos: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, Decimal("0.00"), Decimal("0.00"), Decimal("0.00")])
+        self.grupos[("total", "total")]  # el total aparece aunque el mes no tenga trabajos
+
+    def sumar(self, claves: Iterable[Tuple[str, str]], precio, comision, liberado):
+        for clave in claves:
+            grupo = self.grupos[clave]
+            grupo[0] += 1
+            grupo[1] += precio or 0
+            grupo[2] += comision or 0
+            grupo[3] += liberado or 0
+
+    def filas(self) -> List[tuple]:
+        return [(dimension, valor, *valores) for (dimension, valor), valores in self.grupos.items()]
+
+
+def _ordenar_resumen(filas: List[tuple]) -> List[tuple]:
+    """Primero el total, después cada dimensión de mayor a menor ingreso"""
+    return sorted(filas, key=lambda f: (DIMENSIONES.index(f[0]), -f[3], f[1]))
+
+
+def resumen_mensual(db: Session, anio: int, mes: int) -> List[tuple]:
+    """
+    Agregaciones del mes en una sola consulta (GROUPING SETS).
+
+    Returns:
+        Filas (dimension, valor, trabajos, ingresos, comisiones, liberado)
+    """
+    desde, hasta = rango_mes(anio, mes)
+    registro = obtener_registro(db)
+    filas = []
+    for row in db.execute(RESUMEN_SQL, {"desde": desde, "hasta": hasta}):
+        dimension = _GRUPOS[row.grupo]
+        if dimension == "total":
+            valor = "total"
+        elif dimension == "oficio":
+            oficio = registro.por_id.get(UUID(str(row.oficio_id))) if row.oficio_id else None
+            valor = oficio.nombre if oficio else SIN_VALOR
+        else:
+            valor = getattr(row, dimension) or SIN_VALOR
+        filas.append((dimension, valor, row.trabajos, row.ingresos, row.comisiones, row.liberado))
+    return _ordenar_resumen(filas)
+
+
+class _EscritorCSV:
+    def __init__(self, path: str, columnas: tuple):
+        self._archivo = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._archivo)
+        self._writer.writerow(columnas)
+
+    def escribir(self, filas: List[tuple]):
+        self._writer.writerows(filas)
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class _EscritorParquet:
+    """Escribe un row group por lote"""
+
+    def __init__(self, path: str, columnas: tuple):
+        tipos = {
+            "id": pa.string(),
+            "fecha_creacion": pa.timestamp("us", tz="UTC"),
+            "trabajos": pa.int64(),
+        }
+        dinero = pa.decimal128(14, 2)
+        self._schema = pa.schema([(c, tipos.get(c, dinero if c in _COLUMNAS_DINERO else pa.string())) for c in columnas])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def escribir(self, filas: List[tuple]):
+        if filas:
+            columnas = [list(columna) for columna in zip(*filas)]
+            self._writer.write_batch(pa.record_batch(columnas, schema=self._schema))
+
+    def cerrar(self):
+        self._writer.close()
+
+
+_ESCRITORES = {"csv": _EscritorCSV, "parquet": _EscritorParquet}
+
+
+class _Archivo:
+    """Escritor que publica el archivo (rename) solo si termina sin errores"""
+
+    def __init__(self, directorio: str, nombre: str, formato: str, columnas: tuple):
+        self.path = os.path.join(directorio, f"{nombre}.{formato}")
+        self._tmp = f"{self.path}.tmp"
+        self._escritor = _ESCRITORES[formato](self._tmp, columnas)
+
+    def __enter__(self):
+        return self._escritor
+
+    def __exit__(self, exc_type, exc, tb):
+        self._escritor.cerrar()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            os.remove(self._tmp)
+
+
+def _exportar_detalle(db: Session, desde: datetime, hasta: datetime, escritor) -> List[tuple]:
+    """Escribe el detalle del mes por lotes y devuelve el resumen calculado en la misma pasada"""
+    registro = obtener_registro(db)
+    nombres_oficio: Dict[object, str] = {}
+    acumulador = _Acumulador()
+
+    result = db.execute(_detalle_query(desde, hasta).execution_options(yield_per=settings.REPORTES_CHUNK_SIZE))
+    for lote in result.partitions():
+        filas = []
+        for id_, fecha, oficio_id, nivel, estado, precio, comision, liberado in lote:
+            oficio = nombres_oficio.get(oficio_id)
+            if oficio is None:
+                encontrado = registro.por_id.get(oficio_id) if oficio_id else None
+                oficio = nombres_oficio[oficio_id] = encontrado.nombre if encontrado else SIN_VALOR
+            nivel = nivel.value if nivel else SIN_VALOR
+            estado = estado.value if estado else SIN_VALOR
+
+            filas.append((str(id_), fecha, oficio, nivel, estado, precio, comision, liberado))
+            acumulador.sumar(
+                (("total", "total"), ("oficio", oficio), ("nivel", nivel), ("estado_escrow", estado)),
+                precio, comision, liberado,
+            )
+        escritor.escribir(filas)
+
+    return _ordenar_resumen(acumulador.filas())
+
+
+def exportar_reporte_mensual(
+    db: Session,
+    anio: int,
+    mes: int,
+    formato: Optional[str] = None,
+    detalle: bool = True,
+    directorio: Optional[str] = None,
+) -> dict:
+    """
+    Genera el reporte del mes en archivos.
+
+    Args:
+        db: Sesión de base de datos
+        anio: Año
+        mes: Mes (1-12)
+        formato: "csv" o "parquet" (default: REPORTES_FORMATO)
+        detalle: Además del resumen, exportar cada trabajo del mes
+        directorio: Carpeta de salida (default: REPORTES_DIR)
+
+    Returns:
+        Totales del mes y paths de los archivos generados
+
+    Raises:
+        ValueError: formato desconocido, o parquet sin pyarrow instalado
+    """
+    formato = formato or settings.REPORTES_FORMATO
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de reporte desconocido: {formato}")
+    if formato == "parquet" and pa is None:
+        raise ValueError("El formato parquet requiere pyarrow")
+
+    directorio = directorio or settings.REPORTES_DIR
+    os.makedirs(directorio, exist_ok=True)
+    periodo = f"{anio:04d}-{mes:02d}"
+    archivos = {}
+
+    if detalle:
+        desde, hasta = rango_mes(anio, mes)
+        archivo = _Archivo(directorio, f"trabajos_{periodo}", formato, COLUMNAS_DETALLE)
+        with archivo as escritor:
+            resumen = _exportar_detalle(db, desde, hasta, escritor)
+        archivos["detalle"] = archivo.path
+    else:
+        resumen = resumen_mensual(db, anio, mes)
+
+    archivo = _Archivo(directorio, f"resumen_{periodo}", formato, COLUMNAS_RESUMEN)
+    with archivo as escritor:
+        escritor.escribir(resumen)
+    archivos["resumen"] = archivo.path
+
+    total = next(fila for fila in resumen if fila[0] == "total")
+    logger.info(f"Reporte {periodo}: {total[2]} trabajos, archivos {archivos}")
+    return {
+        "periodo": periodo,
+        "total_trabajos": total[2],
+        "ingresos_totales": float(total[3]),
+        "comisiones": float(total[4]),
+        "liberado": float(total[5]),
+        "archivos": archivos,
+    }
@@ -0,0 +1,70 @@
+"""
+Servicio de Resúmenes - Datos mínimos de profesionales y oficios para listados.
+
+Los listados (marketplace de servicios, leaderboard) muestran los mismos
+datos de cada entidad en muchas filas. En lugar de resolverlos fila por
+fila (N+1 consultas), se piden todos los ids de la página juntos:
+ProfessionalCache devuelve los cacheados con un MGET y los faltantes se
+cargan con una sola consulta y se guardan en un pipeline. Los oficios salen
+del registro en memoria (ver oficio_service).
+"""
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from shared.cache.cache_manager import ProfessionalCache
+from shared.core.config import settings
+from shared.models.professional import Profesional
+from shared.models.user import Usuario
+from shared.services.oficio_service import obtener_registro
+
+
+def _cargar_profesionales(db: Session, ids: List[str]) -> Dict[str, dict]:
+    rows = db.execute(
+        select(
+            Profesional.id,
+            Profesional.usuario_id,
+            Usuario.nombre,
+            Usuario.apellido,
+            Usuario.email,
+            Usuario.avatar_url,
+            Profesional.nivel,
+            Profesional.rating_promedio,
+        )
+        .join(Usuario, Profesional.usuario_id == Usuario.id)
+        .where(Profesional.id.in_([UUID(id_) for id_ in ids]))
+    ).all()
+    return {
+        str(row.id): {
+            "id": str(row.id),
+            "user_id": str(row.usuario_id),
+            "nombre": f"{row.nombre} {row.apellido}",
+            "email": row.email,
+            "avatar_url": row.avatar_url,
+            "nivel": row.nivel.value if row.nivel else None,
+            "rating_promedio": float(row.rating_promedio) if row.rating_promedio else 0.0,
+        }
+        for row in rows
+    }
+
+
+def resumenes_profesionales(db: Session, profesional_ids: Iterable) -> Dict[str, dict]:
+    """Resumen de cada profesional por id (str), en una consulta como máximo"""
+    return ProfessionalCache.get_summaries(
+        [str(id_) for id_ in profesional_ids],
+        loader=lambda faltantes: _cargar_profesionales(db, faltantes),
+        ttl=settings.ENTITY_CACHE_TTL,
+    )
+
+
+def resumenes_oficios(db: Session, oficio_ids: Iterable) -> Dict[str, dict]:
+    """Datos de cada oficio por id (str), desde el registro en memoria"""
+    registro = obtener_registro(db)
+    resultado = {}
+    for id_ in oficio_ids:
+        oficio = registro.por_id.get(id_ if isinstance(id_, UUID) else UUID(str(id_)))
+        if oficio is not None:
+            resultado[str(oficio.id)] = {"id": str(oficio.id), "nombre": oficio.nombre, "descripcion": oficio.descripcion}
+    return resultado
@@ -1,76 +1,349 @@
-from typing import List
+import json
+import logging
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from geoalchemy2 import WKTElement
-from geoalchemy2.functions import ST_DWithin, ST_MakePoint
+from sqlalchemy import func, select, literal, cast, null, Float, union_all, false
+from geoalchemy2 import WKTElement, Geography
+from geoalchemy2.functions import ST_Intersects, ST_DWithin
 from shared.models.professional import Profesional
-from shared.models.oficio import professional_oficios
+from shared.models.oficio import Oficio, professional_oficios
 from shared.models.user import Usuario
-from shared.models.enums import VerificationStatus
+from shared.models.enums import VerificationStatus, UserRole
 from shared.schemas.search import SearchProfessionalsRequest
-from shared.schemas.professional import ProfessionalProfileRead
+from shared.cache.cache_manager import SearchCache
+from shared.cache.warmup import registrar_pedido
+from shared.core.config import settings
+from shared.database.counting import count_rows, estimate_row_count
+from shared.services.ranking_service import PesosRelevancia, puntaje_relevancia
+from shared.services.oficio_service import obtener_registro, registro_actual
 
+# Logger dedicado a las consultas de /search (una línea JSON por búsqueda).
+# Es la entrada de benchmarks/evaluar_ranking.py para comparar rankings offline.
+consultas_logger = logging.getLogger("shared.search.consultas")
 
-def search_professionals_by_location(
-    db: Session,
-    params: SearchProfessionalsRequest
-) -> List[ProfessionalProfileRead]:
-    """
-    Busca profesionales aprobados que ofrecen el oficio solicitado
-    y que cubren la ubicación del cliente según su radio de cobertura.
-    
-    Usa PostGIS ST_DWithin para calcular si el punto del cliente
-    está dentro del radio de cobertura del profesional.
-    
-    Soporta filtros opcionales por nivel, acepta_instant y ordenamiento.
-    """
-    # Crear punto geoespacial del cliente (SRID 4326 = WGS84)
-    punto_cliente = ST_MakePoint(params.lng, params.lat)
-    punto_cliente = WKTElement(f'POINT({params.lng} {params.lat})', srid=4326)
-    
-    # Construir filtros base
+
+# ============================================================================
+# BÚSQUEDA PARA /search Y /search/batch
+# ============================================================================
+
+def _punto_cliente(params: SearchProfessionalsRequest) -> Optional[WKTElement]:
+    """Punto del cliente si la búsqueda trae coordenadas"""
+    if params.latitude is None or params.longitude is None:
+        return None
+    return WKTElement(f'POINT({params.longitude} {params.latitude})', srid=4326)
+
+
+def _distancia_km(params: SearchProfessionalsRequest):
+    """Expresión SQL de la distancia al cliente en km (None sin ubicación)"""
+    punto = _punto_cliente(params)
+    if punto is None:
+        return None
+    return func.ST_Distance(Profesional.base_location, punto) / 1000.0
+
+
+def _search_filters(params: SearchProfessionalsRequest) -> list:
+    """Filtros WHERE comunes a la búsqueda simple y a la búsqueda múltiple"""
     filtros = [
-        # Solo profesionales aprobados
+        Usuario.is_active == True,
+        Usuario.rol == UserRole.PROFESIONAL,
         Profesional.estado_verificacion == VerificationStatus.APROBADO,
-        # Que ofrezcan el oficio solicitado
-        professional_oficios.c.oficio_id == params.oficio_id,
-        # Que cubran la ubicación del cliente
-        # ST_DWithin usa metros, por eso multiplicamos km * 1000
-        ST_DWithin(
-            Profesional.base_location,
-            punto_cliente,
-            Profesional.radio_cobertura_km * 1000
-        )
     ]
-    
-    # Agregar filtros opcionales dinámicamente
-    if params.nivel is not None:
-        filtros.append(Profesional.nivel == params.nivel)
-    
-    if params.acepta_instant is not None:
-        filtros.append(Profesional.acepta_instant == params.acepta_instant)
-    
-    # Query con joins y filtros
-    query = (
-        db.query(Profesional)
+
+    # Filtro por oficio (por nombre, parcial, sin distinguir mayúsculas ni
+    # acentos): el nombre se resuelve a ids con el registro en memoria
+    if params.oficio:
+        registro = registro_actual()
+        if registro is not None:
+            oficio_ids = registro.resolver(params.oficio)
+            filtros.append(Profesional.id.in_(
+                select(professional_oficios.c.profesional_id)
+                .where(professional_oficios.c.oficio_id.in_(oficio_ids))
+            ) if oficio_ids else false())
+        else:
+            filtros.append(Profesional.id.in_(
+                select(professional_oficios.c.profesional_id)
+                .join(Oficio, Oficio.id == professional_oficios.c.oficio_id)
+                .where(func.lower(Oficio.nombre).contains(params.oficio.lower()))
+            ))
+
+    # Filtro por rating mínimo
+    if params.rating_minimo:
+        filtros.append(Profesional.rating_promedio >= params.rating_minimo)
+
+    # Filtro por rango de precios
+    if params.precio_minimo:
+        filtros.append(Profesional.tarifa_por_hora >= params.precio_minimo)
+    if params.precio_maximo:
+        filtros.append(Profesional.tarifa_por_hora <= params.precio_maximo)
+
+    # Filtro por viewport del mapa (usa el índice GiST de base_location)
+    if params.bbox is not None:
+        envelope = cast(
+            func.ST_MakeEnvelope(
+                params.bbox.min_lng, params.bbox.min_lat,
+                params.bbox.max_lng, params.bbox.max_lat,
+                4326
+            ),
+            Geography
+        )
+        filtros.append(ST_Intersects(Profesional.base_location, envelope))
+
+    # Modo cobertura: profesionales cuya área de cobertura (base_location +
+    # radio_cobertura_km de cada uno, precalculada en area_cobertura) incluye
+    # la ubicación del cliente. ST_Intersects usa el índice GiST de la columna.
+    punto = _punto_cliente(params)
+    if punto is not None and params.modo == "cobertura":
+        filtros.append(ST_Intersects(Profesional.area_cobertura, punto))
+
+    # Ordenar por cercanía/relevancia acota los candidatos al radio pedido:
+    # el radio es constante, así ST_DWithin usa el índice GiST y el puntaje
+    # solo se calcula sobre los profesionales cercanos.
+    if _aplica_radio(params):
+        filtros.append(ST_DWithin(Profesional.base_location, _punto_cliente(params), params.radio_km * 1000))
+
+    return filtros
+
+
+def _aplica_radio(params: SearchProfessionalsRequest) -> bool:
+    """Si la búsqueda se acota a radio_km (depende del orden, ver _search_filters)"""
+    return (
+        _punto_cliente(params) is not None
+        and params.modo == "radio"
+        and params.ordenar_por in ("distancia", "relevancia")
+        and not params.incluir_fuera_de_radio
+    )
+
+
+def _search_order(params: SearchProfessionalsRequest, distancia_km=None,
+                  pesos: Optional[PesosRelevancia] = None) -> list:
+    """Cláusulas ORDER BY según `ordenar_por`"""
+    ordenar_por = params.ordenar_por or 'rating'
+    if ordenar_por == 'precio':
+        return [Profesional.tarifa_por_hora.asc().nulls_last(), Profesional.id]
+    if ordenar_por == 'distancia' and distancia_km is not None:
+        # Operador <-> (KNN), resuelto con el índice GiST de base_location
+        return [Profesional.base_location.distance_centroid(_punto_cliente(params)), Profesional.id]
+    if ordenar_por == 'relevancia':
+        return [puntaje_relevancia(params, distancia_km, pesos).desc(), Profesional.id]
+    # Por defecto, rating desc
+    return [Profesional.rating_promedio.desc(), Profesional.id]
+
+
+def _build_search_select(params: SearchProfessionalsRequest, indice: int = 0,
+                         pesos: Optional[PesosRelevancia] = None):
+    """
+    Construye el SELECT proyectado de una búsqueda (solo las columnas que
+    necesita ProfessionalSearchResult), con la distancia calculada en SQL
+    antes de paginar, así también puede usarse para ordenar.
+    La columna `busqueda` identifica a qué búsqueda pertenece cada fila
+    cuando se combinan varias con UNION ALL.
+    """
+    distancia_km = _distancia_km(params)
+
+    # Primer oficio (alfabético) como oficio principal para mostrar
+    oficio_principal = (
+        select(Oficio.nombre)
+        .join(professional_oficios, Oficio.id == professional_oficios.c.oficio_id)
+        .where(professional_oficios.c.profesional_id == Profesional.id)
+        .order_by(Oficio.nombre)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    orden = _search_order(params, distancia_km, pesos)
+
+    return (
+        select(
+            literal(indice).label("busqueda"),
+            func.row_number().over(order_by=orden).label("posicion"),
+            Profesional.id,
+            Usuario.nombre,
+            Usuario.apellido,
+            Usuario.avatar_url,
+            oficio_principal.label("oficio"),
+            Profesional.tarifa_por_hora,
+            Profesional.rating_promedio,
+            Profesional.total_resenas,
+            (distancia_km if distancia_km is not None else cast(null(), Float)).label("distancia_km"),
+            Profesional.nivel,
+            Profesional.puntos_experiencia,
+        )
+        .select_from(Profesional)
+        .join(Usuario, Profesional.usuario_id == Usuario.id)
+        .where(*_search_filters(params))
+        .order_by(*orden)
+        .offset(params.skip)
+        .limit(params.limit)
+    )
+
+
+def _row_to_result(row) -> dict:
+    """Convierte una fila proyectada al formato de ProfessionalSearchResult"""
+    return {
+        "id": str(row.id),
+        "nombre": row.nombre,
+        "apellido": row.apellido,
+        "oficio": row.oficio or '',
+        "tarifa_por_hora": float(row.tarifa_por_hora) if row.tarifa_por_hora is not None else None,
+        "calificacion_promedio": float(row.rating_promedio) if row.rating_promedio is not None else 0.0,
+        "cantidad_resenas": int(row.total_resenas) if row.total_resenas is not None else 0,
+        "distancia_km": float(row.distancia_km) if row.distancia_km is not None else None,
+        "nivel_profesional": row.nivel.value,
+        "puntos_experiencia": int(row.puntos_experiencia),
+        "avatar_url": row.avatar_url,
+    }
+
+
+def _cache_params(params: SearchProfessionalsRequest) -> dict:
+    """Parámetros que identifican una página de resultados en SearchCache"""
+    return params.model_dump(mode="json", exclude={"modo_conteo"})
+
+
+def _count_signature(params: SearchProfessionalsRequest) -> dict:
+    """
+    Parámetros que afectan al total (los filtros, no la paginación ni el orden).
+    El orden solo cuenta por el filtro de radio que agrega a la búsqueda.
+    """
+    firma = params.model_dump(mode="json", exclude={"skip", "limit", "ordenar_por", "modo_conteo"})
+    firma["radio_aplicado"] = _aplica_radio(params)
+    return firma
+
+
+def _contar_resultados(db: Session, params: SearchProfessionalsRequest) -> tuple[int, bool]:
+    """
+    Total de resultados según `modo_conteo`.
+
+    - exacto: COUNT cacheado por firma de filtros (TTL corto).
+    - estimado: usa la estimación del planner si la búsqueda es amplia
+      (>= SEARCH_COUNT_UMBRAL_ESTIMACION); si es acotada, cuenta exacto.
+
+    Returns:
+        Tupla (total, es_estimado)
+    """
+    firma = _count_signature(params)
+    total = SearchCache.get_count(firma)
+    if total is not None:
+        return total, False
+
+    base = (
+        select(Profesional.id)
+        .select_from(Profesional)
         .join(Usuario, Profesional.usuario_id == Usuario.id)
-        .join(professional_oficios, Profesional.id == professional_oficios.c.profesional_id)
-        .filter(and_(*filtros))
+        .where(*_search_filters(params))
     )
-    
-    # Ordenamiento dinámico
-    if params.sort_by == "rating":
-        # Preparado para cuando se implemente el campo rating en Módulo 6
-        query = query.order_by(Profesional.rating.desc())
-    else:
-        # Default: ordenar por nivel (Diamante primero)
-        query = query.order_by(Profesional.nivel.desc())
-    
-    profesionales = query.all()
-    
-    # Convertir a schemas Pydantic usando el helper method
-    result = []
-    for prof in profesionales:
-        result.append(ProfessionalProfileRead.from_professional(prof))
-    
-    return result
+
+    if params.modo_conteo == "estimado":
+        estimado = estimate_row_count(db, base)
+        if estimado >= settings.SEARCH_COUNT_UMBRAL_ESTIMACION:
+            return estimado, True
+
+    total = count_rows(db, base)
+    SearchCache.set_count(firma, total, ttl=settings.SEARCH_COUNT_CACHE_TTL)
+    return total, False
+
+
+def _registrar_consulta(params: SearchProfessionalsRequest, resultados: list):
+    """Registra la búsqueda y los IDs devueltos (solo si el logger está habilitado)"""
+    if not consultas_logger.isEnabledFor(logging.INFO):
+        return
+    consultas_logger.info(json.dumps({
+        "params": _cache_params(params),
+        "resultados": [r["id"] for r in resultados],
+    }))
+
+
+def _pagina_resultados(db: Session, params: SearchProfessionalsRequest) -> list:
+    """Página de resultados desde SearchCache o, si no está, desde la base"""
+    resultados = SearchCache.get_search_results(_cache_params(params))
+    if resultados is None:
+        rows = db.execute(_build_search_select(params)).all()
+        resultados = [_row_to_result(row) for row in rows]
+        SearchCache.set_search_results(_cache_params(params), resultados)
+    _registrar_consulta(params, resultados)
+    return resultados
+
+
+def search_professionals(db: Session, params: SearchProfessionalsRequest) -> dict:
+    """
+    Búsqueda paginada de profesionales (endpoint /search).
+
+    La página de resultados se guarda en SearchCache con la misma key que usa
+    la búsqueda múltiple, así ambas reutilizan las entradas de la otra.
+    En modo "has_more" no se cuenta: se piden limit+1 filas y la fila extra
+    solo indica si existe otra página.
+    """
+    registrar_pedido("busquedas", params.model_dump_json(), settings.WARMUP_TOP_BUSQUEDAS)
+    if params.oficio:
+        obtener_registro(db)
+    pagina = (params.skip // params.limit) + 1
+
+    if params.modo_conteo == "has_more":
+        resultados = _pagina_resultados(db, params.model_copy(update={"limit": params.limit + 1}))
+        return {
+            "total": None,
+            "resultados": resultados[:params.limit],
+            "pagina": pagina,
+            "total_paginas": None,
+            "total_estimado": False,
+            "has_more": len(resultados) > params.limit,
+        }
+
+    resultados = _pagina_resultados(db, params)
+    total, es_estimado = _contar_resultados(db, params)
+
+    return {
+        "total": total,
+        "resultados": resultados,
+        "pagina": pagina,
+        "total_paginas": (total + params.limit - 1) // params.limit,
+        "total_estimado": es_estimado,
+        "has_more": params.skip + len(resultados) < total,
+    }
+
+
+def search_professionals_batch(db: Session, busquedas: List[SearchProfessionalsRequest]) -> List[dict]:
+    """
+    Ejecuta varias búsquedas en un único round trip a la base de datos.
+
+    Las búsquedas que ya están en SearchCache no se consultan; el resto se
+    combina con UNION ALL (cada una con su propio ORDER BY/LIMIT) y las filas
+    se reagrupan por la columna `busqueda`.
+
+    Returns:
+        Lista de grupos en el mismo orden que `busquedas`.
+    """
+    if any(params.oficio for params in busquedas):
+        obtener_registro(db)
+    grupos = []
+    pendientes = []
+    for indice, params in enumerate(busquedas):
+        cacheados = SearchCache.get_search_results(_cache_params(params))
+        grupos.append({
+            "indice": indice,
+            "oficio": params.oficio,
+            "resultados": cacheados if cacheados is not None else [],
+            "desde_cache": cacheados is not None,
+        })
+        if cacheados is None:
+            pendientes.append(indice)
+
+    if pendientes:
+        subconsultas = [
+            select(_build_search_select(busquedas[i], indice=i).subquery())
+            for i in pendientes
+        ]
+        if len(subconsultas) == 1:
+            consulta = subconsultas[0].subquery()
+        else:
+            consulta = union_all(*subconsultas).subquery()
+        rows = db.execute(
+            select(consulta).order_by(consulta.c.busqueda, consulta.c.posicion)
+        ).all()
+
+        for row in rows:
+            grupos[row.busqueda]["resultados"].append(_row_to_result(row))
+
+        for i in pendientes:
+            SearchCache.set_search_results(_cache_params(busquedas[i]), grupos[i]["resultados"])
+
+    return grupos
@@ -0,0 +1,87 @@
+"""
+Servicio de Warm-up - Tareas que precargan la caché de cada servicio.
+
+Cada tarea hace los mismos llamados que los endpoints (obtener_registro,
+obtener_leaderboard, get_public_profile, search_professionals): lo que ya
+está en Redis solo se copia a la L1 del proceso y lo que falta se calcula
+y se guarda, sin duplicar la lógica de cada endpoint.
+"""
+import logging
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from shared.cache.warmup import ejecutar_warmup, pedidos_frecuentes
+from shared.core.config import settings
+from shared.core.database import SessionLocal
+from shared.schemas.search import SearchProfessionalsRequest
+from shared.services.gamificacion_service import obtener_leaderboard
+from shared.services.oficio_service import obtener_registro
+from shared.services.profile_service import get_public_profile
+from shared.services.search_service import search_professionals
+
+logger = logging.getLogger(__name__)
+
+# Tamaños de página del leaderboard que se precalientan
+LEADERBOARD_LIMITES = (10, 25, 50)
+
+
+def calentar_oficios(db: Session):
+    obtener_registro(db)
+
+
+def calentar_leaderboard(db: Session):
+    for limit in LEADERBOARD_LIMITES:
+        obtener_leaderboard(db, limit)
+
+
+def calentar_perfiles(db: Session):
+    """Perfiles públicos más pedidos en la corrida anterior"""
+    for profesional_id in pedidos_frecuentes("perfiles", settings.WARMUP_TOP_PERFILES):
+        get_public_profile(db, UUID(profesional_id))
+
+
+def calentar_busquedas(db: Session):
+    """Búsquedas más frecuentes en la corrida anterior"""
+    for params_json in pedidos_frecuentes("busquedas", settings.WARMUP_TOP_BUSQUEDAS):
+        try:
+            params = SearchProfessionalsRequest.model_validate_json(params_json)
+        except ValueError:
+            # Parámetros guardados con un schema anterior
+            continue
+        search_professionals(db, params)
+
+
+TAREAS: Dict[str, Callable[[Session], None]] = {
+    "oficios": calentar_oficios,
+    "leaderboard": calentar_leaderboard,
+    "perfiles": calentar_perfiles,
+    "busquedas": calentar_busquedas,
+}
+
+
+def _en_sesion(tarea: Callable[[Session], None], db: Session):
+    try:
+        tarea(db)
+    except Exception:
+        # Que una consulta fallida no deje la sesión inutilizable para las demás tareas
+        db.rollback()
+        raise
+
+
+def calentar(nombres: Optional[Iterable[str]] = None) -> dict:
+    """
+    Corre las tareas de warm-up indicadas (default: todas) con su propia
+    sesión de DB.
+
+    Returns:
+        Resumen de ejecutar_warmup
+    """
+    nombres = list(nombres) if nombres is not None else list(TAREAS)
+    db = SessionLocal()
+    try:
+        return ejecutar_warmup({nombre: partial(_en_sesion, TAREAS[nombre], db) for nombre in nombres})
+    finally:
+        db.close()
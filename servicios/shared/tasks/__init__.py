@@ -1,8 +1,14 @@
 """Módulo de tareas en background con Celery"""
 from .celery_config import (
     celery_app,
+    COLAS,
+    TASK_ROUTES,
+    PRIORIDAD_ALTA,
+    PRIORIDAD_NORMAL,
+    PRIORIDAD_BAJA,
     send_email_task,
     send_welcome_email_task,
+    send_email_batch_task,
     send_notification_email_task,
     generate_monthly_report_task,
     generate_professional_stats_task,
@@ -10,13 +16,20 @@ from .celery_config import (
     cleanup_expired_sessions_task,
     sync_firestore_to_postgres_task,
     update_professional_ratings_task,
-    enqueue_task
+    enqueue_task,
+    enviar_campania
 )
 
 __all__ = [
     "celery_app",
+    "COLAS",
+    "TASK_ROUTES",
+    "PRIORIDAD_ALTA",
+    "PRIORIDAD_NORMAL",
+    "PRIORIDAD_BAJA",
     "send_email_task",
     "send_welcome_email_task",
+    "send_email_batch_task",
     "send_notification_email_task",
     "generate_monthly_report_task",
     "generate_professional_stats_task",
@@ -24,5 +37,6 @@ __all__ = [
     "cleanup_expired_sessions_task",
     "sync_firestore_to_postgres_task",
     "update_professional_ratings_task",
-    "enqueue_task"
+    "enqueue_task",
+    "enviar_campania"
 ]
@@ -1,9 +1,25 @@
 """
 Configuración de Celery para tareas en background.
 Incluye tareas comunes: emails, reportes, limpieza de datos.
+
+Cada tipo de tarea va a su propia cola (TASK_ROUTES) y cada cola tiene sus
+propios workers (ver worker.py y los servicios worker-* de docker-compose),
+así un reporte mensual largo no demora un email de reset de contraseña:
+
+- emails:        envío de emails
+- notifications: notificaciones al usuario (arman y encolan el email)
+- reports:       reportes y estadísticas (largos, pocos a la vez)
+- maintenance:   limpieza, recálculo de ratings, sincronización, warm-up;
+                 también consume la cola "default" (tareas sin ruta)
+
+Dentro de cada cola se respeta la prioridad (PRIORIDAD_*): con el broker
+Redis, 0 es la más alta. Cada ruta define la prioridad por defecto de la
+tarea; se puede pisar al encolar (ej: un reset de contraseña con
+enqueue_task("send_email", ..., priority=PRIORIDAD_ALTA)).
 """
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Queue
 import os
 import logging
 
@@ -19,6 +35,49 @@ celery_app = Celery(
     backend=CELERY_RESULT_BACKEND
 )
 
+# ============================================================================
+# COLAS, RUTAS Y PRIORIDADES
+# ============================================================================
+
+# Prioridades (broker Redis: 0 = más alta)
+PRIORIDAD_ALTA = 0
+PRIORIDAD_NORMAL = 5
+PRIORIDAD_BAJA = 9
+
+COLA_DEFAULT = "default"
+
+# Workers por cola: procesos y prefetch (tareas que reserva cada proceso).
+# Prefetch 1 en las colas de tareas largas, para que una tarea en curso no
+# retenga otras que podría tomar otro worker; se pueden ajustar con
+# CELERY_<COLA>_CONCURRENCY / CELERY_<COLA>_PREFETCH.
+COLAS = {
+    "emails": {"concurrency": 4, "prefetch": 4},
+    "notifications": {"concurrency": 4, "prefetch": 4},
+    "reports": {"concurrency": 1, "prefetch": 1},
+    "maintenance": {"concurrency": 2, "prefetch": 1},
+}
+
+TASK_ROUTES = {
+    # Emails
+    "send_email": {"queue": "emails", "priority": PRIORIDAD_NORMAL},
+    "send_welcome_email": {"queue": "emails", "priority": PRIORIDAD_NORMAL},
+    "send_email_batch": {"queue": "emails", "priority": PRIORIDAD_BAJA},
+    
+    # Notificaciones al usuario
+    "send_notification_email": {"queue": "notifications", "priority": PRIORIDAD_ALTA},
+    
+    # Reportes
+    "generate_monthly_report": {"queue": "reports", "priority": PRIORIDAD_BAJA},
+    "generate_professional_stats": {"queue": "reports", "priority": PRIORIDAD_NORMAL},
+    
+    # Mantenimiento
+    "cleanup_old_notifications": {"queue": "maintenance", "priority": PRIORIDAD_BAJA},
+    "cleanup_expired_sessions": {"queue": "maintenance", "priority": PRIORIDAD_BAJA},
+    "sync_firestore_to_postgres": {"queue": "maintenance", "priority": PRIORIDAD_NORMAL},
+    "update_professional_ratings": {"queue": "maintenance", "priority": PRIORIDAD_NORMAL},
+    "warm_cache": {"queue": "maintenance", "priority": PRIORIDAD_NORMAL},
+}
+
 # Configuración de Celery
 celery_app.conf.update(
     task_serializer="json",
@@ -28,8 +87,18 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_time_limit=300,  # 5 minutos máximo por tarea
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=1,  # default; cada worker usa el de su cola (ver worker.py)
     worker_max_tasks_per_child=1000,
+    task_queues=[Queue(COLA_DEFAULT)] + [Queue(cola) for cola in COLAS],
+    task_default_queue=COLA_DEFAULT,
+    task_routes=TASK_ROUTES,
+    task_default_priority=PRIORIDAD_NORMAL,
+    broker_transport_options={
+        # Una lista por prioridad en Redis (por defecto agrupa en 4 niveles)
+        "priority_steps": list(range(PRIORIDAD_BAJA + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
 # ============================================================================
@@ -48,13 +117,13 @@ def send_email_task(to_email: str, subject: str, body: str, html: str = None):
         html: Cuerpo del email en HTML (opcional)
     """
     try:
-        from shared.services.email_service import EmailService
+        from shared.services.email_service import EmailService, Mensaje
         
-        email_service = EmailService()
-        email_service.send_email(to_email, subject, body, html)
+        # El pool SMTP es del proceso: las tareas seguidas reusan la conexión
+        resultado = EmailService().enviar([Mensaje(to_email, subject, body, html)])
         
-        logger.info(f"Email enviado a {to_email}")
-        return {"status": "success", "to": to_email}
+        logger.info(f"Email a {to_email}: {resultado.enviados} enviado")
+        return {"status": "success" if resultado.enviados else "error", "to": to_email}
         
     except Exception as e:
         logger.error(f"Error enviando email: {str(e)}")
@@ -67,17 +136,39 @@ def send_welcome_email_task(user_email: str, user_name: str):
     try:
         from shared.services.email_service import EmailService
         
-        email_service = EmailService()
-        email_service.send_welcome_email(user_email, user_name)
+        resultado = EmailService().enviar_plantilla("welcome", [{"email": user_email, "nombre": user_name}])
         
-        logger.info(f"Email de bienvenida enviado a {user_email}")
-        return {"status": "success"}
+        logger.info(f"Email de bienvenida a {user_email}: {resultado.enviados} enviado")
+        return {"status": "success" if resultado.enviados else "error"}
         
     except Exception as e:
         logger.error(f"Error enviando email de bienvenida: {str(e)}")
         raise
 
 
+@celery_app.task(name="send_email_batch", time_limit=1800)
+def send_email_batch_task(plantilla: str, destinatarios: list, contexto: dict = None):
+    """
+    Envía una plantilla a un lote de destinatarios (ver enviar_campania).
+    
+    Args:
+        plantilla: Nombre de la plantilla (email_service.PLANTILLAS)
+        destinatarios: Dicts con "email" y el contexto propio de cada uno
+        contexto: Contexto común a todos
+    """
+    try:
+        from shared.services.email_service import EmailService
+        
+        resultado = EmailService().enviar_plantilla(plantilla, destinatarios, contexto)
+        
+        logger.info(f"Lote de '{plantilla}': {resultado.enviados} enviados, {len(resultado.fallidos)} fallidos")
+        return {"enviados": resultado.enviados, "fallidos": resultado.fallidos}
+        
+    except Exception as e:
+        logger.error(f"Error enviando lote de emails: {str(e)}")
+        raise
+
+
 @celery_app.task(name="send_notification_email")
 def send_notification_email_task(user_id: str, notification_type: str, data: dict):
     """
@@ -110,7 +201,8 @@ def send_notification_email_task(user_id: str, notification_type: str, data: dic
         subject = templates.get(notification_type, "Notificación")
         body = f"Hola {user.nombre},\n\n{data.get('message', 'Tienes una nueva notificación.')}"
         
-        send_email_task.delay(user.email, subject, body)
+        # Lo pidió un evento del usuario: se adelanta a los envíos masivos
+        send_email_task.apply_async((user.email, subject, body), priority=PRIORIDAD_ALTA)
         
         db.close()
         return {"status": "success"}
@@ -124,48 +216,32 @@ def send_notification_email_task(user_id: str, notification_type: str, data: dic
 # TAREAS DE REPORTES
 # ============================================================================
 
-@celery_app.task(name="generate_monthly_report")
-def generate_monthly_report_task(month: int, year: int):
+@celery_app.task(name="generate_monthly_report", time_limit=3600)
+def generate_monthly_report_task(month: int = None, year: int = None, formato: str = None, detalle: bool = True):
     """
-    Genera reporte mensual de la plataforma.
+    Genera reporte mensual de la plataforma (ver reporte_service).
     
     Args:
-        month: Mes (1-12)
-        year: Año
+        month: Mes (1-12); default el mes anterior
+        year: Año; default el del mes anterior
+        formato: "csv" o "parquet" (default: REPORTES_FORMATO)
+        detalle: Exportar también cada trabajo del mes
     """
     try:
         from shared.core.database import SessionLocal
-        from shared.models.trabajo import Trabajo
-        from sqlalchemy import func
+        from shared.services.reporte_service import exportar_reporte_mensual
         from datetime import datetime
         
-        db = SessionLocal()
-        
-        # Calcular estadísticas del mes
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        
-        trabajos = db.query(Trabajo).filter(
-            Trabajo.fecha_creacion >= start_date,
-            Trabajo.fecha_creacion < end_date
-        )
-        
-        stats = {
-            "total_trabajos": trabajos.count(),
-            "ingresos_totales": db.query(func.sum(Trabajo.precio_final)).filter(
-                Trabajo.fecha_creacion >= start_date,
-                Trabajo.fecha_creacion < end_date
-            ).scalar() or 0,
-            "comisiones": db.query(func.sum(Trabajo.comision_plataforma)).filter(
-                Trabajo.fecha_creacion >= start_date,
-                Trabajo.fecha_creacion < end_date
-            ).scalar() or 0
-        }
+        if month is None or year is None:
+            # El beat lo corre el primer día del mes: reporte del mes que terminó
+            hoy = datetime.utcnow()
+            year, month = (hoy.year - 1, 12) if hoy.month == 1 else (hoy.year, hoy.month - 1)
         
-        db.close()
+        db = SessionLocal()
+        try:
+            stats = exportar_reporte_mensual(db, year, month, formato=formato, detalle=detalle)
+        finally:
+            db.close()
         
         logger.info(f"Reporte mensual generado: {month}/{year}")
         return stats
@@ -301,31 +377,50 @@ def sync_firestore_to_postgres_task():
 
 @celery_app.task(name="update_professional_ratings")
 def update_professional_ratings_task():
-    """Actualiza los ratings de todos los profesionales"""
+    """
+    Recalcula rating_promedio, total_resenas y rating_bayesiano de todos los
+    profesionales en un solo UPDATE (agregado de reseñas por profesional).
+    Solo escribe las filas que cambiaron; también corrige rating_bayesiano
+    cuando cambia SEARCH_RATING_PRIOR_*.
+    """
     try:
         from shared.core.database import SessionLocal
-        from shared.models.professional import Professional
+        from shared.models.professional import Profesional
         from shared.models.resena import Resena
-        from shared.models.trabajo import Trabajo
-        from sqlalchemy import func
+        from shared.services.ranking_service import rating_bayesiano_sql
+        from sqlalchemy import func, or_, select, update
         
         db = SessionLocal()
-        
-        professionals = db.query(Professional).all()
-        updated_count = 0
-        
-        for prof in professionals:
-            # Calcular rating promedio
-            avg_rating = db.query(func.avg(Resena.rating)).join(Trabajo).filter(
-                Trabajo.profesional_id == prof.user_id
-            ).scalar()
+        try:
+            resumen = (
+                select(
+                    Profesional.id.label("id"),
+                    func.coalesce(func.avg(Resena.rating), 0).label("promedio"),
+                    func.count(Resena.id).label("total"),
+                )
+                .select_from(Profesional)
+                .outerjoin(Resena, Resena.profesional_id == Profesional.id)
+                .group_by(Profesional.id)
+                .subquery()
+            )
+            promedio = func.round(resumen.c.promedio, 2)
+            bayesiano = rating_bayesiano_sql(resumen.c.promedio, resumen.c.total)
             
-            if avg_rating:
-                prof.rating_promedio = float(avg_rating)
-                updated_count += 1
-        
-        db.commit()
-        db.close()
+            result = db.execute(
+                update(Profesional)
+                .where(Profesional.id == resumen.c.id)
+                .where(or_(
+                    Profesional.rating_promedio != promedio,
+                    Profesional.total_resenas != resumen.c.total,
+                    Profesional.rating_bayesiano != bayesiano,
+                ))
+                .values(rating_promedio=promedio, total_resenas=resumen.c.total, rating_bayesiano=bayesiano)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            updated_count = result.rowcount
+        finally:
+            db.close()
         
         logger.info(f"Ratings actualizados: {updated_count} profesionales")
         return {"updated_count": updated_count}
@@ -335,6 +430,27 @@ def update_professional_ratings_task():
         raise
 
 
+@celery_app.task(name="warm_cache")
+def warm_cache_task(tareas: list = None):
+    """
+    Precarga la caché compartida (Redis): oficios, leaderboard y los perfiles
+    y búsquedas más pedidos. Encolar después de un deploy o de vaciar Redis.
+    
+    Args:
+        tareas: Nombres de tareas de warmup_service.TAREAS (default: todas)
+    """
+    try:
+        from shared.services.warmup_service import calentar
+        
+        resumen = calentar(tareas)
+        logger.info(f"Warm-up de caché: {resumen}")
+        return resumen
+        
+    except Exception as e:
+        logger.error(f"Error en warm-up de caché: {str(e)}")
+        raise
+
+
 # ============================================================================
 # TAREAS PERIÓDICAS (Beat Schedule)
 # ============================================================================
@@ -369,17 +485,41 @@ celery_app.conf.beat_schedule = {
 
 # Helper para encolar tareas desde otros servicios
 
-def enqueue_task(task_name: str, *args, **kwargs):
+def enqueue_task(task_name: str, *args, priority: int = None, **kwargs):
     """
-    Encola una tarea de Celery.
+    Encola una tarea de Celery en la cola de su ruta (TASK_ROUTES).
     
     Args:
         task_name: Nombre de la tarea
         *args: Argumentos posicionales
+        priority: Prioridad (PRIORIDAD_*); default la de la ruta
         **kwargs: Argumentos con nombre
         
     Returns:
         AsyncResult de Celery
     """
-    task = celery_app.send_task(task_name, args=args, kwargs=kwargs)
+    options = {"priority": priority} if priority is not None else {}
+    task = celery_app.send_task(task_name, args=args, kwargs=kwargs, **options)
     return task
+
+
+def enviar_campania(plantilla: str, destinatarios: list, contexto: dict = None) -> list:
+    """
+    Envía una plantilla a muchos destinatarios: una tarea send_email_batch
+    cada EMAIL_CAMPAIGN_CHUNK destinatarios, no una por email.
+    
+    Args:
+        plantilla: Nombre de la plantilla
+        destinatarios: Dicts con "email" y el contexto propio de cada uno
+        contexto: Contexto común a todos
+        
+    Returns:
+        AsyncResult de cada tarea encolada
+    """
+    from shared.core.config import settings
+    
+    tamano = settings.EMAIL_CAMPAIGN_CHUNK
+    return [
+        send_email_batch_task.delay(plantilla, destinatarios[i:i + tamano], contexto)
+        for i in range(0, len(destinatarios), tamano)
+    ]
@@ -0,0 +1,45 @@
+"""
+Arranque de un worker de Celery para una cola (ver COLAS en celery_config).
+
+    python -m shared.tasks.worker emails
+
+Toma la concurrencia y el prefetch de la cola (con override por variables
+de entorno CELERY_<COLA>_CONCURRENCY / CELERY_<COLA>_PREFETCH). El worker
+de maintenance también consume la cola default. Los argumentos extra se
+pasan tal cual a `celery worker`.
+"""
+import os
+import sys
+
+from shared.tasks.celery_config import COLA_DEFAULT, COLAS, celery_app
+
+
+def argumentos_worker(cola: str) -> list:
+    """Argumentos de `celery worker` para los workers de `cola`"""
+    if cola not in COLAS:
+        raise ValueError(f"Cola desconocida: {cola}. Colas: {', '.join(COLAS)}")
+
+    prefijo = f"CELERY_{cola.upper()}_"
+    concurrency = int(os.getenv(prefijo + "CONCURRENCY", COLAS[cola]["concurrency"]))
+    prefetch = int(os.getenv(prefijo + "PREFETCH", COLAS[cola]["prefetch"]))
+    colas = [cola, COLA_DEFAULT] if cola == "maintenance" else [cola]
+
+    return [
+        "worker",
+        "--loglevel=INFO",
+        f"--queues={','.join(colas)}",
+        f"--concurrency={concurrency}",
+        f"--prefetch-multiplier={prefetch}",
+        f"--hostname={cola}@%h",
+    ]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Uso: python -m shared.tasks.worker <cola> [args de celery]. Colas: {', '.join(COLAS)}")
+        sys.exit(2)
+    celery_app.worker_main(argumentos_worker(sys.argv[1]) + sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
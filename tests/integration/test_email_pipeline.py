@@ -0,0 +1,157 @@
+"""
+Tests de integración del envío de emails (shared/services/email_service.py).
+
+Levanta un servidor SMTP local con aiosmtpd y verifica que los lotes
+reusan la conexión, que se respeta el rate limit del proveedor y que las
+plantillas se compilan una sola vez.
+
+Requiere: pip install aiosmtpd jinja2 (además de las dependencias de servicios/shared)
+"""
+import os
+import socket
+import sys
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+pytest.importorskip("jinja2")
+pytest.importorskip("pydantic_settings")
+
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "servicios"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from shared.core.config import settings
+from shared.services.email_service import EmailService, SMTPProvider, obtener_plantilla
+
+
+class Buzon:
+    """Handler de aiosmtpd que guarda los mensajes y cuenta las sesiones"""
+
+    def __init__(self):
+        self.mensajes = []
+        self.sesiones = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sesiones += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.mensajes.append(envelope)
+        return "250 OK"
+
+
+class LimiterFijo:
+    """Otorga como mucho `por_llamada` fichas en cada reserva"""
+
+    def __init__(self, por_llamada: int):
+        self.por_llamada = por_llamada
+        self.llamadas = []
+
+    def reserve(self, key, max_requests, window_seconds, algorithm=None, cost=1, partial=False):
+        self.llamadas.append((key, cost))
+        return True, {"granted": min(cost, self.por_llamada), "retry_after": 0}
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_local():
+    buzon = Buzon()
+    controller = Controller(buzon, hostname="127.0.0.1", port=_puerto_libre())
+    controller.start()
+    # Un proveedor por test: cada uno arranca con su propio pool
+    proveedor = SMTPProvider(nombre=f"test-{controller.port}", host="127.0.0.1", port=controller.port, starttls=False)
+    yield buzon, proveedor
+    controller.stop()
+
+
+def _destinatarios(cantidad: int) -> list:
+    return [{"email": f"usuario{i}@example.com", "nombre": f"Usuario {i}"} for i in range(cantidad)]
+
+
+def test_lotes_reusan_la_conexion(smtp_local):
+    buzon, proveedor = smtp_local
+    service = EmailService(proveedor=proveedor, limiter=None, enabled=True)
+
+    resultado = service.enviar_plantilla("welcome", _destinatarios(80))
+
+    assert resultado.enviados == 80
+    assert resultado.fallidos == []
+    assert len(buzon.mensajes) == 80
+    # Dos lotes de EMAIL_BATCH_SIZE por la misma sesión SMTP
+    assert buzon.sesiones == 1
+
+
+def test_conexion_se_renueva_despues_del_maximo(smtp_local, monkeypatch):
+    buzon, proveedor = smtp_local
+    monkeypatch.setattr(settings, "EMAIL_BATCH_SIZE", 20)
+    monkeypatch.setattr(settings, "EMAIL_SMTP_MAX_MESSAGES", 40)
+    service = EmailService(proveedor=proveedor, limiter=None, enabled=True)
+
+    resultado = service.enviar_plantilla("welcome", _destinatarios(100))
+
+    assert resultado.enviados == 100
+    assert buzon.sesiones == 3
+
+
+def test_rate_limit_del_proveedor(smtp_local):
+    buzon, proveedor = smtp_local
+    proveedor = SMTPProvider(**{**proveedor.__dict__, "rate_limit": 7})
+    limiter = LimiterFijo(por_llamada=7)
+    service = EmailService(proveedor=proveedor, limiter=limiter, enabled=True)
+
+    resultado = service.enviar_plantilla("welcome", _destinatarios(20))
+
+    assert resultado.enviados == 20
+    assert len(buzon.mensajes) == 20
+    # Se pide el lote completo y se manda lo otorgado hasta cubrirlo
+    assert limiter.llamadas == [(f"email:{proveedor.nombre}", 20), (f"email:{proveedor.nombre}", 13),
+                                (f"email:{proveedor.nombre}", 6)]
+
+
+def test_plantilla_compilada_una_vez(smtp_local):
+    buzon, proveedor = smtp_local
+    service = EmailService(proveedor=proveedor, limiter=None, enabled=True)
+
+    assert obtener_plantilla("welcome") is obtener_plantilla("welcome")
+
+    service.enviar_plantilla("welcome", [{"email": "a@example.com", "nombre": "<b>Ana</b>"}])
+
+    contenido = buzon.mensajes[0].content.decode()
+    assert "Subject: =?utf-8?" in contenido or "Bienvenido" in contenido
+    # El HTML se escapa, el texto plano no
+    assert "&lt;b&gt;Ana&lt;/b&gt;" in contenido
+    assert "Hola <b>Ana</b>," in contenido
+
+
+def test_destinatario_invalido_no_corta_el_lote(smtp_local):
+    buzon, proveedor = smtp_local
+    service = EmailService(proveedor=proveedor, limiter=None, enabled=True)
+    destinatarios = _destinatarios(10)
+    invalido = "usuario5@example.com\r\nBcc: otro@example.com"
+    destinatarios[5]["email"] = invalido
+
+    resultado = service.enviar_plantilla("welcome", destinatarios)
+
+    assert resultado.enviados == 9
+    assert resultado.fallidos == [invalido]
+    assert len(buzon.mensajes) == 9
+    assert buzon.sesiones == 1
+
+
+def test_deshabilitado_no_envia(smtp_local):
+    buzon, proveedor = smtp_local
+    service = EmailService(proveedor=proveedor, limiter=None, enabled=False)
+
+    resultado = service.enviar_plantilla("welcome", _destinatarios(3))
+
+    assert resultado.enviados == 0
+    assert len(resultado.fallidos) == 3
+    assert buzon.sesiones == 0
@@ -0,0 +1,91 @@
+"""
+Tests de integración de la invalidación del perfil público por eventos.
+
+Los eventos RESENA_CREADA / TRABAJO_COMPLETADO traen en profesional_id el
+usuarios.id del profesional (trabajos.profesional_id), mientras que el
+perfil se cachea por profesionales.id. El handler tiene que traducirlo.
+
+Requiere Postgres (DATABASE_URL) y Redis (REDIS_URL) levantados, por
+ejemplo con docker-compose. Los datos se crean en una transacción que se
+descarta al terminar.
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+if not (os.getenv("DATABASE_URL") or os.getenv("POSTGRES_DB")):
+    pytest.skip("Requiere DATABASE_URL", allow_module_level=True)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "servicios"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import text
+
+from shared.cache.cache_manager import ProfessionalCache, get_cache_manager
+from shared.core.database import SessionLocal
+from shared.events.event_bus import Event, EventType
+from shared.models.enums import UserRole
+from shared.models.professional import Profesional
+from shared.models.user import Usuario
+from shared.services.profile_service import invalidate_public_profile_by_user
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+        get_cache_manager().redis_client.ping()
+    except Exception as e:
+        session.close()
+        pytest.skip(f"Postgres o Redis no disponibles: {e}")
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def profesional(db):
+    usuario = Usuario(
+        email=f"perfil_evento_{uuid.uuid4().hex}@example.com",
+        password_hash="x",
+        nombre="Perfil",
+        apellido="Evento",
+        rol=UserRole.PROFESIONAL,
+    )
+    db.add(usuario)
+    db.flush()
+    profesional = Profesional(usuario_id=usuario.id)
+    db.add(profesional)
+    db.flush()
+    return profesional
+
+
+def _payload(event_type: EventType, usuario_id) -> dict:
+    """Payload tal como lo publica servicio_chat_ofertas (profesional_id = trabajo.profesional_id)"""
+    data = {"trabajo_id": str(uuid.uuid4()), "profesional_id": str(usuario_id)}
+    if event_type == EventType.RESENA_CREADA:
+        data.update(resena_id=str(uuid.uuid4()), rating=5.0)
+    else:
+        data.update(cliente_id=str(uuid.uuid4()))
+    return data
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("event_type", [EventType.RESENA_CREADA, EventType.TRABAJO_COMPLETADO])
+def test_evento_invalida_el_perfil_cacheado(db, profesional, event_type):
+    ProfessionalCache.set_profile(str(profesional.id), {"id": str(profesional.id)})
+    assert ProfessionalCache.get_profile(str(profesional.id)) is not None
+
+    event = Event(event_type=event_type, data=_payload(event_type, profesional.usuario_id), source_service="chat_ofertas")
+    invalidado = invalidate_public_profile_by_user(db, event.data["profesional_id"])
+
+    assert invalidado == profesional.id
+    assert ProfessionalCache.get_profile(str(profesional.id)) is None
+
+
+@pytest.mark.integration
+def test_usuario_sin_perfil_profesional(db):
+    assert invalidate_public_profile_by_user(db, uuid.uuid4()) is None
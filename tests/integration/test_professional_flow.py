@@ -273,6 +273,28 @@ async def test_search_professionals_by_location(client):
     assert isinstance(data["resultados"], list)
 
 
+@pytest.mark.asyncio
+async def test_search_professionals_by_coverage(client):
+    """
+    Test búsqueda de profesionales que cubren la ubicación del cliente
+    (radio de cobertura de cada profesional, no radio_km).
+    """
+    search_params = {
+        "latitude": -34.6037,
+        "longitude": -58.3816,
+        "modo": "cobertura",
+        "oficio": "Plomero",
+        "ordenar_por": "distancia"
+    }
+
+    response = await client.post("/api/v1/search", json=search_params)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["resultados"], list)
+    assert data["total"] >= len(data["resultados"])
+
+
 @pytest.mark.asyncio
 async def test_search_professionals_with_filters(client):
     """
@@ -0,0 +1,108 @@
+"""
+Tests del HybridRateLimiter (shared/middleware/rate_limiter.py).
+
+Las reservas se hacen contra un limitador en memoria con la misma interfaz
+que AsyncRateLimiter.reserve (ventana fija, sin reposición durante el
+test), con una espera en cada llamada para que los requests concurrentes
+se solapen como lo harían contra Redis.
+
+Requiere: pip install fastapi redis pydantic-settings
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic_settings")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "servicios"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from shared.core.config import settings
+from shared.middleware.rate_limiter import HybridRateLimiter
+
+
+class LimiterEnMemoria:
+    """Reemplazo de AsyncRateLimiter: `max_requests` fichas por key"""
+
+    def __init__(self, demora: float = 0.01):
+        self.demora = demora
+        self.consumidas = {}
+        self.reservas = 0
+
+    async def reserve(self, key, max_requests, window_seconds, algorithm=None, cost=1, partial=False):
+        self.reservas += 1
+        await asyncio.sleep(self.demora)
+        disponibles = max_requests - self.consumidas.get(key, 0)
+        otorgadas = min(cost, disponibles) if partial else (cost if cost <= disponibles else 0)
+        self.consumidas[key] = self.consumidas.get(key, 0) + otorgadas
+        info = {
+            "limit": max_requests,
+            "remaining": max_requests - self.consumidas[key],
+            "reset": 0,
+            "reset_in_seconds": window_seconds,
+            "retry_after": 0 if otorgadas else window_seconds,
+            "granted": otorgadas,
+        }
+        return bool(otorgadas), info
+
+
+async def _rafaga(limiter: HybridRateLimiter, cantidad: int, max_requests: int, window_seconds: int = 60):
+    return await asyncio.gather(*(
+        limiter.check_rate_limit("user:1", max_requests, window_seconds) for _ in range(cantidad)
+    ))
+
+
+@pytest.mark.parametrize("max_requests, cantidad", [(100, 300), (100, 100), (5, 20), (25, 26)])
+def test_requests_concurrentes_respetan_el_limite(max_requests, cantidad):
+    backend = LimiterEnMemoria()
+    limiter = HybridRateLimiter(backend)
+
+    resultados = asyncio.run(_rafaga(limiter, cantidad, max_requests))
+
+    permitidos = sum(1 for allowed, _ in resultados if allowed)
+    assert permitidos == min(cantidad, max_requests)
+    # Lo descontado en Redis es lo que se usó: no quedan fichas reservadas sin gastar
+    assert backend.consumidas["user:1"] == permitidos
+
+
+def test_una_reserva_por_lote():
+    backend = LimiterEnMemoria()
+    limiter = HybridRateLimiter(backend)
+
+    asyncio.run(_rafaga(limiter, 100, 100))
+
+    # 100 fichas en lotes de RATE_LIMIT_LEASE_SIZE
+    assert backend.reservas == 100 // min(settings.RATE_LIMIT_LEASE_SIZE, 10)
+
+
+def test_rechazo_compartido_con_los_que_esperan():
+    backend = LimiterEnMemoria()
+    limiter = HybridRateLimiter(backend)
+    asyncio.run(_rafaga(limiter, 100, 100))
+    reservas = backend.reservas
+
+    resultados = asyncio.run(_rafaga(limiter, 50, 100))
+
+    assert not any(allowed for allowed, _ in resultados)
+    assert all(info["retry_after"] == 60 for _, info in resultados)
+    assert backend.reservas == reservas + 1
+
+
+def test_prune_no_descarta_reservas_vigentes(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_MAX_KEYS", 20)
+    backend = LimiterEnMemoria(demora=0)
+    limiter = HybridRateLimiter(backend)
+
+    async def clientes():
+        for i in range(25):
+            await limiter.check_rate_limit(f"user:{i}", 100, 60)
+
+    asyncio.run(clientes())
+
+    # Se descartan las más viejas, de a 10%: nunca se vacía la tabla
+    assert 18 <= len(limiter._leases) <= 20
+    assert ":user:0:100:60" not in limiter._leases
+    assert ":user:24:100:60" in limiter._leases
@@ -0,0 +1,80 @@
+"""
+Tests del total cacheado de /search (shared/services/search_service.py).
+
+El orden "distancia" / "relevancia" agrega el filtro de radio (ST_DWithin),
+así que el total de una búsqueda con esos órdenes no es el mismo que el de
+los mismos filtros ordenados por rating o precio. El COUNT cacheado de una
+no puede servirse para la otra.
+
+SearchCache y el COUNT se reemplazan por versiones en memoria: el test no
+necesita Redis ni Postgres.
+
+Requiere: pip install sqlalchemy geoalchemy2 pydantic-settings redis
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("geoalchemy2")
+pytest.importorskip("pydantic_settings")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "servicios"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from shared.schemas.search import SearchProfessionalsRequest
+from shared.services import search_service
+
+TOTAL_SIN_RADIO = 120
+TOTAL_CON_RADIO = 7
+
+
+@pytest.fixture
+def conteos(monkeypatch):
+    """COUNT en memoria: el total depende de si la consulta trae ST_DWithin"""
+    cache = {}
+    consultas = []
+
+    def get_count(firma):
+        return cache.get(repr(sorted(firma.items())))
+
+    def set_count(firma, total, ttl=None):
+        cache[repr(sorted(firma.items()))] = total
+
+    def count_rows(db, query):
+        consultas.append(query)
+        return TOTAL_CON_RADIO if "ST_DWithin" in str(query) else TOTAL_SIN_RADIO
+
+    monkeypatch.setattr(search_service.SearchCache, "get_count", staticmethod(get_count))
+    monkeypatch.setattr(search_service.SearchCache, "set_count", staticmethod(set_count))
+    monkeypatch.setattr(search_service, "count_rows", count_rows)
+    return consultas
+
+
+def _busqueda(ordenar_por: str) -> SearchProfessionalsRequest:
+    return SearchProfessionalsRequest(
+        latitude=-34.6, longitude=-58.4, radio_km=5, rating_minimo=4, ordenar_por=ordenar_por
+    )
+
+
+@pytest.mark.parametrize("primero, despues", [
+    ("rating", "distancia"),
+    ("distancia", "rating"),
+    ("precio", "relevancia"),
+    ("relevancia", "precio"),
+])
+def test_total_no_se_comparte_entre_ordenes_con_y_sin_radio(conteos, primero, despues):
+    esperado = {"rating": TOTAL_SIN_RADIO, "precio": TOTAL_SIN_RADIO,
+                "distancia": TOTAL_CON_RADIO, "relevancia": TOTAL_CON_RADIO}
+
+    assert search_service._contar_resultados(None, _busqueda(primero)) == (esperado[primero], False)
+    assert search_service._contar_resultados(None, _busqueda(despues)) == (esperado[despues], False)
+    assert len(conteos) == 2
+
+
+def test_total_se_comparte_entre_ordenes_equivalentes(conteos):
+    assert search_service._contar_resultados(None, _busqueda("rating")) == (TOTAL_SIN_RADIO, False)
+    assert search_service._contar_resultados(None, _busqueda("precio")) == (TOTAL_SIN_RADIO, False)
+    assert search_service._contar_resultados(None, _busqueda("relevancia")) == (TOTAL_CON_RADIO, False)
+    assert search_service._contar_resultados(None, _busqueda("distancia")) == (TOTAL_CON_RADIO, False)
+    assert len(conteos) == 2
@@ -0,0 +1,77 @@
+"""
+E2E Tests para la búsqueda múltiple de la vista de mapa
+========================================================
+
+Valida POST /search/batch:
+1. Viewport + varios oficios devuelve un grupo por oficio, en orden
+2. Cada grupo coincide con la búsqueda simple equivalente en /search
+3. Validación de requests vacíos o demasiado grandes
+
+NO MOCKS. Real API calls to http://localhost:8000/api/v1
+"""
+
+import httpx
+import pytest
+
+
+# Configuration
+API_URL = "http://localhost:8000/api/v1"
+
+BBOX_AMBA = {"min_lat": -35.0, "min_lng": -59.0, "max_lat": -34.3, "max_lng": -58.2}
+
+
+@pytest.fixture
+def client():
+    """HTTP client fixture for making API requests."""
+    with httpx.Client(base_url=API_URL, timeout=30.0) as client:
+        yield client
+
+
+def test_batch_search_groups_by_oficio(client: httpx.Client):
+    """Un viewport con N oficios devuelve N grupos en el mismo orden."""
+    oficios = ["Plomería", "Electricidad", "Pintura"]
+    response = client.post(
+        "/search/batch",
+        json={"bbox": BBOX_AMBA, "oficios": oficios, "limit_por_oficio": 20}
+    )
+    assert response.status_code == 200, f"Batch search failed: {response.text}"
+
+    grupos = response.json()["grupos"]
+    assert [g["indice"] for g in grupos] == [0, 1, 2]
+    assert [g["oficio"] for g in grupos] == oficios
+    for grupo in grupos:
+        assert len(grupo["resultados"]) <= 20
+        for resultado in grupo["resultados"]:
+            assert {"id", "nombre", "apellido", "oficio", "nivel_profesional"} <= resultado.keys()
+
+
+def test_batch_search_matches_single_search(client: httpx.Client):
+    """Cada grupo devuelve lo mismo que /search con los mismos parámetros."""
+    busqueda = {
+        "oficio": "Plomería",
+        "latitude": -34.6037,
+        "longitude": -58.3816,
+        "ordenar_por": "rating",
+        "limit": 10,
+    }
+
+    single = client.post("/search", json=busqueda)
+    assert single.status_code == 200, f"Search failed: {single.text}"
+
+    batch = client.post("/search/batch", json={"busquedas": [busqueda]})
+    assert batch.status_code == 200, f"Batch search failed: {batch.text}"
+
+    grupo = batch.json()["grupos"][0]
+    assert [r["id"] for r in grupo["resultados"]] == [r["id"] for r in single.json()["resultados"]]
+
+
+def test_batch_search_validation(client: httpx.Client):
+    """Requests vacíos o con más de 20 búsquedas se rechazan con 422."""
+    response = client.post("/search/batch", json={})
+    assert response.status_code == 422
+
+    response = client.post(
+        "/search/batch",
+        json={"bbox": BBOX_AMBA, "oficios": [f"oficio-{i}" for i in range(21)]}
+    )
+    assert response.status_code == 422
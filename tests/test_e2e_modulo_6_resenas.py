@@ -353,7 +353,9 @@ def test_crear_resena_y_recalcular_rating(client: httpx.Client):
     perfil = response.json()
     
     assert 'resenas' in perfil, "Perfil debe incluir campo 'resenas'"
-    assert len(perfil['resenas']) == total_nuevo, "Debe tener todas las reseñas"
+    # El perfil incluye solo las reseñas más recientes (el resto se pagina)
+    assert len(perfil['resenas']) == min(total_nuevo, 10), "Debe tener las reseñas recientes"
+    assert sum(perfil['distribucion_ratings'].values()) == total_nuevo
     
     # Verificar la reseña creada
     resena_encontrada = next(
@@ -733,6 +735,20 @@ def test_multiples_resenas_ordenamiento(client: httpx.Client):
     
     print("   ✅ Reseñas ordenadas correctamente (más nuevas primero)")
     
+    # El endpoint paginado devuelve las mismas reseñas en el mismo orden
+    response = client.get(f"/public/professional/{prof_id}/resenas", params={"skip": 0, "limit": 3})
+    assert response.status_code == 200, f"Reseñas paginadas failed: {response.text}"
+    assert [r['id'] for r in response.json()] == [r['id'] for r in ultimas_3]
+    
+    response = client.get(f"/public/professional/{prof_id}/resenas", params={"skip": 1, "limit": 2})
+    assert [r['id'] for r in response.json()] == [r['id'] for r in ultimas_3[1:]]
+    
+    # La distribución por rating refleja las reseñas nuevas
+    distribucion = perfil_final['distribucion_ratings']
+    for rating in ("3", "4", "5"):
+        assert distribucion[rating] >= 1, f"Debe contar la reseña con rating {rating}"
+    print("   ✅ Paginación y distribución de ratings correctas")
+    
     # Verificar que cada reseña tiene el nombre del cliente
     for resena in ultimas_3:
         assert 'nombre_cliente' in resena, "Cada reseña debe tener nombre_cliente"